@@ -55,6 +55,7 @@ if platform.python_implementation() == "PyPy":
 
 test_requirements = [
     "pytest>=3.6.0",
+    "pytest-benchmark",
     "pretend",
     "iso8601",
     "pytz",
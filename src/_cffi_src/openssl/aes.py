@@ -5,7 +5,9 @@
 from __future__ import absolute_import, division, print_function
 
 INCLUDES = """
+#include <string.h>
 #include <openssl/aes.h>
+#include <openssl/crypto.h>
 """
 
 TYPES = """
@@ -25,8 +27,48 @@ int AES_wrap_key(AES_KEY *, const unsigned char *, unsigned char *,
                  const unsigned char *, unsigned int);
 int AES_unwrap_key(AES_KEY *, const unsigned char *, unsigned char *,
                    const unsigned char *, unsigned int);
+
+int Cryptography_AES_unwrap_key_raw(AES_KEY *, unsigned char *,
+                                    unsigned char *, const unsigned char *,
+                                    unsigned int);
 """
 
 CUSTOMIZATIONS = """
 static const long Cryptography_HAS_AES_WRAP = 1;
+
+/* RFC 3394 unwrap (index method) which writes the recovered integrity check
+   register to iv instead of comparing it. AES_unwrap_key only reports
+   whether A matched a fixed IV, but RFC 5649 needs A itself to recover the
+   message length. Returns inlen - 8 on success and -1 on invalid lengths. */
+int Cryptography_AES_unwrap_key_raw(AES_KEY *key, unsigned char *iv,
+                                    unsigned char *out,
+                                    const unsigned char *in,
+                                    unsigned int inlen) {
+    unsigned char *r;
+    unsigned char b[16];
+    size_t i, j, t;
+
+    if (inlen < 24 || inlen % 8 != 0) {
+        return -1;
+    }
+    inlen -= 8;
+    t = 6 * (inlen / 8);
+    memcpy(b, in, 8);
+    memmove(out, in + 8, inlen);
+    for (j = 0; j < 6; j++) {
+        r = out + inlen - 8;
+        for (i = 0; i < inlen; i += 8, t--, r -= 8) {
+            b[7] ^= (unsigned char)(t & 0xff);
+            b[6] ^= (unsigned char)((t >> 8) & 0xff);
+            b[5] ^= (unsigned char)((t >> 16) & 0xff);
+            b[4] ^= (unsigned char)((t >> 24) & 0xff);
+            memcpy(b + 8, r, 8);
+            AES_decrypt(b, b, key);
+            memcpy(r, b + 8, 8);
+        }
+    }
+    memcpy(iv, b, 8);
+    OPENSSL_cleanse(b, sizeof(b));
+    return (int)inlen;
+}
 """
@@ -55,6 +55,7 @@ const char *OpenSSL_version(int);
 /* this is a macro in 1.1.0 */
 void *OPENSSL_malloc(size_t);
 void OPENSSL_free(void *);
+void OPENSSL_cleanse(void *, size_t);
 
 /* This was removed in 1.1.0 */
 void CRYPTO_lock(int, int, const char *, int);
@@ -5,6 +5,9 @@
 from __future__ import absolute_import, division, print_function
 
 INCLUDES = """
+#include <limits.h>
+#include <string.h>
+#include <openssl/crypto.h>
 #include <openssl/hmac.h>
 """
 
@@ -20,6 +23,11 @@ int HMAC_CTX_copy(HMAC_CTX *, HMAC_CTX *);
 
 HMAC_CTX *Cryptography_HMAC_CTX_new(void);
 void Cryptography_HMAC_CTX_free(HMAC_CTX *ctx);
+
+int Cryptography_counter_kdf(const EVP_MD *, const unsigned char *, size_t,
+                             int, const unsigned char *, size_t,
+                             const unsigned char *, size_t, unsigned char *,
+                             size_t);
 """
 
 CUSTOMIZATIONS = """
@@ -45,4 +53,107 @@ void Cryptography_HMAC_CTX_free(HMAC_CTX *ctx) {
     }
 #endif
 }
+
+
+static int Cryptography_counter_kdf_update(EVP_MD_CTX *mctx, HMAC_CTX *hctx,
+                                           const unsigned char *data,
+                                           size_t len) {
+    if (hctx != NULL) {
+        return HMAC_Update(hctx, data, len);
+    }
+    return EVP_DigestUpdate(mctx, data, len);
+}
+
+
+/* Derives outlen bytes with the counter mode KDFs of NIST SP 800-56A
+   (ConcatKDF) and ANSI X9.63. Each block is PRF(counter || z || info) if
+   counter_first is non-zero and PRF(z || counter || info) otherwise, with a
+   32-bit big-endian counter starting at 1. The PRF is HMAC keyed with key if
+   key is not NULL, and the bare digest otherwise. Returns 1 on success and 0
+   on error. */
+int Cryptography_counter_kdf(const EVP_MD *md, const unsigned char *key,
+                             size_t keylen, int counter_first,
+                             const unsigned char *z, size_t zlen,
+                             const unsigned char *info, size_t infolen,
+                             unsigned char *out, size_t outlen) {
+    unsigned char block[EVP_MAX_MD_SIZE];
+    unsigned char counter_be[4];
+    size_t mdlen = (size_t)EVP_MD_size(md);
+    size_t done = 0, n;
+    unsigned long counter = 1;
+    EVP_MD_CTX *mctx = NULL;
+    HMAC_CTX *hctx = NULL;
+    int ok = 0;
+
+    if (key != NULL) {
+        if (keylen > INT_MAX) {
+            return 0;
+        }
+        hctx = Cryptography_HMAC_CTX_new();
+        if (hctx == NULL ||
+                !HMAC_Init_ex(hctx, key, (int)keylen, md, NULL)) {
+            goto err;
+        }
+    } else {
+        mctx = Cryptography_EVP_MD_CTX_new();
+        if (mctx == NULL) {
+            goto err;
+        }
+    }
+
+    while (done < outlen) {
+        counter_be[0] = (unsigned char)(counter >> 24);
+        counter_be[1] = (unsigned char)(counter >> 16);
+        counter_be[2] = (unsigned char)(counter >> 8);
+        counter_be[3] = (unsigned char)counter;
+
+        /* With a NULL key and digest HMAC_Init_ex restarts from the keyed
+           state, without hashing the key again. */
+        if (hctx != NULL) {
+            if (!HMAC_Init_ex(hctx, NULL, 0, NULL, NULL)) {
+                goto err;
+            }
+        } else if (!EVP_DigestInit_ex(mctx, md, NULL)) {
+            goto err;
+        }
+
+        if (counter_first) {
+            if (!Cryptography_counter_kdf_update(mctx, hctx, counter_be, 4) ||
+                    !Cryptography_counter_kdf_update(mctx, hctx, z, zlen)) {
+                goto err;
+            }
+        } else {
+            if (!Cryptography_counter_kdf_update(mctx, hctx, z, zlen) ||
+                    !Cryptography_counter_kdf_update(mctx, hctx, counter_be,
+                                                     4)) {
+                goto err;
+            }
+        }
+        if (!Cryptography_counter_kdf_update(mctx, hctx, info, infolen)) {
+            goto err;
+        }
+
+        if (hctx != NULL) {
+            if (!HMAC_Final(hctx, block, NULL)) {
+                goto err;
+            }
+        } else if (!EVP_DigestFinal_ex(mctx, block, NULL)) {
+            goto err;
+        }
+
+        n = outlen - done < mdlen ? outlen - done : mdlen;
+        memcpy(out + done, block, n);
+        done += n;
+        counter++;
+    }
+    ok = 1;
+
+err:
+    OPENSSL_cleanse(block, sizeof(block));
+    Cryptography_HMAC_CTX_free(hctx);
+    if (mctx != NULL) {
+        Cryptography_EVP_MD_CTX_free(mctx);
+    }
+    return ok;
+}
 """
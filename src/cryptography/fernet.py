@@ -6,17 +6,26 @@ from __future__ import absolute_import, division, print_function
 
 import base64
 import binascii
+import itertools
+import multiprocessing
 import os
 import struct
+import threading
 import time
+from multiprocessing.pool import ThreadPool
 
 import six
 
-from cryptography.exceptions import InvalidSignature
+from cryptography import utils
+from cryptography.exceptions import (
+    AlreadyFinalized, InvalidSignature, InvalidTag
+)
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives.hmac import HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 
 class InvalidToken(Exception):
@@ -25,9 +34,42 @@ class InvalidToken(Exception):
 
 _MAX_CLOCK_SKEW = 60
 
+_TOKEN_VERSION = 0x80
+# AES-256-GCM with the version byte and timestamp as associated data.
+_GCM_TOKEN_VERSION = 0x81
+_GCM_NONCE_LENGTH = 12
+# Same as _TOKEN_VERSION, with a key identifier following the version byte.
+_KEY_ID_TOKEN_VERSION = 0x82
+_KEY_ID_LENGTH = 4
+
+# CBC tokens are padded by OpenSSL instead of the padding module.
+_PKCS7 = padding.PKCS7(algorithms.AES.block_size)
+
+# Number of tokens handed to a worker at a time by MultiFernet.rotate_many.
+_ROTATE_BATCH_SIZE = 64
+
+
+def _check_timestamp(timestamp, ttl):
+    current_time = int(time.time())
+    if ttl is not None:
+        if timestamp + ttl < current_time:
+            raise InvalidToken
+
+        if current_time + _MAX_CLOCK_SKEW < timestamp:
+            raise InvalidToken
+
+
+def _timestamp_offset(version):
+    if version in (_TOKEN_VERSION, _GCM_TOKEN_VERSION):
+        return 1
+    elif version == _KEY_ID_TOKEN_VERSION:
+        return 1 + _KEY_ID_LENGTH
+    else:
+        raise InvalidToken
+
 
 class Fernet(object):
-    def __init__(self, key, backend=None):
+    def __init__(self, key, backend=None, version=_TOKEN_VERSION):
         if backend is None:
             backend = default_backend()
 
@@ -37,9 +79,22 @@ class Fernet(object):
                 "Fernet key must be 32 url-safe base64-encoded bytes."
             )
 
+        if version not in (
+            _TOKEN_VERSION, _GCM_TOKEN_VERSION, _KEY_ID_TOKEN_VERSION
+        ):
+            raise ValueError("Unsupported Fernet token version.")
+
         self._signing_key = key[:16]
         self._encryption_key = key[16:]
         self._backend = backend
+        self._version = version
+        if version == _GCM_TOKEN_VERSION:
+            self._iv_length = _GCM_NONCE_LENGTH
+        else:
+            self._iv_length = 16
+        self._aesgcm = None
+        # Only needed for version 0x82 tokens, so it's computed on first use.
+        self._key_id = None
 
     @classmethod
     def generate_key(cls):
@@ -47,37 +102,169 @@ class Fernet(object):
 
     def encrypt(self, data):
         current_time = int(time.time())
-        iv = os.urandom(16)
+        iv = os.urandom(self._iv_length)
         return self._encrypt_from_parts(data, current_time, iv)
 
+    def encrypt_many(self, data):
+        data = list(data)
+        for item in data:
+            if not isinstance(item, bytes):
+                raise TypeError("data must be bytes.")
+
+        current_time = int(time.time())
+        n = self._iv_length
+        ivs = os.urandom(n * len(data))
+        if self._version == _GCM_TOKEN_VERSION:
+            return [
+                self._encrypt_gcm(item, current_time, ivs[i * n:(i + 1) * n])
+                for i, item in enumerate(data)
+            ]
+
+        algorithm = algorithms.AES(self._encryption_key)
+        h = HMAC(self._signing_key, hashes.SHA256(), backend=self._backend)
+        return [
+            self._encrypt_with_contexts(
+                item, current_time, ivs[i * n:(i + 1) * n], algorithm,
+                h.copy()
+            )
+            for i, item in enumerate(data)
+        ]
+
     def _encrypt_from_parts(self, data, current_time, iv):
         if not isinstance(data, bytes):
             raise TypeError("data must be bytes.")
 
-        padder = padding.PKCS7(algorithms.AES.block_size).padder()
-        padded_data = padder.update(data) + padder.finalize()
+        if self._version == _GCM_TOKEN_VERSION:
+            return self._encrypt_gcm(data, current_time, iv)
+
+        return self._encrypt_with_contexts(
+            data, current_time, iv, algorithms.AES(self._encryption_key),
+            HMAC(self._signing_key, hashes.SHA256(), backend=self._backend)
+        )
+
+    def _encrypt_with_contexts(self, data, current_time, iv, algorithm, h):
         encryptor = Cipher(
-            algorithms.AES(self._encryption_key), modes.CBC(iv), self._backend
+            algorithm, modes.CBC(iv, _PKCS7), self._backend
         ).encryptor()
-        ciphertext = encryptor.update(padded_data) + encryptor.finalize()
+        ciphertext = encryptor.update(data) + encryptor.finalize()
 
+        if self._version == _KEY_ID_TOKEN_VERSION:
+            header = six.int2byte(self._version) + self._get_key_id()
+        else:
+            header = six.int2byte(self._version)
         basic_parts = (
-            b"\x80" + struct.pack(">Q", current_time) + iv + ciphertext
+            header + struct.pack(">Q", current_time) + iv + ciphertext
         )
 
-        h = HMAC(self._signing_key, hashes.SHA256(), backend=self._backend)
         h.update(basic_parts)
         hmac = h.finalize()
         return base64.urlsafe_b64encode(basic_parts + hmac)
 
+    def _get_key_id(self):
+        if self._key_id is None:
+            # The identifier is public, so it is derived like the GCM key
+            # rather than hashed directly from the key bytes.
+            hkdf = HKDF(
+                algorithm=hashes.SHA256(),
+                length=_KEY_ID_LENGTH,
+                salt=None,
+                info=b"fernet key id",
+                backend=self._backend
+            )
+            self._key_id = hkdf.derive(
+                self._signing_key + self._encryption_key
+            )
+        return self._key_id
+
+    def _get_aesgcm(self):
+        if self._aesgcm is None:
+            # The GCM key is derived from the Fernet key rather than using it
+            # directly, so no key is shared between the token versions.
+            hkdf = HKDF(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=None,
+                info=b"fernet aes-256-gcm",
+                backend=self._backend
+            )
+            self._aesgcm = AESGCM(
+                hkdf.derive(self._signing_key + self._encryption_key)
+            )
+        return self._aesgcm
+
+    def _encrypt_gcm(self, data, current_time, nonce):
+        header = six.int2byte(_GCM_TOKEN_VERSION) + struct.pack(
+            ">Q", current_time
+        )
+        ciphertext = self._get_aesgcm().encrypt(nonce, data, header)
+        return base64.urlsafe_b64encode(header + nonce + ciphertext)
+
+    def _decrypt_gcm(self, data, timestamp, ttl):
+        _check_timestamp(timestamp, ttl)
+        if len(data) < 9 + _GCM_NONCE_LENGTH + 16:
+            raise InvalidToken
+
+        try:
+            return self._get_aesgcm().decrypt(
+                data[9:9 + _GCM_NONCE_LENGTH],
+                data[9 + _GCM_NONCE_LENGTH:],
+                data[:9]
+            )
+        except InvalidTag:
+            raise InvalidToken
+
     def decrypt(self, token, ttl=None):
         timestamp, data = Fernet._get_unverified_token_data(token)
         return self._decrypt_data(data, timestamp, ttl)
 
+    def decrypt_into(self, token, buf, ttl=None):
+        timestamp, data = Fernet._get_unverified_token_data(token)
+        if six.indexbytes(data, 0) == _GCM_TOKEN_VERSION:
+            plaintext = self._decrypt_gcm(data, timestamp, ttl)
+            if len(buf) < len(plaintext):
+                raise ValueError(
+                    "buffer must be at least {0} bytes for this "
+                    "token".format(len(plaintext))
+                )
+            buf[:len(plaintext)] = plaintext
+            return len(plaintext)
+
+        iv, ciphertext = self._verify_token(data, timestamp, ttl)
+        if len(buf) < len(ciphertext) - 1:
+            raise ValueError(
+                "buffer must be at least {0} bytes for this token".format(
+                    len(ciphertext) - 1
+                )
+            )
+        return self._decrypt_ciphertext_into(iv, ciphertext, buf)
+
+    def decrypt_many(self, tokens, ttl=None):
+        tokens = list(tokens)
+        for token in tokens:
+            if not isinstance(token, bytes):
+                raise TypeError("token must be bytes.")
+
+        algorithm = algorithms.AES(self._encryption_key)
+        h = HMAC(self._signing_key, hashes.SHA256(), backend=self._backend)
+        results = []
+        for token in tokens:
+            try:
+                timestamp, data = Fernet._get_unverified_token_data(token)
+                results.append(self._decrypt_data(
+                    data, timestamp, ttl, algorithm, h.copy()
+                ))
+            except InvalidToken as e:
+                results.append(e)
+
+        return results
+
     def extract_timestamp(self, token):
         timestamp, data = Fernet._get_unverified_token_data(token)
         # Verify the token was not tampered with.
-        self._verify_signature(data)
+        if six.indexbytes(data, 0) == _GCM_TOKEN_VERSION:
+            self._decrypt_gcm(data, timestamp, None)
+        else:
+            self._verify_signature(data)
         return timestamp
 
     @staticmethod
@@ -90,52 +277,89 @@ class Fernet(object):
         except (TypeError, binascii.Error):
             raise InvalidToken
 
-        if not data or six.indexbytes(data, 0) != 0x80:
+        if not data:
             raise InvalidToken
 
+        offset = _timestamp_offset(six.indexbytes(data, 0))
         try:
-            timestamp, = struct.unpack(">Q", data[1:9])
+            timestamp, = struct.unpack(">Q", data[offset:offset + 8])
         except struct.error:
             raise InvalidToken
         return timestamp, data
 
-    def _verify_signature(self, data):
-        h = HMAC(self._signing_key, hashes.SHA256(), backend=self._backend)
+    def _verify_signature(self, data, h=None):
+        if h is None:
+            h = HMAC(
+                self._signing_key, hashes.SHA256(), backend=self._backend
+            )
+        data = memoryview(data)
         h.update(data[:-32])
         try:
-            h.verify(data[-32:])
+            h.verify(data[-32:].tobytes())
         except InvalidSignature:
             raise InvalidToken
 
-    def _decrypt_data(self, data, timestamp, ttl):
-        current_time = int(time.time())
-        if ttl is not None:
-            if timestamp + ttl < current_time:
-                raise InvalidToken
+    def _decrypt_data(self, data, timestamp, ttl, algorithm=None, h=None):
+        if six.indexbytes(data, 0) == _GCM_TOKEN_VERSION:
+            return self._decrypt_gcm(data, timestamp, ttl)
+
+        iv, ciphertext = self._verify_token(data, timestamp, ttl, h)
+        new_buffer = getattr(self._backend, "_new_uninitialized", None)
+        if new_buffer is None:
+            buf = bytearray(len(ciphertext))
+            n = self._decrypt_ciphertext_into(iv, ciphertext, buf, algorithm)
+            del buf[n:]
+            return bytes(buf)
+
+        # The OpenSSL backend can hand out an uninitialised buffer, so the
+        # plaintext is only copied once, when it's turned into bytes.
+        buf = self._backend._ffi.buffer(
+            new_buffer("unsigned char[]", len(ciphertext))
+        )
+        n = self._decrypt_ciphertext_into(iv, ciphertext, buf, algorithm)
+        return buf[:n]
+
+    def _verify_token(self, data, timestamp, ttl, h=None):
+        _check_timestamp(timestamp, ttl)
+        version = six.indexbytes(data, 0)
+        if (
+            version == _KEY_ID_TOKEN_VERSION and
+            data[1:1 + _KEY_ID_LENGTH] != self._get_key_id()
+        ):
+            raise InvalidToken
 
-            if current_time + _MAX_CLOCK_SKEW < timestamp:
-                raise InvalidToken
+        offset = _timestamp_offset(version) + 8
 
-        self._verify_signature(data)
+        self._verify_signature(data, h)
 
-        iv = data[9:25]
-        ciphertext = data[25:-32]
-        decryptor = Cipher(
-            algorithms.AES(self._encryption_key), modes.CBC(iv), self._backend
-        ).decryptor()
-        plaintext_padded = decryptor.update(ciphertext)
-        try:
-            plaintext_padded += decryptor.finalize()
-        except ValueError:
+        data = memoryview(data)
+        iv = data[offset:offset + 16].tobytes()
+        ciphertext = data[offset + 16:-32]
+        if len(ciphertext) == 0 or len(ciphertext) % 16 != 0:
             raise InvalidToken
-        unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+        return iv, ciphertext
 
-        unpadded = unpadder.update(plaintext_padded)
+    def _decrypt_ciphertext_into(self, iv, ciphertext, buf, algorithm=None):
+        if algorithm is None:
+            algorithm = algorithms.AES(self._encryption_key)
+        decryptor = Cipher(
+            algorithm, modes.CBC(iv, _PKCS7), self._backend
+        ).decryptor()
+        # Everything but the final two blocks is decrypted straight into buf,
+        # which may be one byte shorter than the ciphertext. OpenSSL needs a
+        # block of room beyond what it writes, since it holds back the last
+        # block it decrypted to strip its padding, so tokens of at most two
+        # blocks skip this step and only go through the temporary below.
+        if len(ciphertext) > 32:
+            n = decryptor.update_into(ciphertext[:-32], buf)
+        else:
+            n = 0
         try:
-            unpadded += unpadder.finalize()
+            final = decryptor.update(ciphertext[-32:]) + decryptor.finalize()
         except ValueError:
             raise InvalidToken
-        return unpadded
+        buf[n:n + len(final)] = final
+        return n + len(final)
 
 
 class MultiFernet(object):
@@ -146,13 +370,23 @@ class MultiFernet(object):
                 "MultiFernet requires at least one Fernet instance"
             )
         self._fernets = fernets
+        self._fernets_by_key_id = {}
+        for f in fernets:
+            self._fernets_by_key_id.setdefault(f._get_key_id(), []).append(f)
+        # rotate_many updates the counters from several threads.
+        self._lock = threading.Lock()
+        self._key_id_hits = 0
+        self._key_id_misses = 0
+
+    key_id_hits = utils.read_only_property("_key_id_hits")
+    key_id_misses = utils.read_only_property("_key_id_misses")
 
     def encrypt(self, msg):
         return self._fernets[0].encrypt(msg)
 
     def rotate(self, msg):
         timestamp, data = Fernet._get_unverified_token_data(msg)
-        for f in self._fernets:
+        for f in self._candidates(data):
             try:
                 p = f._decrypt_data(data, timestamp, None)
                 break
@@ -161,13 +395,280 @@ class MultiFernet(object):
         else:
             raise InvalidToken
 
-        iv = os.urandom(16)
+        iv = os.urandom(self._fernets[0]._iv_length)
         return self._fernets[0]._encrypt_from_parts(p, timestamp, iv)
 
+    def rotate_many(self, msgs, workers=None):
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if not isinstance(workers, six.integer_types):
+            raise TypeError("workers must be an integer.")
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+
+        return self._rotate_many(iter(msgs), workers)
+
+    def _rotate_many(self, msgs, workers):
+        pool = ThreadPool(workers)
+        try:
+            # Keep at most two rounds of tokens in flight: the one being
+            # rotated by the pool and the one being yielded to the caller.
+            pending = None
+            while True:
+                chunk = list(
+                    itertools.islice(msgs, workers * _ROTATE_BATCH_SIZE)
+                )
+                if chunk:
+                    submitted = pool.map_async(
+                        self._rotate_or_error, chunk, _ROTATE_BATCH_SIZE
+                    )
+                else:
+                    submitted = None
+
+                if pending is not None:
+                    for result in pending.get():
+                        yield result
+
+                if submitted is None:
+                    break
+                pending = submitted
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _rotate_or_error(self, msg):
+        try:
+            return self.rotate(msg)
+        except InvalidToken as e:
+            return e
+
     def decrypt(self, msg, ttl=None):
-        for f in self._fernets:
+        timestamp, data = Fernet._get_unverified_token_data(msg)
+        for f in self._candidates(data):
             try:
-                return f.decrypt(msg, ttl)
+                return f._decrypt_data(data, timestamp, ttl)
             except InvalidToken:
                 pass
         raise InvalidToken
+
+    def _candidates(self, data):
+        # Tokens without a key identifier (or with an unknown one) need every
+        # key to be tried in turn.
+        if six.indexbytes(data, 0) != _KEY_ID_TOKEN_VERSION:
+            return self._fernets
+
+        fernets = self._fernets_by_key_id.get(data[1:1 + _KEY_ID_LENGTH])
+        with self._lock:
+            if fernets is not None:
+                self._key_id_hits += 1
+                return fernets
+            self._key_id_misses += 1
+        return self._fernets
+
+
+_STREAM_VERSION = 0x90
+# version || timestamp || segment size || stream nonce
+_STREAM_HEADER = struct.Struct(">BQI16s")
+_STREAM_MAX_SEGMENT_SIZE = 2 ** 24
+
+
+def _stream_segment_length(plaintext_size):
+    # IV, PKCS7 padded ciphertext and HMAC-SHA256 tag of a single segment.
+    return 16 + (plaintext_size // 16 + 1) * 16 + 32
+
+
+class FernetStream(object):
+    def __init__(self, key, segment_size=2 ** 16, backend=None):
+        if not isinstance(segment_size, six.integer_types):
+            raise TypeError("segment_size must be an integer.")
+
+        if not 0 < segment_size <= _STREAM_MAX_SEGMENT_SIZE:
+            raise ValueError(
+                "segment_size must be between 1 and {0} bytes.".format(
+                    _STREAM_MAX_SEGMENT_SIZE
+                )
+            )
+
+        self._fernet = Fernet(key, backend=backend)
+        self._segment_size = segment_size
+
+    segment_size = utils.read_only_property("_segment_size")
+
+    def encryptor(self):
+        return _FernetStreamEncryptor(self._fernet, self._segment_size)
+
+    def decryptor(self, ttl=None):
+        return _FernetStreamDecryptor(self._fernet, ttl)
+
+    def encrypt_file(self, source, destination):
+        encryptor = self.encryptor()
+        self._process_file(encryptor, source, destination, self._segment_size)
+
+    def decrypt_file(self, source, destination, ttl=None):
+        decryptor = self.decryptor(ttl)
+        self._process_file(
+            decryptor, source, destination,
+            _stream_segment_length(self._segment_size)
+        )
+
+    @staticmethod
+    def _process_file(ctx, source, destination, read_size):
+        while True:
+            data = source.read(read_size)
+            if not data:
+                break
+            destination.write(ctx.update(data))
+        destination.write(ctx.finalize())
+
+
+class _FernetStreamContext(object):
+    def __init__(self, fernet):
+        self._backend = fernet._backend
+        self._algorithm = algorithms.AES(fernet._encryption_key)
+        self._hmac = HMAC(
+            fernet._signing_key, hashes.SHA256(), backend=self._backend
+        )
+        self._buffer = bytearray()
+        self._header = None
+        self._index = 0
+
+    def _segment_signature(self, final, iv, ciphertext):
+        h = self._hmac.copy()
+        h.update(self._header)
+        h.update(struct.pack(">QB", self._index, final))
+        h.update(iv)
+        h.update(ciphertext)
+        return h
+
+
+class _FernetStreamEncryptor(_FernetStreamContext):
+    def __init__(self, fernet, segment_size):
+        super(_FernetStreamEncryptor, self).__init__(fernet)
+        self._segment_size = segment_size
+
+    def update(self, data):
+        if self._buffer is None:
+            raise AlreadyFinalized("Context was already finalized.")
+        if not isinstance(data, bytes):
+            raise TypeError("data must be bytes.")
+
+        out = [self._start()]
+        self._buffer += data
+        # A full segment is only written once more data arrives, since the
+        # last segment has to be flagged as final.
+        offset = 0
+        while len(self._buffer) - offset > self._segment_size:
+            out.append(self._encrypt_segment(
+                bytes(self._buffer[offset:offset + self._segment_size]), 0
+            ))
+            offset += self._segment_size
+        del self._buffer[:offset]
+        return b"".join(out)
+
+    def finalize(self):
+        if self._buffer is None:
+            raise AlreadyFinalized("Context was already finalized.")
+
+        out = self._start() + self._encrypt_segment(bytes(self._buffer), 1)
+        self._buffer = None
+        return out
+
+    def _start(self):
+        if self._header is not None:
+            return b""
+
+        self._header = _STREAM_HEADER.pack(
+            _STREAM_VERSION, int(time.time()), self._segment_size,
+            os.urandom(16)
+        )
+        return self._header
+
+    def _encrypt_segment(self, data, final):
+        iv = os.urandom(16)
+        encryptor = Cipher(
+            self._algorithm, modes.CBC(iv, _PKCS7), self._backend
+        ).encryptor()
+        ciphertext = encryptor.update(data) + encryptor.finalize()
+        tag = self._segment_signature(final, iv, ciphertext).finalize()
+        self._index += 1
+        return iv + ciphertext + tag
+
+
+class _FernetStreamDecryptor(_FernetStreamContext):
+    def __init__(self, fernet, ttl):
+        super(_FernetStreamDecryptor, self).__init__(fernet)
+        self._ttl = ttl
+        self._encrypted_segment_size = None
+
+    def update(self, data):
+        if self._buffer is None:
+            raise AlreadyFinalized("Context was already finalized.")
+        if not isinstance(data, bytes):
+            raise TypeError("data must be bytes.")
+
+        self._buffer += data
+        offset = self._read_header()
+        if self._header is None:
+            return b""
+
+        # Hold back one full segment until more data arrives, since it may
+        # turn out to be the final one.
+        size = self._encrypted_segment_size
+        out = []
+        while len(self._buffer) - offset > size:
+            out.append(self._decrypt_segment(
+                bytes(self._buffer[offset:offset + size]), 0
+            ))
+            offset += size
+        del self._buffer[:offset]
+        return b"".join(out)
+
+    def finalize(self):
+        if self._buffer is None:
+            raise AlreadyFinalized("Context was already finalized.")
+
+        offset = self._read_header()
+        if self._header is None:
+            raise InvalidToken
+        data, self._buffer = bytes(self._buffer[offset:]), None
+        if len(data) < _stream_segment_length(0):
+            raise InvalidToken
+        return self._decrypt_segment(data, 1)
+
+    def _read_header(self):
+        if self._header is not None:
+            return 0
+        if len(self._buffer) < _STREAM_HEADER.size:
+            return 0
+
+        header = bytes(self._buffer[:_STREAM_HEADER.size])
+        version, timestamp, segment_size, _ = _STREAM_HEADER.unpack(header)
+        if (
+            version != _STREAM_VERSION or
+            not 0 < segment_size <= _STREAM_MAX_SEGMENT_SIZE
+        ):
+            raise InvalidToken
+
+        _check_timestamp(timestamp, self._ttl)
+        self._header = header
+        self._encrypted_segment_size = _stream_segment_length(segment_size)
+        return _STREAM_HEADER.size
+
+    def _decrypt_segment(self, data, final):
+        iv = data[:16]
+        ciphertext = data[16:-32]
+        try:
+            self._segment_signature(final, iv, ciphertext).verify(data[-32:])
+        except InvalidSignature:
+            raise InvalidToken
+
+        decryptor = Cipher(
+            self._algorithm, modes.CBC(iv, _PKCS7), self._backend
+        ).decryptor()
+        plaintext = decryptor.update(ciphertext)
+        try:
+            plaintext += decryptor.finalize()
+        except ValueError:
+            raise InvalidToken
+        self._index += 1
+        return plaintext
@@ -45,6 +45,15 @@ class HashBackend(object):
         """
 
 
+@six.add_metaclass(abc.ABCMeta)
+class BatchHashBackend(object):
+    @abc.abstractmethod
+    def digest_many(self, algorithm, data):
+        """
+        Return a list with the digest of each bytes-like object in data.
+        """
+
+
 @six.add_metaclass(abc.ABCMeta)
 class HMACBackend(object):
     @abc.abstractmethod
@@ -393,3 +402,39 @@ class ScryptBackend(object):
         """
         Return bytes derived from provided Scrypt parameters.
         """
+
+
+@six.add_metaclass(abc.ABCMeta)
+class ConcatKDFBackend(object):
+    @abc.abstractmethod
+    def derive_concatkdf_hash(self, algorithm, length, otherinfo,
+                              key_material):
+        """
+        Return bytes derived with the hash variant of ConcatKDF.
+        """
+
+    @abc.abstractmethod
+    def derive_concatkdf_hmac(self, algorithm, length, salt, otherinfo,
+                              key_material):
+        """
+        Return bytes derived with the HMAC variant of ConcatKDF.
+        """
+
+
+@six.add_metaclass(abc.ABCMeta)
+class X963KDFBackend(object):
+    @abc.abstractmethod
+    def derive_x963kdf(self, algorithm, length, sharedinfo, key_material):
+        """
+        Return bytes derived with the ANSI X9.63 KDF.
+        """
+
+
+@six.add_metaclass(abc.ABCMeta)
+class AESKeyWrapBackend(object):
+    @abc.abstractmethod
+    def create_aes_key_wrap_ctx(self, wrapping_key):
+        """
+        Create a context that performs the RFC 3394 key wrap and unwrap
+        operations with the given AES key.
+        """
@@ -10,6 +10,10 @@ from cryptography.exceptions import InvalidTag
 _ENCRYPT = 1
 _DECRYPT = 0
 
+# EVP_get_cipherbyname returns static EVP_CIPHER objects, so they can be
+# resolved once per process.
+_EVP_CIPHERS = {}
+
 
 def _aead_cipher_name(cipher):
     from cryptography.hazmat.primitives.ciphers.aead import (
@@ -24,9 +28,27 @@ def _aead_cipher_name(cipher):
         return "aes-{0}-gcm".format(len(cipher._key) * 8).encode("ascii")
 
 
-def _aead_setup(backend, cipher_name, key, nonce, tag, tag_len, operation):
-    evp_cipher = backend._lib.EVP_get_cipherbyname(cipher_name)
-    backend.openssl_assert(evp_cipher != backend._ffi.NULL)
+def _aead_evp_cipher(backend, cipher_name):
+    evp_cipher = _EVP_CIPHERS.get(cipher_name)
+    if evp_cipher is None:
+        evp_cipher = backend._lib.EVP_get_cipherbyname(cipher_name)
+        backend.openssl_assert(evp_cipher != backend._ffi.NULL)
+        _EVP_CIPHERS[cipher_name] = evp_cipher
+    return evp_cipher
+
+
+def _aead_template(backend, cipher, nonce_len, tag_len, operation):
+    # Key expansion only depends on the key, but CCM also fixes the nonce
+    # and tag lengths when the key is set, so templates are kept per
+    # operation and nonce length. Each AEAD object owns its templates and
+    # they are never modified after creation, so concurrent calls can copy
+    # from them safely.
+    templates = cipher._ctx_templates
+    template = templates.get((operation, nonce_len))
+    if template is not None:
+        return template
+
+    evp_cipher = _aead_evp_cipher(backend, _aead_cipher_name(cipher))
     ctx = backend._lib.EVP_CIPHER_CTX_new()
     ctx = backend._ffi.gc(ctx, backend._lib.EVP_CIPHER_CTX_free)
     res = backend._lib.EVP_CipherInit_ex(
@@ -37,16 +59,18 @@ def _aead_setup(backend, cipher_name, key, nonce, tag, tag_len, operation):
         int(operation == _ENCRYPT)
     )
     backend.openssl_assert(res != 0)
-    res = backend._lib.EVP_CIPHER_CTX_set_key_length(ctx, len(key))
+    res = backend._lib.EVP_CIPHER_CTX_set_key_length(ctx, len(cipher._key))
     backend.openssl_assert(res != 0)
     res = backend._lib.EVP_CIPHER_CTX_ctrl(
-        ctx, backend._lib.EVP_CTRL_AEAD_SET_IVLEN, len(nonce),
+        ctx, backend._lib.EVP_CTRL_AEAD_SET_IVLEN, nonce_len,
         backend._ffi.NULL
     )
     backend.openssl_assert(res != 0)
     if operation == _DECRYPT:
+        # The real tag is set on each copy, this only fixes its length.
         res = backend._lib.EVP_CIPHER_CTX_ctrl(
-            ctx, backend._lib.EVP_CTRL_AEAD_SET_TAG, len(tag), tag
+            ctx, backend._lib.EVP_CTRL_AEAD_SET_TAG, tag_len,
+            backend._ffi.new("unsigned char[]", tag_len)
         )
         backend.openssl_assert(res != 0)
     else:
@@ -58,7 +82,33 @@ def _aead_setup(backend, cipher_name, key, nonce, tag, tag_len, operation):
         ctx,
         backend._ffi.NULL,
         backend._ffi.NULL,
-        key,
+        cipher._key,
+        backend._ffi.NULL,
+        int(operation == _ENCRYPT)
+    )
+    backend.openssl_assert(res != 0)
+    templates[(operation, nonce_len)] = ctx
+    return ctx
+
+
+def _aead_setup(backend, cipher, nonce, tag, tag_len, operation):
+    template = _aead_template(backend, cipher, len(nonce), tag_len, operation)
+    ctx = backend._lib.EVP_CIPHER_CTX_new()
+    ctx = backend._ffi.gc(ctx, backend._lib.EVP_CIPHER_CTX_free)
+    res = backend._lib.EVP_CIPHER_CTX_copy(ctx, template)
+    backend.openssl_assert(res != 0)
+    # Streaming decryption only learns the tag when it is finalized.
+    if operation == _DECRYPT and tag is not None:
+        res = backend._lib.EVP_CIPHER_CTX_ctrl(
+            ctx, backend._lib.EVP_CTRL_AEAD_SET_TAG, len(tag), tag
+        )
+        backend.openssl_assert(res != 0)
+
+    res = backend._lib.EVP_CipherInit_ex(
+        ctx,
+        backend._ffi.NULL,
+        backend._ffi.NULL,
+        backend._ffi.NULL,
         nonce,
         int(operation == _ENCRYPT)
     )
@@ -86,74 +136,154 @@ def _process_aad(backend, ctx, associated_data):
     backend.openssl_assert(res != 0)
 
 
-def _process_data(backend, ctx, data):
+def _process_data(backend, ctx, data, data_len, buf):
     outlen = backend._ffi.new("int *")
-    buf = backend._ffi.new("unsigned char[]", len(data))
-    res = backend._lib.EVP_CipherUpdate(ctx, buf, outlen, data, len(data))
+    res = backend._lib.EVP_CipherUpdate(ctx, buf, outlen, data, data_len)
     backend.openssl_assert(res != 0)
-    return backend._ffi.buffer(buf, outlen[0])[:]
+    return outlen[0]
 
 
 def _encrypt(backend, cipher, nonce, data, associated_data, tag_length):
-    from cryptography.hazmat.primitives.ciphers.aead import AESCCM
-    cipher_name = _aead_cipher_name(cipher)
-    ctx = _aead_setup(
-        backend, cipher_name, cipher._key, nonce, None, tag_length, _ENCRYPT
+    buf = backend._ffi.new("unsigned char[]", len(data) + tag_length)
+    _encrypt_to_buffer(
+        backend, cipher, nonce, data, associated_data, tag_length, buf
     )
+    return backend._ffi.buffer(buf)[:]
+
+
+def _encrypt_into(backend, cipher, nonce, data, associated_data, tag_length,
+                  buf):
+    buf = backend._ffi.cast("unsigned char *", backend._ffi.from_buffer(buf))
+    return _encrypt_to_buffer(
+        backend, cipher, nonce, data, associated_data, tag_length, buf
+    )
+
+
+def _encrypt_to_buffer(backend, cipher, nonce, data, associated_data,
+                       tag_length, buf):
+    from cryptography.hazmat.primitives.ciphers.aead import AESCCM
+    ctx = _aead_setup(backend, cipher, nonce, None, tag_length, _ENCRYPT)
     # CCM requires us to pass the length of the data before processing anything
     # However calling this with any other AEAD results in an error
     if isinstance(cipher, AESCCM):
         _set_length(backend, ctx, len(data))
 
     _process_aad(backend, ctx, associated_data)
-    processed_data = _process_data(backend, ctx, data)
+    n = _process_data(backend, ctx, data, len(data), buf)
     outlen = backend._ffi.new("int *")
     res = backend._lib.EVP_CipherFinal_ex(ctx, backend._ffi.NULL, outlen)
     backend.openssl_assert(res != 0)
     backend.openssl_assert(outlen[0] == 0)
-    tag_buf = backend._ffi.new("unsigned char[]", tag_length)
+    # The tag is written directly after the ciphertext.
     res = backend._lib.EVP_CIPHER_CTX_ctrl(
-        ctx, backend._lib.EVP_CTRL_AEAD_GET_TAG, tag_length, tag_buf
+        ctx, backend._lib.EVP_CTRL_AEAD_GET_TAG, tag_length, buf + n
     )
     backend.openssl_assert(res != 0)
-    tag = backend._ffi.buffer(tag_buf)[:]
-
-    return processed_data + tag
+    return n + tag_length
 
 
 def _decrypt(backend, cipher, nonce, data, associated_data, tag_length):
-    from cryptography.hazmat.primitives.ciphers.aead import AESCCM
     if len(data) < tag_length:
         raise InvalidTag
-    tag = data[-tag_length:]
-    data = data[:-tag_length]
-    cipher_name = _aead_cipher_name(cipher)
-    ctx = _aead_setup(
-        backend, cipher_name, cipher._key, nonce, tag, tag_length, _DECRYPT
+    buf = backend._ffi.new("unsigned char[]", len(data) - tag_length)
+    n = _decrypt_to_buffer(
+        backend, cipher, nonce, data, associated_data, tag_length, buf
+    )
+    return backend._ffi.buffer(buf, n)[:]
+
+
+def _decrypt_into(backend, cipher, nonce, data, associated_data, tag_length,
+                  buf):
+    if len(data) < tag_length:
+        raise InvalidTag
+    buf = backend._ffi.cast("unsigned char *", backend._ffi.from_buffer(buf))
+    return _decrypt_to_buffer(
+        backend, cipher, nonce, data, associated_data, tag_length, buf
     )
+
+
+def _decrypt_to_buffer(backend, cipher, nonce, data, associated_data,
+                       tag_length, buf):
+    from cryptography.hazmat.primitives.ciphers.aead import AESCCM
+    data_len = len(data) - tag_length
+    tag = data[data_len:]
+    ctx = _aead_setup(backend, cipher, nonce, tag, tag_length, _DECRYPT)
     # CCM requires us to pass the length of the data before processing anything
     # However calling this with any other AEAD results in an error
     if isinstance(cipher, AESCCM):
-        _set_length(backend, ctx, len(data))
+        _set_length(backend, ctx, data_len)
 
     _process_aad(backend, ctx, associated_data)
     # CCM has a different error path if the tag doesn't match. Errors are
     # raised in Update and Final is irrelevant.
+    outlen = backend._ffi.new("int *")
+    res = backend._lib.EVP_CipherUpdate(ctx, buf, outlen, data, data_len)
     if isinstance(cipher, AESCCM):
-        outlen = backend._ffi.new("int *")
-        buf = backend._ffi.new("unsigned char[]", len(data))
-        res = backend._lib.EVP_CipherUpdate(ctx, buf, outlen, data, len(data))
         if res != 1:
             backend._consume_errors()
+            _wipe(backend, buf, data_len)
             raise InvalidTag
-
-        processed_data = backend._ffi.buffer(buf, outlen[0])[:]
     else:
-        processed_data = _process_data(backend, ctx, data)
-        outlen = backend._ffi.new("int *")
-        res = backend._lib.EVP_CipherFinal_ex(ctx, backend._ffi.NULL, outlen)
+        backend.openssl_assert(res != 0)
+        finallen = backend._ffi.new("int *")
+        res = backend._lib.EVP_CipherFinal_ex(
+            ctx, backend._ffi.NULL, finallen
+        )
         if res == 0:
             backend._consume_errors()
+            # Don't leave unauthenticated plaintext in the caller's buffer.
+            _wipe(backend, buf, data_len)
             raise InvalidTag
 
-    return processed_data
+    return outlen[0]
+
+
+def _stream_setup(backend, cipher, nonce, associated_data, tag_length,
+                  operation):
+    ctx = _aead_setup(backend, cipher, nonce, None, tag_length, operation)
+    _process_aad(backend, ctx, associated_data)
+    return ctx
+
+
+def _stream_update(backend, ctx, data):
+    buf = backend._ffi.new("unsigned char[]", len(data))
+    n = _process_data(
+        backend, ctx, backend._ffi.from_buffer(data), len(data), buf
+    )
+    return backend._ffi.buffer(buf, n)[:]
+
+
+def _stream_update_into(backend, ctx, data, buf):
+    buf = backend._ffi.cast("unsigned char *", backend._ffi.from_buffer(buf))
+    return _process_data(
+        backend, ctx, backend._ffi.from_buffer(data), len(data), buf
+    )
+
+
+def _stream_finalize_encrypt(backend, ctx, tag_length):
+    outlen = backend._ffi.new("int *")
+    res = backend._lib.EVP_CipherFinal_ex(ctx, backend._ffi.NULL, outlen)
+    backend.openssl_assert(res != 0)
+    backend.openssl_assert(outlen[0] == 0)
+    tag_buf = backend._ffi.new("unsigned char[]", tag_length)
+    res = backend._lib.EVP_CIPHER_CTX_ctrl(
+        ctx, backend._lib.EVP_CTRL_AEAD_GET_TAG, tag_length, tag_buf
+    )
+    backend.openssl_assert(res != 0)
+    return backend._ffi.buffer(tag_buf)[:]
+
+
+def _stream_finalize_decrypt(backend, ctx, tag):
+    res = backend._lib.EVP_CIPHER_CTX_ctrl(
+        ctx, backend._lib.EVP_CTRL_AEAD_SET_TAG, len(tag), tag
+    )
+    backend.openssl_assert(res != 0)
+    outlen = backend._ffi.new("int *")
+    res = backend._lib.EVP_CipherFinal_ex(ctx, backend._ffi.NULL, outlen)
+    if res == 0:
+        backend._consume_errors()
+        raise InvalidTag
+
+
+def _wipe(backend, buf, length):
+    backend._ffi.memmove(buf, b"\x00" * length, length)
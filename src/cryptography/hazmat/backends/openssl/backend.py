@@ -18,9 +18,11 @@ import six
 from cryptography import utils, x509
 from cryptography.exceptions import UnsupportedAlgorithm, _Reasons
 from cryptography.hazmat.backends.interfaces import (
-    CMACBackend, CipherBackend, DERSerializationBackend, DHBackend, DSABackend,
+    AESKeyWrapBackend, BatchHashBackend, CMACBackend, CipherBackend,
+    ConcatKDFBackend, DERSerializationBackend, DHBackend, DSABackend,
     EllipticCurveBackend, HMACBackend, HashBackend, PBKDF2HMACBackend,
-    PEMSerializationBackend, RSABackend, ScryptBackend, X509Backend
+    PEMSerializationBackend, RSABackend, ScryptBackend, X509Backend,
+    X963KDFBackend
 )
 from cryptography.hazmat.backends.openssl import aead
 from cryptography.hazmat.backends.openssl.ciphers import _CipherContext
@@ -41,8 +43,11 @@ from cryptography.hazmat.backends.openssl.encode_asn1 import (
     _OCSP_REQUEST_EXTENSION_ENCODE_HANDLERS,
     _encode_asn1_int_gc, _encode_asn1_str_gc, _encode_name_gc, _txt2obj_gc,
 )
-from cryptography.hazmat.backends.openssl.hashes import _HashContext
+from cryptography.hazmat.backends.openssl.hashes import (
+    _HashContext, _digest_many
+)
 from cryptography.hazmat.backends.openssl.hmac import _HMACContext
+from cryptography.hazmat.backends.openssl.keywrap import _AESKeyWrapContext
 from cryptography.hazmat.backends.openssl.ocsp import (
     _OCSPRequest, _OCSPResponse
 )
@@ -72,10 +77,13 @@ from cryptography.hazmat.primitives.kdf import scrypt
 
 
 _MemoryBIO = collections.namedtuple("_MemoryBIO", ["bio", "char_ptr"])
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "size"])
 
 
+@utils.register_interface(BatchHashBackend)
 @utils.register_interface(CipherBackend)
 @utils.register_interface(CMACBackend)
+@utils.register_interface(ConcatKDFBackend)
 @utils.register_interface(DERSerializationBackend)
 @utils.register_interface(DHBackend)
 @utils.register_interface(DSABackend)
@@ -86,9 +94,13 @@ _MemoryBIO = collections.namedtuple("_MemoryBIO", ["bio", "char_ptr"])
 @utils.register_interface(RSABackend)
 @utils.register_interface(PEMSerializationBackend)
 @utils.register_interface(X509Backend)
+@utils.register_interface(X963KDFBackend)
 @utils.register_interface_if(
     binding.Binding().lib.Cryptography_HAS_SCRYPT, ScryptBackend
 )
+@utils.register_interface_if(
+    binding.Binding().lib.Cryptography_HAS_AES_WRAP, AESKeyWrapBackend
+)
 class Backend(object):
     """
     OpenSSL API binding interfaces.
@@ -99,8 +111,18 @@ class Backend(object):
         self._binding = binding.Binding()
         self._ffi = self._binding.ffi
         self._lib = self._binding.lib
+        # For output buffers that are always fully written before being read.
+        self._new_uninitialized = self._ffi.new_allocator(
+            should_clear_after_alloc=False
+        )
 
         self._cipher_registry = {}
+        self._evp_cipher_cache = {}
+        self._evp_cipher_cache_hits = 0
+        self._evp_cipher_cache_misses = 0
+        self._evp_md_cache = {}
+        self._evp_md_cache_hits = 0
+        self._evp_md_cache_misses = 0
         self._register_default_ciphers()
         self.activate_osrandom_engine()
         self._dh_types = [self._lib.EVP_PKEY_DH]
@@ -187,10 +209,42 @@ class Backend(object):
 
         return alg
 
+    def _evp_md(self, algorithm):
+        """
+        Returns the EVP_MD for algorithm, which may be NULL if OpenSSL doesn't
+        provide it. Digests are assumed to only depend on the algorithm's name
+        and digest size.
+        """
+        key = (algorithm.name, algorithm.digest_size)
+        try:
+            evp_md = self._evp_md_cache[key]
+        except KeyError:
+            pass
+        else:
+            self._evp_md_cache_hits += 1
+            return evp_md
+
+        evp_md = self._lib.EVP_get_digestbyname(
+            self._build_openssl_digest_name(algorithm)
+        )
+        self._evp_md_cache_misses += 1
+        self._evp_md_cache[key] = evp_md
+        return evp_md
+
+    def _evp_md_non_null(self, algorithm):
+        evp_md = self._evp_md(algorithm)
+        self.openssl_assert(evp_md != self._ffi.NULL)
+        return evp_md
+
+    def digest_cache_info(self):
+        return CacheInfo(
+            self._evp_md_cache_hits,
+            self._evp_md_cache_misses,
+            len(self._evp_md_cache)
+        )
+
     def hash_supported(self, algorithm):
-        name = self._build_openssl_digest_name(algorithm)
-        digest = self._lib.EVP_get_digestbyname(name)
-        return digest != self._ffi.NULL
+        return self._evp_md(algorithm) != self._ffi.NULL
 
     def hmac_supported(self, algorithm):
         return self.hash_supported(algorithm)
@@ -198,12 +252,14 @@ class Backend(object):
     def create_hash_ctx(self, algorithm):
         return _HashContext(self, algorithm)
 
+    def digest_many(self, algorithm, data):
+        return _digest_many(self, algorithm, data)
+
     def cipher_supported(self, cipher, mode):
         try:
-            adapter = self._cipher_registry[type(cipher), type(mode)]
+            evp_cipher = self._evp_cipher(cipher, mode)
         except KeyError:
             return False
-        evp_cipher = adapter(self, cipher, mode)
         return self._ffi.NULL != evp_cipher
 
     def register_cipher_adapter(self, cipher_cls, mode_cls, adapter):
@@ -212,6 +268,36 @@ class Backend(object):
                 cipher_cls, mode_cls)
             )
         self._cipher_registry[cipher_cls, mode_cls] = adapter
+        self._evp_cipher_cache.clear()
+
+    def _evp_cipher(self, cipher, mode):
+        """
+        Returns the EVP_CIPHER for cipher and mode, which may be NULL if
+        OpenSSL doesn't provide it. Raises KeyError if no adapter is
+        registered. Adapters are assumed to only depend on the algorithm, its
+        key size and the mode type.
+        """
+        adapter = self._cipher_registry[type(cipher), type(mode)]
+        key = (type(cipher), cipher.key_size, type(mode))
+        try:
+            evp_cipher = self._evp_cipher_cache[key]
+        except KeyError:
+            pass
+        else:
+            self._evp_cipher_cache_hits += 1
+            return evp_cipher
+
+        evp_cipher = adapter(self, cipher, mode)
+        self._evp_cipher_cache_misses += 1
+        self._evp_cipher_cache[key] = evp_cipher
+        return evp_cipher
+
+    def cipher_cache_info(self):
+        return CacheInfo(
+            self._evp_cipher_cache_hits,
+            self._evp_cipher_cache_misses,
+            len(self._evp_cipher_cache)
+        )
 
     def _register_default_ciphers(self):
         for mode_cls in [CBC, CTR, ECB, OFB, CFB, CFB8, GCM]:
@@ -282,9 +368,7 @@ class Backend(object):
     def derive_pbkdf2_hmac(self, algorithm, length, salt, iterations,
                            key_material):
         buf = self._ffi.new("unsigned char[]", length)
-        evp_md = self._lib.EVP_get_digestbyname(
-            algorithm.name.encode("ascii"))
-        self.openssl_assert(evp_md != self._ffi.NULL)
+        evp_md = self._evp_md_non_null(algorithm)
         res = self._lib.PKCS5_PBKDF2_HMAC(
             key_material,
             len(key_material),
@@ -298,6 +382,45 @@ class Backend(object):
         self.openssl_assert(res == 1)
         return self._ffi.buffer(buf)[:]
 
+    def derive_concatkdf_hash(self, algorithm, length, otherinfo,
+                              key_material):
+        return self._derive_counter_kdf(
+            algorithm, length, None, True, key_material, otherinfo
+        )
+
+    def derive_concatkdf_hmac(self, algorithm, length, salt, otherinfo,
+                              key_material):
+        return self._derive_counter_kdf(
+            algorithm, length, salt, True, key_material, otherinfo
+        )
+
+    def derive_x963kdf(self, algorithm, length, sharedinfo, key_material):
+        return self._derive_counter_kdf(
+            algorithm, length, None, False, key_material, sharedinfo
+        )
+
+    def _derive_counter_kdf(self, algorithm, length, key, counter_first,
+                            key_material, info):
+        evp_md = self._evp_md(algorithm)
+        if evp_md == self._ffi.NULL:
+            raise UnsupportedAlgorithm(
+                "{0} is not a supported hash on this backend.".format(
+                    algorithm.name),
+                _Reasons.UNSUPPORTED_HASH
+            )
+        if key is None:
+            key = self._ffi.NULL
+            key_len = 0
+        else:
+            key_len = len(key)
+        buf = self._new_uninitialized("unsigned char[]", length)
+        res = self._lib.Cryptography_counter_kdf(
+            evp_md, key, key_len, counter_first, key_material,
+            len(key_material), info, len(info), buf, length
+        )
+        self.openssl_assert(res == 1)
+        return self._ffi.buffer(buf)[:]
+
     def _consume_errors(self):
         return binding._consume_errors(self._lib)
 
@@ -668,6 +791,9 @@ class Backend(object):
     def create_cmac_ctx(self, algorithm):
         return _CMACContext(self, algorithm)
 
+    def create_aes_key_wrap_ctx(self, wrapping_key):
+        return _AESKeyWrapContext(self, wrapping_key)
+
     def create_x509_csr(self, builder, private_key, algorithm):
         if not isinstance(algorithm, hashes.HashAlgorithm):
             raise TypeError('Algorithm must be a registered hash algorithm.')
@@ -681,10 +807,7 @@ class Backend(object):
             )
 
         # Resolve the signature algorithm.
-        evp_md = self._lib.EVP_get_digestbyname(
-            algorithm.name.encode('ascii')
-        )
-        self.openssl_assert(evp_md != self._ffi.NULL)
+        evp_md = self._evp_md_non_null(algorithm)
 
         # Create an empty request.
         x509_req = self._lib.X509_REQ_new()
@@ -763,10 +886,7 @@ class Backend(object):
             )
 
         # Resolve the signature algorithm.
-        evp_md = self._lib.EVP_get_digestbyname(
-            algorithm.name.encode('ascii')
-        )
-        self.openssl_assert(evp_md != self._ffi.NULL)
+        evp_md = self._evp_md_non_null(algorithm)
 
         # Create an empty certificate.
         x509_cert = self._lib.X509_new()
@@ -865,10 +985,7 @@ class Backend(object):
                 "MD5 is not a supported hash algorithm for EC/DSA CRLs"
             )
 
-        evp_md = self._lib.EVP_get_digestbyname(
-            algorithm.name.encode('ascii')
-        )
-        self.openssl_assert(evp_md != self._ffi.NULL)
+        evp_md = self._evp_md_non_null(algorithm)
 
         # Create an empty CRL.
         x509_crl = self._lib.X509_CRL_new()
@@ -1457,9 +1574,7 @@ class Backend(object):
         self.openssl_assert(ocsp_req != self._ffi.NULL)
         ocsp_req = self._ffi.gc(ocsp_req, self._lib.OCSP_REQUEST_free)
         cert, issuer, algorithm = builder._request
-        evp_md = self._lib.EVP_get_digestbyname(
-            algorithm.name.encode("ascii"))
-        self.openssl_assert(evp_md != self._ffi.NULL)
+        evp_md = self._evp_md_non_null(algorithm)
         certid = self._lib.OCSP_cert_to_id(
             evp_md, cert._x509, issuer._x509
         )
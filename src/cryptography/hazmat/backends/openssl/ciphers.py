@@ -35,9 +35,8 @@ class _CipherContext(object):
             ctx, self._backend._lib.EVP_CIPHER_CTX_free
         )
 
-        registry = self._backend._cipher_registry
         try:
-            adapter = registry[type(cipher), type(mode)]
+            evp_cipher = self._backend._evp_cipher(cipher, mode)
         except KeyError:
             raise UnsupportedAlgorithm(
                 "cipher {0} in {1} mode is not supported "
@@ -46,7 +45,6 @@ class _CipherContext(object):
                 _Reasons.UNSUPPORTED_CIPHER
             )
 
-        evp_cipher = adapter(self._backend, cipher, mode)
         if evp_cipher == self._backend._ffi.NULL:
             raise UnsupportedAlgorithm(
                 "cipher {0} in {1} mode is not supported "
@@ -110,31 +108,53 @@ class _CipherContext(object):
             operation
         )
         self._backend.openssl_assert(res != 0)
-        # We purposely disable padding here as it's handled higher up in the
-        # API.
-        self._backend._lib.EVP_CIPHER_CTX_set_padding(ctx, 0)
+        # Padding is handled higher up in the API, unless the mode asks
+        # OpenSSL to do it.
+        self._padded = isinstance(mode, modes.CBC) and mode.padding is not None
+        self._backend._lib.EVP_CIPHER_CTX_set_padding(ctx, int(self._padded))
+        if self._padded and operation == self._DECRYPT:
+            # OpenSSL holds back the last block it decrypted until it knows
+            # whether it is the final one, and writes it out with the next
+            # update.
+            self._update_overhead = self._block_size_bytes
+        else:
+            self._update_overhead = self._block_size_bytes - 1
         self._ctx = ctx
+        self._outlen = self._backend._ffi.new("int *")
+        self._cleaned_up = False
+        self._template = None
 
     def update(self, data):
-        buf = bytearray(len(data) + self._block_size_bytes - 1)
-        n = self.update_into(data, buf)
-        return bytes(buf[:n])
+        # The output is only ever read up to the length OpenSSL reports, so
+        # the buffer doesn't need to be zeroed, and copying it out once gives
+        # the result.
+        buf = self._backend._new_uninitialized(
+            "unsigned char[]", len(data) + self._update_overhead
+        )
+        n = self._update(data, buf)
+        return self._backend._ffi.buffer(buf, n)[:]
 
     def update_into(self, data, buf):
-        if len(buf) < (len(data) + self._block_size_bytes - 1):
+        if len(buf) < (len(data) + self._update_overhead):
             raise ValueError(
                 "buffer must be at least {0} bytes for this "
-                "payload".format(len(data) + self._block_size_bytes - 1)
+                "payload".format(len(data) + self._update_overhead)
             )
 
         buf = self._backend._ffi.cast(
             "unsigned char *", self._backend._ffi.from_buffer(buf)
         )
-        outlen = self._backend._ffi.new("int *")
-        res = self._backend._lib.EVP_CipherUpdate(self._ctx, buf, outlen,
-                                                  data, len(data))
+        return self._update(data, buf)
+
+    def _update(self, data, buf):
+        if isinstance(data, bytes):
+            data_buf = data
+        else:
+            data_buf = self._backend._ffi.from_buffer(data)
+        res = self._backend._lib.EVP_CipherUpdate(self._ctx, buf, self._outlen,
+                                                  data_buf, len(data))
         self._backend.openssl_assert(res != 0)
-        return outlen[0]
+        return self._outlen[0]
 
     def finalize(self):
         # OpenSSL 1.0.1 on Ubuntu 12.04 (and possibly other distributions)
@@ -163,6 +183,11 @@ class _CipherContext(object):
             if not errors and isinstance(self._mode, modes.GCM):
                 raise InvalidTag
 
+            if self._padded and self._operation == self._DECRYPT:
+                # Bad padding and a bad ciphertext length get the same error,
+                # like the unpadders in the padding module.
+                raise ValueError("Invalid padding bytes.")
+
             self._backend.openssl_assert(
                 errors[0]._lib_reason_match(
                     self._backend._lib.ERR_LIB_EVP,
@@ -188,8 +213,93 @@ class _CipherContext(object):
 
         res = self._backend._lib.EVP_CIPHER_CTX_cleanup(self._ctx)
         self._backend.openssl_assert(res == 1)
+        self._cleaned_up = True
         return self._backend._ffi.buffer(buf)[:outlen[0]]
 
+    def reset(self, iv):
+        if isinstance(self._cipher, modes.ModeWithNonce):
+            cipher = type(self._cipher)(self._cipher.key, iv)
+            mode = self._mode
+            iv_nonce = cipher.nonce
+        elif isinstance(self._mode, (
+            modes.ModeWithInitializationVector, modes.ModeWithNonce,
+            modes.ModeWithTweak
+        )):
+            cipher = self._cipher
+            if isinstance(self._mode, modes.CBC):
+                mode = modes.CBC(iv, self._mode.padding)
+            else:
+                mode = type(self._mode)(iv)
+            mode.validate_for_algorithm(cipher)
+            iv_nonce = iv
+        elif self._mode is None:
+            # Re-initialising without the key would continue the keystream
+            # instead of restarting it.
+            raise TypeError("{0} cannot be reset.".format(self._cipher.name))
+        else:
+            if iv is not None:
+                raise ValueError("iv must be None for this mode.")
+            cipher = self._cipher
+            mode = self._mode
+            iv_nonce = self._backend._ffi.NULL
+
+        if self._cleaned_up:
+            # finalize cleared the cipher and key schedule. The first reset
+            # after that expands the key again into a template context, which
+            # this and later resets copy instead of expanding it each time.
+            if self._template is None:
+                self._template = self._keyed_template(cipher, mode)
+            res = self._backend._lib.EVP_CIPHER_CTX_copy(
+                self._ctx, self._template
+            )
+            self._backend.openssl_assert(res != 0)
+        # Passing only the IV keeps the cipher and the expanded key, and
+        # clears any buffered partial block.
+        res = self._backend._lib.EVP_CipherInit_ex(
+            self._ctx,
+            self._backend._ffi.NULL,
+            self._backend._ffi.NULL,
+            self._backend._ffi.NULL,
+            iv_nonce,
+            self._operation
+        )
+        self._backend.openssl_assert(res != 0)
+        self._backend._lib.EVP_CIPHER_CTX_set_padding(
+            self._ctx, int(self._padded)
+        )
+        self._cleaned_up = False
+        self._cipher = cipher
+        self._mode = mode
+
+    def _keyed_template(self, cipher, mode):
+        ctx = self._backend._lib.EVP_CIPHER_CTX_new()
+        ctx = self._backend._ffi.gc(
+            ctx, self._backend._lib.EVP_CIPHER_CTX_free
+        )
+        res = self._backend._lib.EVP_CipherInit_ex(
+            ctx,
+            self._backend._evp_cipher(cipher, mode),
+            self._backend._ffi.NULL,
+            self._backend._ffi.NULL,
+            self._backend._ffi.NULL,
+            self._operation
+        )
+        self._backend.openssl_assert(res != 0)
+        res = self._backend._lib.EVP_CIPHER_CTX_set_key_length(
+            ctx, len(cipher.key)
+        )
+        self._backend.openssl_assert(res != 0)
+        res = self._backend._lib.EVP_CipherInit_ex(
+            ctx,
+            self._backend._ffi.NULL,
+            self._backend._ffi.NULL,
+            cipher.key,
+            self._backend._ffi.NULL,
+            self._operation
+        )
+        self._backend.openssl_assert(res != 0)
+        return ctx
+
     def finalize_with_tag(self, tag):
         if (
             self._backend._lib.CRYPTOGRAPHY_OPENSSL_LESS_THAN_102 and
@@ -22,9 +22,9 @@ class _HashContext(object):
             ctx = self._backend._ffi.gc(
                 ctx, self._backend._lib.Cryptography_EVP_MD_CTX_free
             )
-            name = self._backend._build_openssl_digest_name(algorithm)
-            evp_md = self._backend._lib.EVP_get_digestbyname(name)
+            evp_md = self._backend._evp_md(algorithm)
             if evp_md == self._backend._ffi.NULL:
+                name = self._backend._build_openssl_digest_name(algorithm)
                 raise UnsupportedAlgorithm(
                     "{0} is not a supported hash on this backend.".format(
                         name),
@@ -48,7 +48,13 @@ class _HashContext(object):
         return _HashContext(self._backend, self.algorithm, ctx=copied_ctx)
 
     def update(self, data):
-        res = self._backend._lib.EVP_DigestUpdate(self._ctx, data, len(data))
+        if isinstance(data, bytes):
+            data_buf = data
+        else:
+            data_buf = self._backend._ffi.from_buffer(data)
+        res = self._backend._lib.EVP_DigestUpdate(
+            self._ctx, data_buf, len(data)
+        )
         self._backend.openssl_assert(res != 0)
 
     def finalize(self):
@@ -59,3 +65,26 @@ class _HashContext(object):
         self._backend.openssl_assert(res != 0)
         self._backend.openssl_assert(outlen[0] == self.algorithm.digest_size)
         return self._backend._ffi.buffer(buf)[:outlen[0]]
+
+
+def _digest_many(backend, algorithm, data):
+    # One context is re-initialised for every item, so the digest is only
+    # looked up once and nothing is allocated per item except the result.
+    ctx = _HashContext(backend, algorithm)._ctx
+    evp_md = backend._lib.EVP_MD_CTX_md(ctx)
+    buf = backend._ffi.new("unsigned char[]", backend._lib.EVP_MAX_MD_SIZE)
+    outlen = backend._ffi.new("unsigned int *")
+    digests = []
+    for item in data:
+        if not isinstance(item, bytes):
+            item = backend._ffi.from_buffer(item)
+        res = backend._lib.EVP_DigestInit_ex(ctx, evp_md, backend._ffi.NULL)
+        backend.openssl_assert(res != 0)
+        res = backend._lib.EVP_DigestUpdate(ctx, item, len(item))
+        backend.openssl_assert(res != 0)
+        res = backend._lib.EVP_DigestFinal_ex(ctx, buf, outlen)
+        backend.openssl_assert(res != 0)
+        backend.openssl_assert(outlen[0] == algorithm.digest_size)
+        digests.append(backend._ffi.buffer(buf, outlen[0])[:])
+
+    return digests
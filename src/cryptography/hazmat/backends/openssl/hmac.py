@@ -25,9 +25,9 @@ class _HMACContext(object):
             ctx = self._backend._ffi.gc(
                 ctx, self._backend._lib.Cryptography_HMAC_CTX_free
             )
-            name = self._backend._build_openssl_digest_name(algorithm)
-            evp_md = self._backend._lib.EVP_get_digestbyname(name)
+            evp_md = self._backend._evp_md(algorithm)
             if evp_md == self._backend._ffi.NULL:
+                name = self._backend._build_openssl_digest_name(algorithm)
                 raise UnsupportedAlgorithm(
                     "{0} is not a supported hash on this backend".format(name),
                     _Reasons.UNSUPPORTED_HASH
@@ -55,12 +55,14 @@ class _HMACContext(object):
         )
 
     def update(self, data):
-        res = self._backend._lib.HMAC_Update(self._ctx, data, len(data))
+        data_ptr = self._backend._ffi.from_buffer(data)
+        res = self._backend._lib.HMAC_Update(self._ctx, data_ptr, len(data))
         self._backend.openssl_assert(res != 0)
 
     def finalize(self):
-        buf = self._backend._ffi.new("unsigned char[]",
-                                     self._backend._lib.EVP_MAX_MD_SIZE)
+        buf = self._backend._new_uninitialized(
+            "unsigned char[]", self._backend._lib.EVP_MAX_MD_SIZE
+        )
         outlen = self._backend._ffi.new("unsigned int *")
         res = self._backend._lib.HMAC_Final(self._ctx, buf, outlen)
         self._backend.openssl_assert(res != 0)
@@ -0,0 +1,59 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+
+class _AESKeyWrapContext(object):
+    def __init__(self, backend, wrapping_key):
+        self._backend = backend
+        self._wrapping_key = wrapping_key
+        self._encrypt_key = None
+        self._decrypt_key = None
+
+    def _aes_key(self, set_key):
+        ffi = self._backend._ffi
+        lib = self._backend._lib
+        # The key schedule is as secret as the key, so wipe it when it's
+        # freed.
+        aes_key = ffi.gc(
+            ffi.new("AES_KEY *"),
+            lambda key: lib.OPENSSL_cleanse(key, ffi.sizeof("AES_KEY"))
+        )
+        res = set_key(
+            self._wrapping_key, len(self._wrapping_key) * 8, aes_key
+        )
+        self._backend.openssl_assert(res == 0)
+        return aes_key
+
+    def wrap(self, a, data):
+        if self._encrypt_key is None:
+            self._encrypt_key = self._aes_key(
+                self._backend._lib.AES_set_encrypt_key
+            )
+        buf = self._backend._new_uninitialized(
+            "unsigned char[]", len(data) + 8
+        )
+        res = self._backend._lib.AES_wrap_key(
+            self._encrypt_key, a, buf, data, len(data)
+        )
+        self._backend.openssl_assert(res == len(data) + 8)
+        return self._backend._ffi.buffer(buf)[:]
+
+    def unwrap(self, wrapped):
+        if self._decrypt_key is None:
+            self._decrypt_key = self._aes_key(
+                self._backend._lib.AES_set_decrypt_key
+            )
+        a = self._backend._new_uninitialized("unsigned char[]", 8)
+        buf = self._backend._new_uninitialized(
+            "unsigned char[]", len(wrapped) - 8
+        )
+        res = self._backend._lib.Cryptography_AES_unwrap_key_raw(
+            self._decrypt_key, a, buf, wrapped, len(wrapped)
+        )
+        self._backend.openssl_assert(res == len(wrapped) - 8)
+        return (
+            self._backend._ffi.buffer(a)[:], self._backend._ffi.buffer(buf)[:]
+        )
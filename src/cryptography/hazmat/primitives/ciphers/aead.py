@@ -5,10 +5,22 @@
 from __future__ import absolute_import, division, print_function
 
 import os
+import struct
+
+import six
 
 from cryptography import exceptions, utils
 from cryptography.hazmat.backends.openssl import aead
 from cryptography.hazmat.backends.openssl.backend import backend
+from cryptography.hazmat.primitives import ciphers, hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+
+def _check_buffer(buf, length):
+    if len(buf) < length:
+        raise ValueError(
+            "buffer must be at least {0} bytes for this payload".format(length)
+        )
 
 
 class ChaCha20Poly1305(object):
@@ -26,6 +38,7 @@ class ChaCha20Poly1305(object):
             raise ValueError("ChaCha20Poly1305 key must be 32 bytes.")
 
         self._key = key
+        self._ctx_templates = {}
 
     @classmethod
     def generate_key(cls):
@@ -55,6 +68,60 @@ class ChaCha20Poly1305(object):
             backend, self, nonce, data, associated_data, 16
         )
 
+    def encrypt_into(self, nonce, data, associated_data, buf):
+        if associated_data is None:
+            associated_data = b""
+
+        if len(data) > self._MAX_SIZE or len(associated_data) > self._MAX_SIZE:
+            # This is OverflowError to match what cffi would raise
+            raise OverflowError(
+                "Data or associated data too long. Max 2**32 bytes"
+            )
+
+        self._check_params(nonce, data, associated_data)
+        _check_buffer(buf, len(data) + 16)
+        return aead._encrypt_into(
+            backend, self, nonce, data, associated_data, 16, buf
+        )
+
+    def decrypt_into(self, nonce, data, associated_data, buf):
+        if associated_data is None:
+            associated_data = b""
+
+        self._check_params(nonce, data, associated_data)
+        _check_buffer(buf, len(data) - 16)
+        return aead._decrypt_into(
+            backend, self, nonce, data, associated_data, 16, buf
+        )
+
+    def encryptor(self, nonce, associated_data):
+        if associated_data is None:
+            associated_data = b""
+
+        if len(associated_data) > self._MAX_SIZE:
+            # This is OverflowError to match what cffi would raise
+            raise OverflowError("Associated data too long. Max 2**32 bytes")
+
+        self._check_params(nonce, b"", associated_data)
+        ctx = aead._stream_setup(
+            backend, self, nonce, associated_data, 16, aead._ENCRYPT
+        )
+        return _AEADStreamEncryptionContext(ctx, 16)
+
+    def decryptor(self, nonce, associated_data, release_unverified=False):
+        if associated_data is None:
+            associated_data = b""
+
+        if len(associated_data) > self._MAX_SIZE:
+            # This is OverflowError to match what cffi would raise
+            raise OverflowError("Associated data too long. Max 2**32 bytes")
+
+        self._check_params(nonce, b"", associated_data)
+        ctx = aead._stream_setup(
+            backend, self, nonce, associated_data, 16, aead._DECRYPT
+        )
+        return _AEADStreamDecryptionContext(ctx, 16, release_unverified)
+
     def _check_params(self, nonce, data, associated_data):
         utils._check_bytes("nonce", nonce)
         utils._check_bytes("data", data)
@@ -72,6 +139,7 @@ class AESCCM(object):
             raise ValueError("AESCCM key must be 128, 192, or 256 bits.")
 
         self._key = key
+        self._ctx_templates = {}
         if not isinstance(tag_length, int):
             raise TypeError("tag_length must be an integer")
 
@@ -121,6 +189,33 @@ class AESCCM(object):
             backend, self, nonce, data, associated_data, self._tag_length
         )
 
+    def encrypt_into(self, nonce, data, associated_data, buf):
+        if associated_data is None:
+            associated_data = b""
+
+        if len(data) > self._MAX_SIZE or len(associated_data) > self._MAX_SIZE:
+            # This is OverflowError to match what cffi would raise
+            raise OverflowError(
+                "Data or associated data too long. Max 2**32 bytes"
+            )
+
+        self._check_params(nonce, data, associated_data)
+        self._validate_lengths(nonce, len(data))
+        _check_buffer(buf, len(data) + self._tag_length)
+        return aead._encrypt_into(
+            backend, self, nonce, data, associated_data, self._tag_length, buf
+        )
+
+    def decrypt_into(self, nonce, data, associated_data, buf):
+        if associated_data is None:
+            associated_data = b""
+
+        self._check_params(nonce, data, associated_data)
+        _check_buffer(buf, len(data) - self._tag_length)
+        return aead._decrypt_into(
+            backend, self, nonce, data, associated_data, self._tag_length, buf
+        )
+
     def _validate_lengths(self, nonce, data_len):
         # For information about computing this, see
         # https://tools.ietf.org/html/rfc3610#section-2.1
@@ -145,6 +240,7 @@ class AESGCM(object):
             raise ValueError("AESGCM key must be 128, 192, or 256 bits.")
 
         self._key = key
+        self._ctx_templates = {}
 
     @classmethod
     def generate_key(cls, bit_length):
@@ -180,9 +276,399 @@ class AESGCM(object):
             backend, self, nonce, data, associated_data, 16
         )
 
+    def encrypt_into(self, nonce, data, associated_data, buf):
+        if associated_data is None:
+            associated_data = b""
+
+        if len(data) > self._MAX_SIZE or len(associated_data) > self._MAX_SIZE:
+            # This is OverflowError to match what cffi would raise
+            raise OverflowError(
+                "Data or associated data too long. Max 2**32 bytes"
+            )
+
+        self._check_params(nonce, data, associated_data)
+        _check_buffer(buf, len(data) + 16)
+        return aead._encrypt_into(
+            backend, self, nonce, data, associated_data, 16, buf
+        )
+
+    def decrypt_into(self, nonce, data, associated_data, buf):
+        if associated_data is None:
+            associated_data = b""
+
+        self._check_params(nonce, data, associated_data)
+        _check_buffer(buf, len(data) - 16)
+        return aead._decrypt_into(
+            backend, self, nonce, data, associated_data, 16, buf
+        )
+
+    def encryptor(self, nonce, associated_data):
+        if associated_data is None:
+            associated_data = b""
+
+        if len(associated_data) > self._MAX_SIZE:
+            # This is OverflowError to match what cffi would raise
+            raise OverflowError("Associated data too long. Max 2**32 bytes")
+
+        self._check_params(nonce, b"", associated_data)
+        ctx = aead._stream_setup(
+            backend, self, nonce, associated_data, 16, aead._ENCRYPT
+        )
+        return _AEADStreamEncryptionContext(ctx, 16)
+
+    def decryptor(self, nonce, associated_data, release_unverified=False):
+        if associated_data is None:
+            associated_data = b""
+
+        if len(associated_data) > self._MAX_SIZE:
+            # This is OverflowError to match what cffi would raise
+            raise OverflowError("Associated data too long. Max 2**32 bytes")
+
+        self._check_params(nonce, b"", associated_data)
+        ctx = aead._stream_setup(
+            backend, self, nonce, associated_data, 16, aead._DECRYPT
+        )
+        return _AEADStreamDecryptionContext(ctx, 16, release_unverified)
+
     def _check_params(self, nonce, data, associated_data):
         utils._check_bytes("nonce", nonce)
         utils._check_bytes("data", data)
         utils._check_bytes("associated_data", associated_data)
         if len(nonce) == 0:
             raise ValueError("Nonce must be at least 1 byte")
+
+
+class SegmentedAEAD(object):
+    _SALT_LENGTH = 16
+    _NONCE_PREFIX_LENGTH = 7
+    _HEADER_LENGTH = _SALT_LENGTH + _NONCE_PREFIX_LENGTH
+    _MAX_SEGMENT_SIZE = 2 ** 24
+    _MAX_SEGMENTS = 2 ** 32
+
+    def __init__(self, key, segment_size=2 ** 16, algorithm=AESGCM):
+        if algorithm not in (AESGCM, ChaCha20Poly1305):
+            raise TypeError("algorithm must be AESGCM or ChaCha20Poly1305.")
+        # Constructing the algorithm validates the key (and whether it is
+        # supported) exactly as direct use would.
+        algorithm(key)
+        if not isinstance(segment_size, six.integer_types):
+            raise TypeError("segment_size must be an integer.")
+        if not 1 <= segment_size <= self._MAX_SEGMENT_SIZE:
+            raise ValueError(
+                "segment_size must be between 1 and {0}.".format(
+                    self._MAX_SEGMENT_SIZE
+                )
+            )
+
+        self._key = key
+        self._segment_size = segment_size
+        self._algorithm = algorithm
+        self._last_header = None
+
+    segment_size = utils.read_only_property("_segment_size")
+
+    def generate_header(self):
+        return os.urandom(self._HEADER_LENGTH)
+
+    def ciphertext_length(self, plaintext_length):
+        segments = max(
+            (plaintext_length + self._segment_size - 1) // self._segment_size,
+            1
+        )
+        return self._HEADER_LENGTH + plaintext_length + segments * 16
+
+    def encrypt_segment(self, header, index, data, last, associated_data):
+        utils._check_bytes("data", data)
+        if len(data) > self._segment_size:
+            raise ValueError("data must be at most segment_size bytes.")
+        if not last and len(data) != self._segment_size:
+            raise ValueError(
+                "Only the last segment may be shorter than segment_size."
+            )
+        aead, nonce, associated_data = self._segment_params(
+            header, index, last, associated_data
+        )
+        return aead.encrypt(nonce, data, associated_data)
+
+    def decrypt_segment(self, header, index, data, last, associated_data):
+        aead, nonce, associated_data = self._segment_params(
+            header, index, last, associated_data
+        )
+        return aead.decrypt(nonce, data, associated_data)
+
+    def encryptor(self, associated_data):
+        return _SegmentedAEADEncryptor(
+            self, self.generate_header(), associated_data
+        )
+
+    def decryptor(self, associated_data):
+        return _SegmentedAEADDecryptor(self, associated_data)
+
+    def decrypt_range(self, fileobj, offset, length, associated_data):
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must not be negative.")
+
+        fileobj.seek(0)
+        header = fileobj.read(self._HEADER_LENGTH)
+        if len(header) != self._HEADER_LENGTH:
+            raise exceptions.InvalidTag
+        fileobj.seek(0, os.SEEK_END)
+        ciphertext_length = fileobj.tell() - self._HEADER_LENGTH
+        if ciphertext_length < 16:
+            raise exceptions.InvalidTag
+
+        encrypted_size = self._segment_size + 16
+        segments = (ciphertext_length + encrypted_size - 1) // encrypted_size
+        if length == 0:
+            return b""
+        first = offset // self._segment_size
+        last = min(
+            (offset + length - 1) // self._segment_size, segments - 1
+        )
+        if first > last:
+            return b""
+
+        fileobj.seek(self._HEADER_LENGTH + first * encrypted_size)
+        plaintext = b"".join(
+            self.decrypt_segment(
+                header, index, fileobj.read(encrypted_size),
+                index == segments - 1, associated_data
+            )
+            for index in six.moves.range(first, last + 1)
+        )
+        start = offset - first * self._segment_size
+        return plaintext[start:start + length]
+
+    def _segment_params(self, header, index, last, associated_data):
+        utils._check_bytes("header", header)
+        if associated_data is None:
+            associated_data = b""
+        utils._check_bytes("associated_data", associated_data)
+        if len(header) != self._HEADER_LENGTH:
+            raise ValueError(
+                "header must be {0} bytes.".format(self._HEADER_LENGTH)
+            )
+        if not 0 <= index < self._MAX_SEGMENTS:
+            raise ValueError("Segment index out of range.")
+
+        nonce = header[self._SALT_LENGTH:] + struct.pack(
+            ">IB", index, int(bool(last))
+        )
+        return self._header_aead(header), nonce, associated_data
+
+    def _header_aead(self, header):
+        # Encrypting or decrypting a message uses the same header for every
+        # segment, so the key derived for the most recent one is kept.
+        cached = self._last_header
+        if cached is not None and cached[0] == header:
+            return cached[1]
+
+        hkdf = HKDF(
+            algorithm=hashes.SHA256(),
+            length=len(self._key),
+            salt=header[:self._SALT_LENGTH],
+            info=b"cryptography segmented aead",
+            backend=backend
+        )
+        aead = self._algorithm(hkdf.derive(self._key))
+        self._last_header = (header, aead)
+        return aead
+
+
+class _SegmentedAEADEncryptor(object):
+    def __init__(self, segmented, header, associated_data):
+        self._segmented = segmented
+        self._header = header
+        self._associated_data = associated_data
+        self._buffer = bytearray()
+        self._index = 0
+        self._started = False
+
+    def update(self, data):
+        if self._buffer is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        utils._check_byteslike("data", data)
+        self._buffer += data
+        size = self._segmented.segment_size
+        out = [self._start()]
+        # A full segment is only known not to be the last one once more data
+        # follows it.
+        offset = 0
+        while len(self._buffer) - offset > size:
+            out.append(self._segment(
+                bytes(self._buffer[offset:offset + size]), False
+            ))
+            offset += size
+        del self._buffer[:offset]
+        return b"".join(out)
+
+    def finalize(self):
+        if self._buffer is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        out = self._start() + self._segment(bytes(self._buffer), True)
+        self._buffer = None
+        return out
+
+    def _start(self):
+        if self._started:
+            return b""
+        self._started = True
+        return self._header
+
+    def _segment(self, data, last):
+        segment = self._segmented.encrypt_segment(
+            self._header, self._index, data, last, self._associated_data
+        )
+        self._index += 1
+        return segment
+
+
+class _SegmentedAEADDecryptor(object):
+    def __init__(self, segmented, associated_data):
+        self._segmented = segmented
+        self._associated_data = associated_data
+        self._header = None
+        self._buffer = bytearray()
+        self._index = 0
+
+    def update(self, data):
+        if self._buffer is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        utils._check_byteslike("data", data)
+        self._buffer += data
+        offset = 0
+        if self._header is None:
+            if len(self._buffer) < SegmentedAEAD._HEADER_LENGTH:
+                return b""
+            offset = SegmentedAEAD._HEADER_LENGTH
+            self._header = bytes(self._buffer[:offset])
+
+        size = self._segmented.segment_size + 16
+        out = []
+        while len(self._buffer) - offset > size:
+            out.append(self._segment(
+                bytes(self._buffer[offset:offset + size]), False
+            ))
+            offset += size
+        del self._buffer[:offset]
+        return b"".join(out)
+
+    def finalize(self):
+        if self._buffer is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        buf, self._buffer = self._buffer, None
+        if self._header is None or len(buf) < 16:
+            raise exceptions.InvalidTag
+        return self._segment(bytes(buf), True)
+
+    def _segment(self, data, last):
+        plaintext = self._segmented.decrypt_segment(
+            self._header, self._index, data, last, self._associated_data
+        )
+        self._index += 1
+        return plaintext
+
+
+@utils.register_interface(ciphers.CipherContext)
+@utils.register_interface(ciphers.AEADEncryptionContext)
+class _AEADStreamEncryptionContext(object):
+    def __init__(self, ctx, tag_length):
+        self._ctx = ctx
+        self._tag_length = tag_length
+        self._tag = None
+
+    def update(self, data):
+        if self._ctx is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        utils._check_byteslike("data", data)
+        return aead._stream_update(backend, self._ctx, data)
+
+    def update_into(self, data, buf):
+        if self._ctx is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        utils._check_byteslike("data", data)
+        _check_buffer(buf, len(data))
+        return aead._stream_update_into(backend, self._ctx, data, buf)
+
+    def finalize(self):
+        if self._ctx is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        self._tag = aead._stream_finalize_encrypt(
+            backend, self._ctx, self._tag_length
+        )
+        self._ctx = None
+        return b""
+
+    @property
+    def tag(self):
+        if self._ctx is not None:
+            raise exceptions.NotYetFinalized(
+                "You must finalize encryption before getting the tag."
+            )
+        return self._tag
+
+
+@utils.register_interface(ciphers.CipherContext)
+@utils.register_interface(ciphers.AEADDecryptionContext)
+class _AEADStreamDecryptionContext(object):
+    def __init__(self, ctx, tag_length, release_unverified):
+        self._ctx = ctx
+        self._tag_length = tag_length
+        # Unless the caller opted in to receiving unverified plaintext it is
+        # held back until the tag has been checked.
+        if release_unverified:
+            self._plaintext = None
+        else:
+            self._plaintext = bytearray()
+
+    def update(self, data):
+        if self._ctx is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        utils._check_byteslike("data", data)
+        plaintext = aead._stream_update(backend, self._ctx, data)
+        if self._plaintext is None:
+            return plaintext
+
+        self._plaintext += plaintext
+        return b""
+
+    def update_into(self, data, buf):
+        if self._ctx is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        if self._plaintext is not None:
+            raise ValueError(
+                "update_into releases unverified plaintext and requires "
+                "release_unverified=True."
+            )
+        utils._check_byteslike("data", data)
+        _check_buffer(buf, len(data))
+        return aead._stream_update_into(backend, self._ctx, data, buf)
+
+    def finalize(self):
+        raise ValueError(
+            "Authentication tag must be provided when decrypting, use "
+            "finalize_with_tag."
+        )
+
+    def finalize_with_tag(self, tag):
+        if self._ctx is None:
+            raise exceptions.AlreadyFinalized("Context was already finalized.")
+        utils._check_bytes("tag", tag)
+        if len(tag) != self._tag_length:
+            raise ValueError(
+                "Authentication tag must be {0} bytes.".format(
+                    self._tag_length
+                )
+            )
+
+        ctx, self._ctx = self._ctx, None
+        try:
+            aead._stream_finalize_decrypt(backend, ctx, tag)
+        except exceptions.InvalidTag:
+            if self._plaintext is not None:
+                self._plaintext[:] = bytearray(len(self._plaintext))
+            raise
+
+        if self._plaintext is None:
+            return b""
+        return bytes(self._plaintext)
@@ -5,6 +5,8 @@
 from __future__ import absolute_import, division, print_function
 
 import abc
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 
 import six
 
@@ -128,6 +130,71 @@ class Cipher(object):
         )
         return self._wrap_ctx(ctx, encrypt=False)
 
+    def encryptor_at(self, offset):
+        return self._seek_ctx(offset, encrypt=True)
+
+    def decryptor_at(self, offset):
+        return self._seek_ctx(offset, encrypt=False)
+
+    def _seek_ctx(self, offset, encrypt):
+        if not (
+            isinstance(self.mode, modes.CTR) or
+            isinstance(self.algorithm, modes.ModeWithNonce)
+        ):
+            raise TypeError(
+                "Seeking is only supported for CTR mode and ChaCha20."
+            )
+        if not isinstance(offset, six.integer_types):
+            raise TypeError("offset must be an integer.")
+        if offset < 0:
+            raise ValueError("offset must not be negative.")
+
+        algorithm, mode, skip = _seek_keystream(
+            self.algorithm, self.mode, offset
+        )
+        if encrypt:
+            ctx = self._backend.create_symmetric_encryption_ctx(
+                algorithm, mode
+            )
+        else:
+            ctx = self._backend.create_symmetric_decryption_ctx(
+                algorithm, mode
+            )
+        # Discard the start of the block the offset falls in.
+        if skip:
+            ctx.update(b"\x00" * skip)
+        return self._wrap_ctx(ctx, encrypt)
+
+    def parallel_encryptor(self, workers=None, chunk_size=2 ** 20):
+        return self._parallel_ctx(workers, chunk_size, encrypt=True)
+
+    def parallel_decryptor(self, workers=None, chunk_size=2 ** 20):
+        return self._parallel_ctx(workers, chunk_size, encrypt=False)
+
+    def _parallel_ctx(self, workers, chunk_size, encrypt):
+        if not isinstance(self.mode, (modes.CTR, modes.XTS)):
+            raise TypeError(
+                "Parallel contexts are only supported for CTR and XTS modes."
+            )
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if not isinstance(workers, six.integer_types):
+            raise TypeError("workers must be an integer.")
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if not isinstance(chunk_size, six.integer_types):
+            raise TypeError("chunk_size must be an integer.")
+        block_size = self.algorithm.block_size // 8
+        if chunk_size < block_size or chunk_size % block_size:
+            raise ValueError(
+                "chunk_size must be a positive multiple of the block size."
+            )
+
+        return _ParallelCipherContext(
+            self._backend, self.algorithm, self.mode, encrypt, workers,
+            chunk_size
+        )
+
     def _wrap_ctx(self, ctx, encrypt):
         if isinstance(self.mode, modes.ModeWithAuthenticationTag):
             if encrypt:
@@ -142,6 +209,7 @@ class Cipher(object):
 class _CipherContext(object):
     def __init__(self, ctx):
         self._ctx = ctx
+        self._reusable_ctx = ctx
 
     def update(self, data):
         if self._ctx is None:
@@ -160,6 +228,160 @@ class _CipherContext(object):
         self._ctx = None
         return data
 
+    def reset(self, iv=None):
+        if not hasattr(self._reusable_ctx, "reset"):
+            raise UnsupportedAlgorithm(
+                "This backend's cipher contexts cannot be reset.",
+                _Reasons.UNSUPPORTED_CIPHER
+            )
+        self._reusable_ctx.reset(iv)
+        self._ctx = self._reusable_ctx
+
+
+def _seek_keystream(algorithm, mode, offset):
+    # Returns the algorithm and mode whose keystream starts at the block
+    # containing offset, and how many bytes into that block offset is.
+    if isinstance(mode, modes.CTR):
+        block_size = algorithm.block_size // 8
+        block, skip = divmod(offset, block_size)
+        counter = (
+            utils.int_from_bytes(mode.nonce, "big") + block
+        ) % (1 << (block_size * 8))
+        return (
+            algorithm, modes.CTR(utils.int_to_bytes(counter, block_size)), skip
+        )
+
+    # ChaCha20 takes a 64 byte block counter in the first 8 bytes of its
+    # nonce, little-endian (OpenSSL carries the low word into the next one).
+    block, skip = divmod(offset, 64)
+    nonce = algorithm.nonce
+    counter = (
+        utils.int_from_bytes(nonce[7::-1], "big") + block
+    ) % (1 << 64)
+    nonce = utils.int_to_bytes(counter, 8)[::-1] + nonce[8:]
+    return type(algorithm)(algorithm.key, nonce), mode, skip
+
+
+@utils.register_interface(CipherContext)
+class _ParallelCipherContext(object):
+    def __init__(self, backend, algorithm, mode, encrypt, workers,
+                 chunk_size):
+        self._pool = None
+        self._backend = backend
+        self._algorithm = algorithm
+        self._mode = mode
+        self._encrypt = encrypt
+        self._workers = workers
+        self._chunk_size = chunk_size
+        self._block_size = algorithm.block_size // 8
+        self._position = 0
+        self._finalized = False
+
+    def __del__(self):
+        # A context that is dropped without being finalized must not leave
+        # its worker threads running.
+        self._close_pool()
+
+    def update(self, data):
+        buf = bytearray(len(data) + self._block_size - 1)
+        n = self.update_into(data, buf)
+        return bytes(memoryview(buf)[:n])
+
+    def update_into(self, data, buf):
+        if self._finalized:
+            raise AlreadyFinalized("Context was already finalized.")
+        length = len(data)
+        if len(buf) < length + self._block_size - 1:
+            raise ValueError(
+                "buffer must be at least {0} bytes for this "
+                "payload".format(length + self._block_size - 1)
+            )
+
+        chunks = [
+            (start, min(start + self._chunk_size, length))
+            for start in six.moves.range(0, length, self._chunk_size)
+        ]
+        if isinstance(self._mode, modes.XTS):
+            # Each chunk is a separate XTS data unit, so units may only be
+            # short at the very end of the input.
+            if self._position % self._chunk_size:
+                raise ValueError(
+                    "Only the final update may have a length that is not a "
+                    "multiple of chunk_size."
+                )
+            if chunks and chunks[-1][1] - chunks[-1][0] < 16:
+                raise ValueError("XTS data units must be at least 16 bytes.")
+
+        data = memoryview(data)
+        buf = memoryview(buf)
+        position = self._position
+        if len(chunks) <= 1 or self._workers == 1:
+            for start, end in chunks:
+                self._process_chunk(data, buf, position, start, end)
+        else:
+            # The threads are started on the first parallel update and reused
+            # until the context is finalized.
+            if self._pool is None:
+                self._pool = ThreadPool(self._workers)
+            try:
+                self._pool.map(
+                    lambda chunk: self._process_chunk(
+                        data, buf, position, chunk[0], chunk[1]
+                    ),
+                    chunks
+                )
+            except Exception:
+                self._close_pool()
+                raise
+
+        self._position += length
+        return length
+
+    def finalize(self):
+        if self._finalized:
+            raise AlreadyFinalized("Context was already finalized.")
+        self._finalized = True
+        self._close_pool()
+        return b""
+
+    def _close_pool(self):
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def _process_chunk(self, data, buf, position, start, end):
+        # Each chunk gets an independent context positioned where the serial
+        # context would be at that offset, so OpenSSL can work on every
+        # chunk concurrently with the GIL released.
+        offset = position + start
+        algorithm = self._algorithm
+        skip = 0
+        if isinstance(self._mode, modes.CTR):
+            algorithm, mode, skip = _seek_keystream(
+                self._algorithm, self._mode, offset
+            )
+        else:
+            # The tweak is the little-endian data unit number, as in IEEE
+            # 1619, so consecutive chunks are consecutive sectors.
+            unit = (
+                utils.int_from_bytes(self._mode.tweak[::-1], "big") +
+                offset // self._chunk_size
+            ) % (1 << 128)
+            mode = modes.XTS(utils.int_to_bytes(unit, 16)[::-1])
+
+        if self._encrypt:
+            ctx = self._backend.create_symmetric_encryption_ctx(
+                algorithm, mode
+            )
+        else:
+            ctx = self._backend.create_symmetric_decryption_ctx(
+                algorithm, mode
+            )
+        if skip:
+            ctx.update(b"\x00" * skip)
+        ctx.update_into(data[start:end], buf[start:])
+
 
 @utils.register_interface(AEADCipherContext)
 @utils.register_interface(CipherContext)
@@ -208,6 +430,12 @@ class _AEADCipherContext(object):
         self._ctx = None
         return data
 
+    def reset(self, iv=None):
+        raise UnsupportedAlgorithm(
+            "Contexts for modes with authentication tags cannot be reset.",
+            _Reasons.UNSUPPORTED_CIPHER
+        )
+
     def authenticate_additional_data(self, data):
         if self._ctx is None:
             raise AlreadyFinalized("Context was already finalized.")
@@ -9,6 +9,7 @@ import abc
 import six
 
 from cryptography import utils
+from cryptography.hazmat.primitives import padding as _padding
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -87,14 +88,29 @@ def _check_iv_and_key_length(self, algorithm):
 class CBC(object):
     name = "CBC"
 
-    def __init__(self, initialization_vector):
+    def __init__(self, initialization_vector, padding=None):
         if not isinstance(initialization_vector, bytes):
             raise TypeError("initialization_vector must be bytes")
 
+        if padding is not None and not isinstance(padding, _padding.PKCS7):
+            raise TypeError("padding must be None or a PKCS7 instance")
+
         self._initialization_vector = initialization_vector
+        self._padding = padding
 
     initialization_vector = utils.read_only_property("_initialization_vector")
-    validate_for_algorithm = _check_iv_and_key_length
+    padding = utils.read_only_property("_padding")
+
+    def validate_for_algorithm(self, algorithm):
+        _check_iv_and_key_length(self, algorithm)
+        if (
+            self.padding is not None and
+            self.padding.block_size != algorithm.block_size
+        ):
+            raise ValueError(
+                "The padding block size must match the block size of "
+                "{0}.".format(algorithm.name)
+            )
 
 
 @utils.register_interface(Mode)
@@ -5,6 +5,8 @@
 from __future__ import absolute_import, division, print_function
 
 import abc
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 
 import six
 
@@ -12,7 +14,12 @@ from cryptography import utils
 from cryptography.exceptions import (
     AlreadyFinalized, UnsupportedAlgorithm, _Reasons
 )
-from cryptography.hazmat.backends.interfaces import HashBackend
+from cryptography.hazmat.backends.interfaces import (
+    BatchHashBackend, HashBackend
+)
+
+
+_HASH_FILE_CHUNK_SIZE = 2 ** 20
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -60,14 +67,7 @@ class HashContext(object):
 @utils.register_interface(HashContext)
 class Hash(object):
     def __init__(self, algorithm, backend, ctx=None):
-        if not isinstance(backend, HashBackend):
-            raise UnsupportedAlgorithm(
-                "Backend object does not implement HashBackend.",
-                _Reasons.BACKEND_MISSING_INTERFACE
-            )
-
-        if not isinstance(algorithm, HashAlgorithm):
-            raise TypeError("Expected instance of hashes.HashAlgorithm.")
+        _check_hash_arguments(algorithm, backend)
         self._algorithm = algorithm
 
         self._backend = backend
@@ -82,8 +82,7 @@ class Hash(object):
     def update(self, data):
         if self._ctx is None:
             raise AlreadyFinalized("Context was already finalized.")
-        if not isinstance(data, bytes):
-            raise TypeError("data must be bytes.")
+        utils._check_byteslike("data", data)
         self._ctx.update(data)
 
     def copy(self):
@@ -101,6 +100,76 @@ class Hash(object):
         return digest
 
 
+def _check_hash_arguments(algorithm, backend):
+    if not isinstance(backend, HashBackend):
+        raise UnsupportedAlgorithm(
+            "Backend object does not implement HashBackend.",
+            _Reasons.BACKEND_MISSING_INTERFACE
+        )
+
+    if not isinstance(algorithm, HashAlgorithm):
+        raise TypeError("Expected instance of hashes.HashAlgorithm.")
+
+
+def digest_many(algorithm, data, backend):
+    _check_hash_arguments(algorithm, backend)
+    data = list(data)
+    for item in data:
+        utils._check_byteslike("data", item)
+
+    if isinstance(backend, BatchHashBackend):
+        return backend.digest_many(algorithm, data)
+
+    template = Hash(algorithm, backend)
+    digests = []
+    for item in data:
+        h = template.copy()
+        h.update(item)
+        digests.append(h.finalize())
+    return digests
+
+
+def hash_files(paths, algorithm, backend, workers=None):
+    _check_hash_arguments(algorithm, backend)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if not isinstance(workers, six.integer_types):
+        raise TypeError("workers must be an integer.")
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+
+    paths = list(paths)
+    if len(paths) <= 1 or workers == 1:
+        buf = bytearray(_HASH_FILE_CHUNK_SIZE)
+        return [_hash_file(path, algorithm, backend, buf) for path in paths]
+
+    pool = ThreadPool(min(workers, len(paths)))
+    try:
+        # Each worker thread hashes a whole file. Reading and hashing both
+        # happen with the GIL released, so files are hashed in parallel.
+        return pool.map(
+            lambda path: _hash_file(
+                path, algorithm, backend, bytearray(_HASH_FILE_CHUNK_SIZE)
+            ),
+            paths
+        )
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _hash_file(path, algorithm, backend, buf):
+    h = Hash(algorithm, backend)
+    view = memoryview(buf)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.finalize()
+
+
 @utils.register_interface(HashAlgorithm)
 class SHA1(object):
     name = "sha1"
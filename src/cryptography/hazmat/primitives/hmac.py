@@ -12,18 +12,22 @@ from cryptography.hazmat.backends.interfaces import HMACBackend
 from cryptography.hazmat.primitives import hashes, mac
 
 
+def _check_hmac_arguments(algorithm, backend):
+    if not isinstance(backend, HMACBackend):
+        raise UnsupportedAlgorithm(
+            "Backend object does not implement HMACBackend.",
+            _Reasons.BACKEND_MISSING_INTERFACE
+        )
+
+    if not isinstance(algorithm, hashes.HashAlgorithm):
+        raise TypeError("Expected instance of hashes.HashAlgorithm.")
+
+
 @utils.register_interface(mac.MACContext)
 @utils.register_interface(hashes.HashContext)
 class HMAC(object):
     def __init__(self, key, algorithm, backend, ctx=None):
-        if not isinstance(backend, HMACBackend):
-            raise UnsupportedAlgorithm(
-                "Backend object does not implement HMACBackend.",
-                _Reasons.BACKEND_MISSING_INTERFACE
-            )
-
-        if not isinstance(algorithm, hashes.HashAlgorithm):
-            raise TypeError("Expected instance of hashes.HashAlgorithm.")
+        _check_hmac_arguments(algorithm, backend)
         self._algorithm = algorithm
 
         self._backend = backend
@@ -38,8 +42,7 @@ class HMAC(object):
     def update(self, data):
         if self._ctx is None:
             raise AlreadyFinalized("Context was already finalized.")
-        if not isinstance(data, bytes):
-            raise TypeError("data must be bytes.")
+        utils._check_byteslike("data", data)
         self._ctx.update(data)
 
     def copy(self):
@@ -67,3 +70,36 @@ class HMAC(object):
 
         ctx, self._ctx = self._ctx, None
         ctx.verify(signature)
+
+
+class HMACKey(object):
+    def __init__(self, key, algorithm, backend):
+        _check_hmac_arguments(algorithm, backend)
+        self._algorithm = algorithm
+        self._backend = backend
+        self._key = key
+        self._ctx = backend.create_hmac_ctx(key, algorithm)
+
+    algorithm = utils.read_only_property("_algorithm")
+
+    def new(self):
+        return HMAC(
+            self._key,
+            self.algorithm,
+            backend=self._backend,
+            ctx=self._ctx.copy()
+        )
+
+    def sign(self, data):
+        utils._check_byteslike("data", data)
+        ctx = self._ctx.copy()
+        ctx.update(data)
+        return ctx.finalize()
+
+    def verify(self, data, signature):
+        utils._check_byteslike("data", data)
+        if not isinstance(signature, bytes):
+            raise TypeError("signature must be bytes.")
+        ctx = self._ctx.copy()
+        ctx.update(data)
+        ctx.verify(signature)
@@ -10,8 +10,9 @@ from cryptography import utils
 from cryptography.exceptions import (
     AlreadyFinalized, InvalidKey, UnsupportedAlgorithm, _Reasons
 )
-from cryptography.hazmat.backends.interfaces import HMACBackend
-from cryptography.hazmat.backends.interfaces import HashBackend
+from cryptography.hazmat.backends.interfaces import (
+    ConcatKDFBackend, HMACBackend, HashBackend
+)
 from cryptography.hazmat.primitives import constant_time, hashes, hmac
 from cryptography.hazmat.primitives.kdf import KeyDerivationFunction
 
@@ -31,10 +32,14 @@ def _common_args_checks(algorithm, length, otherinfo):
         raise TypeError("otherinfo must be bytes.")
 
 
-def _concatkdf_derive(key_material, length, auxfn, otherinfo):
+def _check_key_material(key_material):
     if not isinstance(key_material, bytes):
         raise TypeError("key_material must be bytes.")
 
+
+def _concatkdf_derive(key_material, length, auxfn, otherinfo):
+    _check_key_material(key_material)
+
     output = [b""]
     outlen = 0
     counter = 1
@@ -77,6 +82,11 @@ class ConcatKDFHash(object):
         if self._used:
             raise AlreadyFinalized
         self._used = True
+        if isinstance(self._backend, ConcatKDFBackend):
+            _check_key_material(key_material)
+            return self._backend.derive_concatkdf_hash(
+                self._algorithm, self._length, self._otherinfo, key_material
+            )
         return _concatkdf_derive(key_material, self._length,
                                  self._hash, self._otherinfo)
 
@@ -117,6 +127,12 @@ class ConcatKDFHMAC(object):
         if self._used:
             raise AlreadyFinalized
         self._used = True
+        if isinstance(self._backend, ConcatKDFBackend):
+            _check_key_material(key_material)
+            return self._backend.derive_concatkdf_hmac(
+                self._algorithm, self._length, self._salt, self._otherinfo,
+                key_material
+            )
         return _concatkdf_derive(key_material, self._length,
                                  self._hmac, self._otherinfo)
 
@@ -4,6 +4,9 @@
 
 from __future__ import absolute_import, division, print_function
 
+import collections
+import threading
+
 import six
 
 from cryptography import utils
@@ -49,6 +52,17 @@ class HKDF(object):
 
         return self._hkdf_expand.derive(self._extract(key_material))
 
+    def extract(self, key_material, cache_size=0):
+        if not isinstance(key_material, bytes):
+            raise TypeError("key_material must be bytes.")
+
+        return PseudorandomKey(
+            self._algorithm,
+            self._extract(key_material),
+            self._backend,
+            cache_size
+        )
+
     def verify(self, key_material, expected_key):
         if not constant_time.bytes_eq(self.derive(key_material), expected_key):
             raise InvalidKey
@@ -67,39 +81,23 @@ class HKDFExpand(object):
 
         self._backend = backend
 
-        max_length = 255 * algorithm.digest_size
-
-        if length > max_length:
-            raise ValueError(
-                "Can not derive keys larger than {0} octets.".format(
-                    max_length
-                ))
-
+        _check_length(algorithm, length)
         self._length = length
-
-        if not (info is None or isinstance(info, bytes)):
-            raise TypeError("info must be bytes.")
-
-        if info is None:
-            info = b""
-
-        self._info = info
+        self._info = _check_info(info)
 
         self._used = False
 
     def _expand(self, key_material):
-        output = [b""]
-        counter = 1
-
-        while self._algorithm.digest_size * (len(output) - 1) < self._length:
+        if self._length <= self._algorithm.digest_size:
+            # A single block is cheaper to compute without copying a keyed
+            # context.
             h = hmac.HMAC(key_material, self._algorithm, backend=self._backend)
-            h.update(output[-1])
             h.update(self._info)
-            h.update(six.int2byte(counter))
-            output.append(h.finalize())
-            counter += 1
+            h.update(b"\x01")
+            return h.finalize()[:self._length]
 
-        return b"".join(output)[:self._length]
+        hmac_key = hmac.HMACKey(key_material, self._algorithm, self._backend)
+        return _expand(hmac_key, self._info, self._length)
 
     def derive(self, key_material):
         if not isinstance(key_material, bytes):
@@ -114,3 +112,89 @@ class HKDFExpand(object):
     def verify(self, key_material, expected_key):
         if not constant_time.bytes_eq(self.derive(key_material), expected_key):
             raise InvalidKey
+
+
+class PseudorandomKey(object):
+    def __init__(self, algorithm, prk, backend, cache_size=0):
+        if not isinstance(backend, HMACBackend):
+            raise UnsupportedAlgorithm(
+                "Backend object does not implement HMACBackend.",
+                _Reasons.BACKEND_MISSING_INTERFACE
+            )
+
+        if not isinstance(prk, bytes):
+            raise TypeError("prk must be bytes.")
+
+        if not isinstance(cache_size, six.integer_types):
+            raise TypeError("cache_size must be an integer.")
+
+        if cache_size < 0:
+            raise ValueError("cache_size must be non-negative.")
+
+        self._algorithm = algorithm
+        self._hmac_key = hmac.HMACKey(prk, algorithm, backend)
+        self._cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    algorithm = utils.read_only_property("_algorithm")
+
+    def expand(self, info, length):
+        _check_length(self._algorithm, length)
+        info = _check_info(info)
+        if not self._cache_size:
+            return _expand(self._hmac_key, info, length)
+
+        key = (info, length)
+        with self._cache_lock:
+            try:
+                okm = self._cache.pop(key)
+            except KeyError:
+                okm = None
+            else:
+                self._cache[key] = okm
+
+        if okm is None:
+            okm = _expand(self._hmac_key, info, length)
+            with self._cache_lock:
+                self._cache[key] = okm
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+
+        return okm
+
+    def expand_many(self, requests):
+        return [self.expand(info, length) for info, length in requests]
+
+
+def _check_length(algorithm, length):
+    max_length = 255 * algorithm.digest_size
+
+    if length > max_length:
+        raise ValueError(
+            "Can not derive keys larger than {0} octets.".format(
+                max_length
+            ))
+
+
+def _check_info(info):
+    if not (info is None or isinstance(info, bytes)):
+        raise TypeError("info must be bytes.")
+
+    if info is None:
+        info = b""
+
+    return info
+
+
+def _expand(hmac_key, info, length):
+    output = [b""]
+    counter = 1
+
+    while hmac_key.algorithm.digest_size * (len(output) - 1) < length:
+        output.append(
+            hmac_key.sign(output[-1] + info + six.int2byte(counter))
+        )
+        counter += 1
+
+    return b"".join(output)[:length]
@@ -106,11 +106,34 @@ class KBKDFHMAC(object):
             raise TypeError('key_material must be bytes')
         self._used = True
 
+        rounds = self._rounds()
+        if rounds > 1:
+            prf = hmac.HMACKey(
+                key_material, self._algorithm, self._backend
+            ).sign
+        else:
+            def prf(data):
+                h = hmac.HMAC(
+                    key_material, self._algorithm, backend=self._backend
+                )
+                h.update(data)
+                return h.finalize()
+
+        return self._expand(prf, rounds, self._generate_fixed_input())
+
+    def keyed(self, key_material):
+        if not isinstance(key_material, bytes):
+            raise TypeError('key_material must be bytes')
+
+        if self._fixed_data:
+            raise ValueError("keyed can not be used with fixed data.")
+
+        return KeyDerivationKey(self, key_material)
+
+    def _rounds(self):
         # inverse floor division (equivalent to ceiling)
         rounds = -(-self._length // self._algorithm.digest_size)
 
-        output = [b'']
-
         # For counter mode, the number of iterations shall not be
         # larger than 2^r-1, where r <= 32 is the binary length of the counter
         # This ensures that the counter values used as an input to the
@@ -119,19 +142,16 @@ class KBKDFHMAC(object):
         if rounds > pow(2, len(r_bin) * 8) - 1:
             raise ValueError('There are too many iterations.')
 
-        for i in range(1, rounds + 1):
-            h = hmac.HMAC(key_material, self._algorithm, backend=self._backend)
+        return rounds
 
+    def _expand(self, prf, rounds, fixed):
+        output = []
+        for i in range(1, rounds + 1):
             counter = utils.int_to_bytes(i, self._rlen)
             if self._location == CounterLocation.BeforeFixed:
-                h.update(counter)
-
-            h.update(self._generate_fixed_input())
-
-            if self._location == CounterLocation.AfterFixed:
-                h.update(counter)
-
-            output.append(h.finalize())
+                output.append(prf(counter + fixed))
+            else:
+                output.append(prf(fixed + counter))
 
         return b''.join(output)[:self._length]
 
@@ -139,10 +159,45 @@ class KBKDFHMAC(object):
         if self._fixed_data and isinstance(self._fixed_data, bytes):
             return self._fixed_data
 
+        return self._label_context_input(self._label, self._context)
+
+    def _label_context_input(self, label, context):
         l_val = utils.int_to_bytes(self._length * 8, self._llen)
 
-        return b"".join([self._label, b"\x00", self._context, l_val])
+        return b"".join([label, b"\x00", context, l_val])
 
     def verify(self, key_material, expected_key):
         if not constant_time.bytes_eq(self.derive(key_material), expected_key):
             raise InvalidKey
+
+
+class KeyDerivationKey(object):
+    def __init__(self, kbkdf, key_material):
+        self._kbkdf = kbkdf
+        self._hmac_key = hmac.HMACKey(
+            key_material, kbkdf._algorithm, kbkdf._backend
+        )
+
+    def derive(self, label, context):
+        if label is None:
+            label = b''
+
+        if context is None:
+            context = b''
+
+        if (not isinstance(label, bytes) or
+                not isinstance(context, bytes)):
+            raise TypeError('label and context must be of type bytes')
+
+        kbkdf = self._kbkdf
+        return kbkdf._expand(
+            self._hmac_key.sign,
+            kbkdf._rounds(),
+            kbkdf._label_context_input(label, context)
+        )
+
+    def derive_many(self, label_context_pairs):
+        return [
+            self.derive(label, context)
+            for label, context in label_context_pairs
+        ]
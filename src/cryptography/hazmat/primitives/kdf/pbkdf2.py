@@ -11,6 +11,7 @@ from cryptography.exceptions import (
 from cryptography.hazmat.backends.interfaces import PBKDF2HMACBackend
 from cryptography.hazmat.primitives import constant_time
 from cryptography.hazmat.primitives.kdf import KeyDerivationFunction
+from cryptography.hazmat.primitives.kdf.pool import default_pool
 
 
 @utils.register_interface(KeyDerivationFunction)
@@ -56,3 +57,13 @@ class PBKDF2HMAC(object):
         derived_key = self.derive(key_material)
         if not constant_time.bytes_eq(derived_key, expected_key):
             raise InvalidKey("Keys do not match.")
+
+    def derive_async(self, key_material, pool=None):
+        if pool is None:
+            pool = default_pool()
+        return pool.submit(self.derive, key_material)
+
+    def verify_async(self, key_material, expected_key, pool=None):
+        if pool is None:
+            pool = default_pool()
+        return pool.submit(self.verify, key_material, expected_key)
@@ -0,0 +1,156 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+import atexit
+import collections
+import multiprocessing
+import threading
+import timeit
+from multiprocessing.pool import ThreadPool
+
+import six
+
+from cryptography import utils
+
+
+PoolStats = collections.namedtuple(
+    "PoolStats", ["queued", "running", "completed", "wait_time", "run_time"]
+)
+
+
+# The default pool turns calls away once this many per worker are waiting.
+_DEFAULT_MAX_PENDING_PER_WORKER = 64
+
+
+class PoolFull(Exception):
+    pass
+
+
+class KDFPool(object):
+    def __init__(self, workers=None, max_pending=None):
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if not isinstance(workers, six.integer_types):
+            raise TypeError("workers must be an integer.")
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if max_pending is not None:
+            if not isinstance(max_pending, six.integer_types):
+                raise TypeError("max_pending must be an integer.")
+            if max_pending < 0:
+                raise ValueError("max_pending must be non-negative.")
+
+        self._workers = workers
+        self._max_pending = max_pending
+        self._pool = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._wait_time = 0.0
+        self._run_time = 0.0
+
+    workers = utils.read_only_property("_workers")
+    max_pending = utils.read_only_property("_max_pending")
+
+    def submit(self, func, *args):
+        import asyncio
+
+        try:
+            loop = asyncio.get_running_loop()
+        except AttributeError:
+            # Python < 3.7
+            loop = asyncio.get_event_loop()
+        # loop.create_future() is only available from Python 3.5.2.
+        future = asyncio.Future(loop=loop)
+        with self._lock:
+            if (
+                self._max_pending is not None and
+                self._queued >= self._max_pending
+            ):
+                raise PoolFull(
+                    "{0} calls are already waiting for a worker.".format(
+                        self._queued
+                    )
+                )
+            # The threads are only started once the pool is first used, so
+            # creating the default pool costs nothing for synchronous users.
+            if self._pool is None:
+                self._pool = ThreadPool(self._workers)
+            self._queued += 1
+            self._pool.apply_async(
+                self._run, (loop, future, func, args, timeit.default_timer())
+            )
+        return future
+
+    def _run(self, loop, future, func, args, queued_at):
+        started_at = timeit.default_timer()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_time += started_at - queued_at
+
+        try:
+            result = func(*args)
+        except Exception as e:
+            callback, value = _set_exception, e
+        else:
+            callback, value = _set_result, result
+
+        with self._lock:
+            self._running -= 1
+            self._completed += 1
+            self._run_time += timeit.default_timer() - started_at
+
+        try:
+            loop.call_soon_threadsafe(callback, future, value)
+        except RuntimeError:
+            # The event loop was closed before the derivation finished, so
+            # nobody is waiting for the result.
+            pass
+
+    def stats(self):
+        with self._lock:
+            return PoolStats(
+                self._queued,
+                self._running,
+                self._completed,
+                self._wait_time,
+                self._run_time
+            )
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def _set_result(future, result):
+    if not future.cancelled():
+        future.set_result(result)
+
+
+def _set_exception(future, exception):
+    if not future.cancelled():
+        future.set_exception(exception)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool():
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            workers = multiprocessing.cpu_count()
+            _default_pool = KDFPool(
+                workers, workers * _DEFAULT_MAX_PENDING_PER_WORKER
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
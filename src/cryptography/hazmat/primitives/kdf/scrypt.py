@@ -13,6 +13,7 @@ from cryptography.exceptions import (
 from cryptography.hazmat.backends.interfaces import ScryptBackend
 from cryptography.hazmat.primitives import constant_time
 from cryptography.hazmat.primitives.kdf import KeyDerivationFunction
+from cryptography.hazmat.primitives.kdf.pool import default_pool
 
 
 # This is used by the scrypt tests to skip tests that require more memory
@@ -64,3 +65,13 @@ class Scrypt(object):
         derived_key = self.derive(key_material)
         if not constant_time.bytes_eq(derived_key, expected_key):
             raise InvalidKey("Keys do not match.")
+
+    def derive_async(self, key_material, pool=None):
+        if pool is None:
+            pool = default_pool()
+        return pool.submit(self.derive, key_material)
+
+    def verify_async(self, key_material, expected_key, pool=None):
+        if pool is None:
+            pool = default_pool()
+        return pool.submit(self.verify, key_material, expected_key)
@@ -10,7 +10,9 @@ from cryptography import utils
 from cryptography.exceptions import (
     AlreadyFinalized, InvalidKey, UnsupportedAlgorithm, _Reasons
 )
-from cryptography.hazmat.backends.interfaces import HashBackend
+from cryptography.hazmat.backends.interfaces import (
+    HashBackend, X963KDFBackend
+)
 from cryptography.hazmat.primitives import constant_time, hashes
 from cryptography.hazmat.primitives.kdf import KeyDerivationFunction
 
@@ -49,6 +51,14 @@ class X963KDF(object):
         if not isinstance(key_material, bytes):
             raise TypeError("key_material must be bytes.")
 
+        if isinstance(self._backend, X963KDFBackend):
+            sharedinfo = self._sharedinfo
+            if sharedinfo is None:
+                sharedinfo = b""
+            return self._backend.derive_x963kdf(
+                self._algorithm, self._length, sharedinfo, key_material
+            )
+
         output = [b""]
         outlen = 0
         counter = 1
@@ -6,31 +6,67 @@ from __future__ import absolute_import, division, print_function
 
 import struct
 
+from cryptography.hazmat.backends.interfaces import AESKeyWrapBackend
 from cryptography.hazmat.primitives.ciphers import Cipher
 from cryptography.hazmat.primitives.ciphers.algorithms import AES
 from cryptography.hazmat.primitives.ciphers.modes import ECB
 from cryptography.hazmat.primitives.constant_time import bytes_eq
 
 
-def _wrap_core(wrapping_key, a, r, backend):
-    # RFC 3394 Key Wrap - 2.2.1 (index method)
-    encryptor = Cipher(AES(wrapping_key), ECB(), backend).encryptor()
-    n = len(r)
-    for j in range(6):
-        for i in range(n):
-            # every encryption operation is a discrete 16 byte chunk (because
-            # AES has a 128-bit block size) and since we're using ECB it is
-            # safe to reuse the encryptor for the entire operation
-            b = encryptor.update(a + r[i])
-            # pack/unpack are safe as these are always 64-bit chunks
-            a = struct.pack(
-                ">Q", struct.unpack(">Q", b[:8])[0] ^ ((n * j) + i + 1)
-            )
-            r[i] = b[-8:]
+class _ECBKeyWrapContext(object):
+    # RFC 3394 on top of AES-ECB, for backends without native key wrap.
+    def __init__(self, wrapping_key, backend):
+        self._cipher = Cipher(AES(wrapping_key), ECB(), backend)
+
+    def wrap(self, a, data):
+        # RFC 3394 Key Wrap - 2.2.1 (index method)
+        encryptor = self._cipher.encryptor()
+        r = [data[i:i + 8] for i in range(0, len(data), 8)]
+        n = len(r)
+        for j in range(6):
+            for i in range(n):
+                # every encryption operation is a discrete 16 byte chunk
+                # (because AES has a 128-bit block size) and since we're using
+                # ECB it is safe to reuse the encryptor for the entire
+                # operation
+                b = encryptor.update(a + r[i])
+                # pack/unpack are safe as these are always 64-bit chunks
+                a = struct.pack(
+                    ">Q", struct.unpack(">Q", b[:8])[0] ^ ((n * j) + i + 1)
+                )
+                r[i] = b[-8:]
+
+        assert encryptor.finalize() == b""
+
+        return a + b"".join(r)
+
+    def unwrap(self, wrapped):
+        # Implement RFC 3394 Key Unwrap - 2.2.2 (index method)
+        decryptor = self._cipher.decryptor()
+        a = wrapped[:8]
+        r = [wrapped[i:i + 8] for i in range(8, len(wrapped), 8)]
+        n = len(r)
+        for j in reversed(range(6)):
+            for i in reversed(range(n)):
+                # pack/unpack are safe as these are always 64-bit chunks
+                atr = struct.pack(
+                    ">Q", struct.unpack(">Q", a)[0] ^ ((n * j) + i + 1)
+                ) + r[i]
+                # every decryption operation is a discrete 16 byte chunk so
+                # it is safe to reuse the decryptor for the entire operation
+                b = decryptor.update(atr)
+                a = b[:8]
+                r[i] = b[-8:]
+
+        assert decryptor.finalize() == b""
+        return a, b"".join(r)
 
-    assert encryptor.finalize() == b""
 
-    return a + b"".join(r)
+def _key_wrap_ctx(wrapping_key, backend):
+    if isinstance(backend, AESKeyWrapBackend):
+        return backend.create_aes_key_wrap_ctx(wrapping_key)
+    else:
+        return _ECBKeyWrapContext(wrapping_key, backend)
 
 
 def aes_key_wrap(wrapping_key, key_to_wrap, backend):
@@ -44,28 +80,7 @@ def aes_key_wrap(wrapping_key, key_to_wrap, backend):
         raise ValueError("The key to wrap must be a multiple of 8 bytes")
 
     a = b"\xa6\xa6\xa6\xa6\xa6\xa6\xa6\xa6"
-    r = [key_to_wrap[i:i + 8] for i in range(0, len(key_to_wrap), 8)]
-    return _wrap_core(wrapping_key, a, r, backend)
-
-
-def _unwrap_core(wrapping_key, a, r, backend):
-    # Implement RFC 3394 Key Unwrap - 2.2.2 (index method)
-    decryptor = Cipher(AES(wrapping_key), ECB(), backend).decryptor()
-    n = len(r)
-    for j in reversed(range(6)):
-        for i in reversed(range(n)):
-            # pack/unpack are safe as these are always 64-bit chunks
-            atr = struct.pack(
-                ">Q", struct.unpack(">Q", a)[0] ^ ((n * j) + i + 1)
-            ) + r[i]
-            # every decryption operation is a discrete 16 byte chunk so
-            # it is safe to reuse the decryptor for the entire operation
-            b = decryptor.update(atr)
-            a = b[:8]
-            r[i] = b[-8:]
-
-    assert decryptor.finalize() == b""
-    return a, r
+    return _key_wrap_ctx(wrapping_key, backend).wrap(a, key_to_wrap)
 
 
 def aes_key_wrap_with_padding(wrapping_key, key_to_wrap, backend):
@@ -83,14 +98,16 @@ def aes_key_wrap_with_padding(wrapping_key, key_to_wrap, backend):
         assert encryptor.finalize() == b""
         return b
     else:
-        r = [key_to_wrap[i:i + 8] for i in range(0, len(key_to_wrap), 8)]
-        return _wrap_core(wrapping_key, aiv, r, backend)
+        return _key_wrap_ctx(wrapping_key, backend).wrap(aiv, key_to_wrap)
 
 
 def aes_key_unwrap_with_padding(wrapping_key, wrapped_key, backend):
     if len(wrapped_key) < 16:
         raise InvalidUnwrap("Must be at least 16 bytes")
 
+    if len(wrapped_key) % 8 != 0:
+        raise InvalidUnwrap("The wrapped key must be a multiple of 8 bytes")
+
     if len(wrapping_key) not in [16, 24, 32]:
         raise ValueError("The wrapping key must be a valid AES key length")
 
@@ -103,11 +120,8 @@ def aes_key_unwrap_with_padding(wrapping_key, wrapped_key, backend):
         data = b[8:]
         n = 1
     else:
-        r = [wrapped_key[i:i + 8] for i in range(0, len(wrapped_key), 8)]
-        encrypted_aiv = r.pop(0)
-        n = len(r)
-        a, r = _unwrap_core(wrapping_key, encrypted_aiv, r, backend)
-        data = b"".join(r)
+        n = len(wrapped_key) // 8 - 1
+        a, data = _key_wrap_ctx(wrapping_key, backend).unwrap(wrapped_key)
 
     # 1) Check that MSB(32,A) = A65959A6.
     # 2) Check that 8*(n-1) < LSB(32,A) <= 8*n.  If so, let
@@ -130,24 +144,50 @@ def aes_key_unwrap_with_padding(wrapping_key, wrapped_key, backend):
         return data[:-b]
 
 
-def aes_key_unwrap(wrapping_key, wrapped_key, backend):
+def _check_wrapped_key(wrapped_key):
     if len(wrapped_key) < 24:
         raise InvalidUnwrap("Must be at least 24 bytes")
 
     if len(wrapped_key) % 8 != 0:
         raise InvalidUnwrap("The wrapped key must be a multiple of 8 bytes")
 
-    if len(wrapping_key) not in [16, 24, 32]:
-        raise ValueError("The wrapping key must be a valid AES key length")
 
+def _unwrap(ctx, wrapped_key):
     aiv = b"\xa6\xa6\xa6\xa6\xa6\xa6\xa6\xa6"
-    r = [wrapped_key[i:i + 8] for i in range(0, len(wrapped_key), 8)]
-    a = r.pop(0)
-    a, r = _unwrap_core(wrapping_key, a, r, backend)
+    a, data = ctx.unwrap(wrapped_key)
     if not bytes_eq(a, aiv):
         raise InvalidUnwrap()
 
-    return b"".join(r)
+    return data
+
+
+def aes_key_unwrap(wrapping_key, wrapped_key, backend):
+    _check_wrapped_key(wrapped_key)
+
+    if len(wrapping_key) not in [16, 24, 32]:
+        raise ValueError("The wrapping key must be a valid AES key length")
+
+    return _unwrap(_key_wrap_ctx(wrapping_key, backend), wrapped_key)
+
+
+def aes_key_unwrap_many(wrapping_key, wrapped_keys, backend):
+    if len(wrapping_key) not in [16, 24, 32]:
+        raise ValueError("The wrapping key must be a valid AES key length")
+
+    ctx = _key_wrap_ctx(wrapping_key, backend)
+    unwrapped_keys = []
+    for i, wrapped_key in enumerate(wrapped_keys):
+        try:
+            _check_wrapped_key(wrapped_key)
+            unwrapped_keys.append(_unwrap(ctx, wrapped_key))
+        except InvalidUnwrap as e:
+            raise InvalidUnwrap(
+                "Wrapped key {0} could not be unwrapped. {1}".format(
+                    i, e
+                ).rstrip()
+            )
+
+    return unwrapped_keys
 
 
 class InvalidUnwrap(Exception):
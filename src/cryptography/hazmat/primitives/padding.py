@@ -36,21 +36,58 @@ def _byte_padding_check(block_size):
         raise ValueError("block_size must be a multiple of 8.")
 
 
-def _byte_padding_update(buffer_, data, block_size):
+def _byte_update_check(buffer_, data):
     if buffer_ is None:
         raise AlreadyFinalized("Context was already finalized.")
 
     if not isinstance(data, bytes):
         raise TypeError("data must be bytes.")
 
-    buffer_ += data
 
-    finished_blocks = len(buffer_) // (block_size // 8)
+def _byte_update(buffer_, data, end):
+    # Returns everything pending up to data[:end] and carries the rest over
+    # to the next update. The carry is never more than one block, so each
+    # update only copies the data it returns.
+    if end < 0:
+        return buffer_ + data, b""
+
+    return data[end:], buffer_ + data[:end]
+
+
+def _byte_update_into(buffer_, data, buf, end, block_size):
+    if len(buf) < len(data) + block_size // 8 - 1:
+        raise ValueError(
+            "buffer must be at least {0} bytes for this "
+            "payload".format(len(data) + block_size // 8 - 1)
+        )
+
+    if end < 0:
+        return buffer_ + data, 0
+
+    view = memoryview(buf)
+    view[:len(buffer_)] = buffer_
+    view[len(buffer_):len(buffer_) + end] = memoryview(data)[:end]
+    return data[end:], len(buffer_) + end
 
-    result = buffer_[:finished_blocks * (block_size // 8)]
-    buffer_ = buffer_[finished_blocks * (block_size // 8):]
 
-    return buffer_, result
+def _byte_padding_end(buffer_, data, block_size):
+    # Every complete block can be returned straight away.
+    return len(data) - (len(buffer_) + len(data)) % (block_size // 8)
+
+
+def _byte_padding_update(buffer_, data, block_size):
+    _byte_update_check(buffer_, data)
+    return _byte_update(
+        buffer_, data, _byte_padding_end(buffer_, data, block_size)
+    )
+
+
+def _byte_padding_update_into(buffer_, data, buf, block_size):
+    _byte_update_check(buffer_, data)
+    return _byte_update_into(
+        buffer_, data, buf, _byte_padding_end(buffer_, data, block_size),
+        block_size
+    )
 
 
 def _byte_padding_pad(buffer_, block_size, paddingfn):
@@ -61,21 +98,27 @@ def _byte_padding_pad(buffer_, block_size, paddingfn):
     return buffer_ + paddingfn(pad_size)
 
 
-def _byte_unpadding_update(buffer_, data, block_size):
-    if buffer_ is None:
-        raise AlreadyFinalized("Context was already finalized.")
-
-    if not isinstance(data, bytes):
-        raise TypeError("data must be bytes.")
+def _byte_unpadding_end(buffer_, data, block_size):
+    # The padding is in the last block, so it has to be held back until
+    # finalize. If the data so far isn't block aligned, the trailing partial
+    # block is held back instead, since more data must follow it.
+    tail = (len(buffer_) + len(data)) % (block_size // 8) or block_size // 8
+    return len(data) - tail
 
-    buffer_ += data
 
-    finished_blocks = max(len(buffer_) // (block_size // 8) - 1, 0)
+def _byte_unpadding_update(buffer_, data, block_size):
+    _byte_update_check(buffer_, data)
+    return _byte_update(
+        buffer_, data, _byte_unpadding_end(buffer_, data, block_size)
+    )
 
-    result = buffer_[:finished_blocks * (block_size // 8)]
-    buffer_ = buffer_[finished_blocks * (block_size // 8):]
 
-    return buffer_, result
+def _byte_unpadding_update_into(buffer_, data, buf, block_size):
+    _byte_update_check(buffer_, data)
+    return _byte_update_into(
+        buffer_, data, buf, _byte_unpadding_end(buffer_, data, block_size),
+        block_size
+    )
 
 
 def _byte_unpadding_check(buffer_, block_size, checkfn):
@@ -94,6 +137,23 @@ def _byte_unpadding_check(buffer_, block_size, checkfn):
     return buffer_[:-pad_size]
 
 
+def pad_and_encrypt(padding, encryptor, data):
+    utils._check_bytes("data", data)
+    # The encryptor holds back the final partial block itself, so only the
+    # padding bytes have to be passed after the message, and the message
+    # goes to the encryptor without being copied first.
+    block_size = padding.block_size // 8
+    tail = len(data) % block_size
+    padder = padding.padder()
+    pad = (padder.update(data[len(data) - tail:]) + padder.finalize())[tail:]
+    buf = bytearray(len(data) + len(pad) + block_size - 1)
+    n = encryptor.update_into(data, buf)
+    final = encryptor.update(pad) + encryptor.finalize()
+    buf[n:n + len(final)] = final
+    del buf[n + len(final):]
+    return bytes(buf)
+
+
 class PKCS7(object):
     def __init__(self, block_size):
         _byte_padding_check(block_size)
@@ -110,7 +170,6 @@ class PKCS7(object):
 class _PKCS7PaddingContext(object):
     def __init__(self, block_size):
         self.block_size = block_size
-        # TODO: more copies than necessary, we should use zero-buffer (#193)
         self._buffer = b""
 
     def update(self, data):
@@ -118,6 +177,11 @@ class _PKCS7PaddingContext(object):
             self._buffer, data, self.block_size)
         return result
 
+    def update_into(self, data, buf):
+        self._buffer, n = _byte_padding_update_into(
+            self._buffer, data, buf, self.block_size)
+        return n
+
     def _padding(self, size):
         return six.int2byte(size) * size
 
@@ -132,7 +196,6 @@ class _PKCS7PaddingContext(object):
 class _PKCS7UnpaddingContext(object):
     def __init__(self, block_size):
         self.block_size = block_size
-        # TODO: more copies than necessary, we should use zero-buffer (#193)
         self._buffer = b""
 
     def update(self, data):
@@ -140,6 +203,11 @@ class _PKCS7UnpaddingContext(object):
             self._buffer, data, self.block_size)
         return result
 
+    def update_into(self, data, buf):
+        self._buffer, n = _byte_unpadding_update_into(
+            self._buffer, data, buf, self.block_size)
+        return n
+
     def finalize(self):
         result = _byte_unpadding_check(
             self._buffer, self.block_size,
@@ -164,7 +232,6 @@ class ANSIX923(object):
 class _ANSIX923PaddingContext(object):
     def __init__(self, block_size):
         self.block_size = block_size
-        # TODO: more copies than necessary, we should use zero-buffer (#193)
         self._buffer = b""
 
     def update(self, data):
@@ -172,6 +239,11 @@ class _ANSIX923PaddingContext(object):
             self._buffer, data, self.block_size)
         return result
 
+    def update_into(self, data, buf):
+        self._buffer, n = _byte_padding_update_into(
+            self._buffer, data, buf, self.block_size)
+        return n
+
     def _padding(self, size):
         return six.int2byte(0) * (size - 1) + six.int2byte(size)
 
@@ -186,7 +258,6 @@ class _ANSIX923PaddingContext(object):
 class _ANSIX923UnpaddingContext(object):
     def __init__(self, block_size):
         self.block_size = block_size
-        # TODO: more copies than necessary, we should use zero-buffer (#193)
         self._buffer = b""
 
     def update(self, data):
@@ -194,6 +265,11 @@ class _ANSIX923UnpaddingContext(object):
             self._buffer, data, self.block_size)
         return result
 
+    def update_into(self, data, buf):
+        self._buffer, n = _byte_unpadding_update_into(
+            self._buffer, data, buf, self.block_size)
+        return n
+
     def finalize(self):
         result = _byte_unpadding_check(
             self._buffer, self.block_size,
@@ -0,0 +1,49 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+
+from cryptography.exceptions import UnsupportedAlgorithm
+from cryptography.hazmat.primitives.ciphers.aead import (
+    AESCCM, AESGCM, ChaCha20Poly1305
+)
+
+
+def _aead(cls):
+    try:
+        if cls is ChaCha20Poly1305:
+            return cls(cls.generate_key())
+        return cls(cls.generate_key(128))
+    except UnsupportedAlgorithm:
+        pytest.skip("{0} is not supported".format(cls.__name__))
+
+
+@pytest.mark.parametrize("cls", [AESGCM, AESCCM, ChaCha20Poly1305])
+@pytest.mark.parametrize("size", [64, 1024])
+def test_encrypt(benchmark, cls, size):
+    aead = _aead(cls)
+    nonce = b"\x00" * 12
+    data = b"\x00" * size
+    benchmark(aead.encrypt, nonce, data, None)
+
+
+@pytest.mark.parametrize("cls", [AESGCM, AESCCM, ChaCha20Poly1305])
+@pytest.mark.parametrize("size", [64, 1024])
+def test_decrypt(benchmark, cls, size):
+    aead = _aead(cls)
+    nonce = b"\x00" * 12
+    ct = aead.encrypt(nonce, b"\x00" * size, None)
+    benchmark(aead.decrypt, nonce, ct, None)
+
+
+@pytest.mark.parametrize("size", [64, 1024])
+def test_encrypt_new_object(benchmark, size):
+    # Constructing a new object for every message pays the key setup each
+    # time, which is what every call paid before keyed contexts were cached.
+    key = AESGCM.generate_key(128)
+    nonce = b"\x00" * 12
+    data = b"\x00" * size
+    benchmark(lambda: AESGCM(key).encrypt(nonce, data, None))
@@ -0,0 +1,77 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+
+DATA = b"\x00" * (16 * 1024 * 1024)
+UPDATE_SIZES = [16, 256, 4096, 65536, 1024 * 1024, 16 * 1024 * 1024]
+
+
+def test_ctr_serial(benchmark, backend):
+    c = Cipher(algorithms.AES(b"\x01" * 32), modes.CTR(b"\x00" * 16), backend)
+    buf = bytearray(len(DATA) + 15)
+    benchmark(lambda: c.encryptor().update_into(DATA, buf))
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_ctr_parallel(benchmark, backend, workers):
+    c = Cipher(algorithms.AES(b"\x01" * 32), modes.CTR(b"\x00" * 16), backend)
+    buf = bytearray(len(DATA) + 15)
+    benchmark(
+        lambda: c.parallel_encryptor(workers=workers).update_into(DATA, buf)
+    )
+
+
+PACKETS = [b"\x00" * 64] * 1000
+
+
+def test_cbc_packets_new_context(benchmark, backend):
+    key = b"\x01" * 16
+    iv = b"\x00" * 16
+
+    def encrypt_packets():
+        for packet in PACKETS:
+            encryptor = Cipher(
+                algorithms.AES(key), modes.CBC(iv), backend
+            ).encryptor()
+            encryptor.update(packet)
+            encryptor.finalize()
+
+    benchmark(encrypt_packets)
+
+
+def test_cbc_packets_reset(benchmark, backend):
+    iv = b"\x00" * 16
+    encryptor = Cipher(
+        algorithms.AES(b"\x01" * 16), modes.CBC(iv), backend
+    ).encryptor()
+
+    def encrypt_packets():
+        for packet in PACKETS:
+            encryptor.reset(iv)
+            encryptor.update(packet)
+            encryptor.finalize()
+
+    benchmark(encrypt_packets)
+
+
+@pytest.mark.parametrize(
+    "mode",
+    [
+        modes.CBC(b"\x00" * 16),
+        modes.CTR(b"\x00" * 16),
+        modes.GCM(b"\x00" * 12),
+    ],
+    ids=["CBC", "CTR", "GCM"]
+)
+@pytest.mark.parametrize("size", UPDATE_SIZES)
+def test_update(benchmark, backend, mode, size):
+    encryptor = Cipher(algorithms.AES(b"\x01" * 16), mode, backend).encryptor()
+    data = DATA[:size]
+    benchmark(encryptor.update, data)
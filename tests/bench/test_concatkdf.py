@@ -0,0 +1,44 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.concatkdf import (
+    ConcatKDFHMAC, ConcatKDFHash
+)
+from cryptography.hazmat.primitives.kdf.x963kdf import X963KDF
+
+
+SHARED_SECRET = b"\x00" * 32
+INFO = b"\x01" * 32
+COUNT = 1000
+
+
+def test_concatkdf_hash(benchmark, backend):
+    def derive():
+        for _ in range(COUNT):
+            ConcatKDFHash(hashes.SHA256(), 64, INFO, backend).derive(
+                SHARED_SECRET
+            )
+
+    benchmark(derive)
+
+
+def test_concatkdf_hmac(benchmark, backend):
+    def derive():
+        for _ in range(COUNT):
+            ConcatKDFHMAC(hashes.SHA256(), 64, None, INFO, backend).derive(
+                SHARED_SECRET
+            )
+
+    benchmark(derive)
+
+
+def test_x963kdf(benchmark, backend):
+    def derive():
+        for _ in range(COUNT):
+            X963KDF(hashes.SHA256(), 64, INFO, backend).derive(SHARED_SECRET)
+
+    benchmark(derive)
@@ -0,0 +1,94 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+
+from cryptography.fernet import Fernet, FernetStream, MultiFernet
+
+
+# Each round processes TOKENS tokens so that the per-call loops and the batch
+# APIs can be compared directly in tokens per second.
+TOKENS = 1000
+
+
+def test_encrypt(benchmark, backend):
+    f = Fernet(Fernet.generate_key(), backend=backend)
+    messages = [b"session token payload"] * TOKENS
+    benchmark(lambda: [f.encrypt(message) for message in messages])
+
+
+def test_encrypt_many(benchmark, backend):
+    f = Fernet(Fernet.generate_key(), backend=backend)
+    messages = [b"session token payload"] * TOKENS
+    benchmark(f.encrypt_many, messages)
+
+
+def test_decrypt(benchmark, backend):
+    f = Fernet(Fernet.generate_key(), backend=backend)
+    tokens = f.encrypt_many([b"session token payload"] * TOKENS)
+    benchmark(lambda: [f.decrypt(token) for token in tokens])
+
+
+def test_decrypt_many(benchmark, backend):
+    f = Fernet(Fernet.generate_key(), backend=backend)
+    tokens = f.encrypt_many([b"session token payload"] * TOKENS)
+    benchmark(f.decrypt_many, tokens)
+
+
+def test_rotate(benchmark, backend):
+    f1 = Fernet(Fernet.generate_key(), backend=backend)
+    f2 = Fernet(Fernet.generate_key(), backend=backend)
+    mf = MultiFernet([f2, f1])
+    tokens = f1.encrypt_many([b"session token payload"] * TOKENS)
+    benchmark(lambda: [mf.rotate(token) for token in tokens])
+
+
+def test_rotate_many(benchmark, backend):
+    f1 = Fernet(Fernet.generate_key(), backend=backend)
+    f2 = Fernet(Fernet.generate_key(), backend=backend)
+    mf = MultiFernet([f2, f1])
+    tokens = f1.encrypt_many([b"session token payload"] * TOKENS)
+    benchmark(lambda: list(mf.rotate_many(tokens, workers=4)))
+
+
+@pytest.mark.parametrize("version", [0x80, 0x81])
+@pytest.mark.parametrize("size", [16, 1024, 65536])
+def test_encrypt_version(benchmark, backend, version, size):
+    f = Fernet(Fernet.generate_key(), backend=backend, version=version)
+    message = b"x" * size
+    benchmark(f.encrypt, message)
+
+
+@pytest.mark.parametrize("version", [0x80, 0x81])
+@pytest.mark.parametrize("size", [16, 1024, 65536])
+def test_decrypt_version(benchmark, backend, version, size):
+    f = Fernet(Fernet.generate_key(), backend=backend, version=version)
+    token = f.encrypt(b"x" * size)
+    benchmark(f.decrypt, token)
+
+
+def test_stream_encrypt_single_update(benchmark, backend):
+    stream = FernetStream(Fernet.generate_key(), 4096, backend=backend)
+    data = b"x" * (16 * 1024 * 1024)
+
+    def encrypt():
+        encryptor = stream.encryptor()
+        return encryptor.update(data) + encryptor.finalize()
+
+    benchmark(encrypt)
+
+
+def test_stream_decrypt_single_update(benchmark, backend):
+    stream = FernetStream(Fernet.generate_key(), 4096, backend=backend)
+    encryptor = stream.encryptor()
+    ciphertext = encryptor.update(b"x" * (16 * 1024 * 1024))
+    ciphertext += encryptor.finalize()
+
+    def decrypt():
+        decryptor = stream.decryptor()
+        return decryptor.update(ciphertext) + decryptor.finalize()
+
+    benchmark(decrypt)
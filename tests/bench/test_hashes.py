@@ -0,0 +1,65 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+import hashlib
+
+import pytest
+
+from cryptography.hazmat.primitives import hashes
+
+
+ITEMS = [b"\x00" * 64] * 10000
+FILE_SIZE = 16 * 1024 * 1024
+
+
+def test_hash_per_item(benchmark, backend):
+    def digest():
+        for item in ITEMS:
+            h = hashes.Hash(hashes.SHA256(), backend)
+            h.update(item)
+            h.finalize()
+
+    benchmark(digest)
+
+
+def test_digest_many(benchmark, backend):
+    benchmark(hashes.digest_many, hashes.SHA256(), ITEMS, backend)
+
+
+def test_hashlib_per_item(benchmark):
+    benchmark(lambda: [hashlib.sha256(item).digest() for item in ITEMS])
+
+
+@pytest.fixture(scope="module")
+def paths(tmpdir_factory):
+    tmpdir = tmpdir_factory.mktemp("hash_files")
+    paths = []
+    for i in range(4):
+        path = tmpdir.join(str(i))
+        path.write_binary(b"\x00" * FILE_SIZE)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_hash_files(benchmark, backend, paths, workers):
+    benchmark(
+        hashes.hash_files, paths, hashes.SHA256(), backend, workers=workers
+    )
+
+
+def test_hashlib_files(benchmark, paths):
+    def digest():
+        digests = []
+        for path in paths:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(2 ** 20), b""):
+                    h.update(chunk)
+            digests.append(h.digest())
+        return digests
+
+    benchmark(digest)
@@ -0,0 +1,36 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+
+IKM = b"\x00" * 32
+SALT = b"\x01" * 32
+REQUESTS = [
+    ("tenant-{0}".format(i % 100).encode("ascii"), 64) for i in range(1000)
+]
+
+
+def test_hkdf_derive_per_key(benchmark, backend):
+    def derive():
+        for info, length in REQUESTS:
+            HKDF(hashes.SHA256(), length, SALT, info, backend).derive(IKM)
+
+    benchmark(derive)
+
+
+def test_hkdf_expand_many(benchmark, backend):
+    def derive():
+        hkdf = HKDF(hashes.SHA256(), 32, SALT, None, backend)
+        hkdf.extract(IKM).expand_many(REQUESTS)
+
+    benchmark(derive)
+
+
+def test_hkdf_expand_cached(benchmark, backend):
+    prk = HKDF(hashes.SHA256(), 32, SALT, None, backend).extract(IKM, 100)
+    benchmark(prk.expand_many, REQUESTS)
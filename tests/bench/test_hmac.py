@@ -0,0 +1,31 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+from cryptography.hazmat.primitives import hashes, hmac
+
+
+KEY = b"\x00" * 32
+MESSAGES = [b"\x00" * 256] * 10000
+
+
+def test_hmac_per_message(benchmark, backend):
+    def sign():
+        for message in MESSAGES:
+            h = hmac.HMAC(KEY, hashes.SHA256(), backend)
+            h.update(message)
+            h.finalize()
+
+    benchmark(sign)
+
+
+def test_hmac_key_sign(benchmark, backend):
+    key = hmac.HMACKey(KEY, hashes.SHA256(), backend)
+
+    def sign():
+        for message in MESSAGES:
+            key.sign(message)
+
+    benchmark(sign)
@@ -0,0 +1,35 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.kbkdf import (
+    CounterLocation, KBKDFHMAC, Mode
+)
+
+
+KEY = b"\x00" * 32
+PAIRS = [
+    (b"label", "context-{0}".format(i).encode("ascii")) for i in range(1000)
+]
+
+
+def _kbkdf(backend, label=None, context=None):
+    return KBKDFHMAC(
+        hashes.SHA256(), Mode.CounterMode, 64, 4, 4,
+        CounterLocation.BeforeFixed, label, context, None, backend
+    )
+
+
+def test_kbkdf_derive_per_key(benchmark, backend):
+    def derive():
+        for label, context in PAIRS:
+            _kbkdf(backend, label, context).derive(KEY)
+
+    benchmark(derive)
+
+
+def test_kbkdf_derive_many(benchmark, backend):
+    benchmark(lambda: _kbkdf(backend).keyed(KEY).derive_many(PAIRS))
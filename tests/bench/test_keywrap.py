@@ -0,0 +1,44 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+from cryptography.hazmat.primitives import keywrap
+
+from ..hazmat.primitives.test_keywrap import CipherOnlyBackend
+
+
+WRAPPING_KEY = b"\x01" * 32
+
+
+def _wrapped_keys(backend):
+    return [
+        keywrap.aes_key_wrap(WRAPPING_KEY, b"\x00" * 32, backend)
+    ] * 1000
+
+
+def test_unwrap_ecb(benchmark, backend):
+    wrapped_keys = _wrapped_keys(backend)
+    backend = CipherOnlyBackend(backend)
+    benchmark(lambda: [
+        keywrap.aes_key_unwrap(WRAPPING_KEY, wrapped_key, backend)
+        for wrapped_key in wrapped_keys
+    ])
+
+
+def test_unwrap(benchmark, backend):
+    wrapped_keys = _wrapped_keys(backend)
+    benchmark(lambda: [
+        keywrap.aes_key_unwrap(WRAPPING_KEY, wrapped_key, backend)
+        for wrapped_key in wrapped_keys
+    ])
+
+
+def test_unwrap_many(benchmark, backend):
+    wrapped_keys = _wrapped_keys(backend)
+    benchmark(
+        lambda: keywrap.aes_key_unwrap_many(
+            WRAPPING_KEY, wrapped_keys, backend
+        )
+    )
@@ -0,0 +1,65 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+import pytest
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+
+@pytest.mark.parametrize("size", [5, 16, 100, 4096])
+def test_padder_small_updates(benchmark, size):
+    chunk = b"\x00" * size
+
+    def pad():
+        padder = padding.PKCS7(128).padder()
+        for _ in range(1000):
+            padder.update(chunk)
+        padder.finalize()
+
+    benchmark(pad)
+
+
+@pytest.mark.parametrize("size", [5, 16, 100, 4096])
+def test_unpadder_small_updates(benchmark, size):
+    chunk = b"\x00" * size
+
+    def unpad():
+        unpadder = padding.PKCS7(128).unpadder()
+        for _ in range(1000):
+            unpadder.update(chunk)
+        unpadder.update(b"\x10" * 16)
+
+    benchmark(unpad)
+
+
+DATA = b"\x00" * (16 * 1024 * 1024 + 5)
+
+
+def test_pad_then_encrypt(benchmark, backend):
+    cipher = Cipher(
+        algorithms.AES(b"\x01" * 16), modes.CBC(b"\x00" * 16), backend
+    )
+
+    def encrypt():
+        padder = padding.PKCS7(128).padder()
+        padded = padder.update(DATA) + padder.finalize()
+        encryptor = cipher.encryptor()
+        return encryptor.update(padded) + encryptor.finalize()
+
+    benchmark(encrypt)
+
+
+def test_pad_and_encrypt(benchmark, backend):
+    cipher = Cipher(
+        algorithms.AES(b"\x01" * 16), modes.CBC(b"\x00" * 16), backend
+    )
+
+    benchmark(
+        lambda: padding.pad_and_encrypt(
+            padding.PKCS7(128), cipher.encryptor(), DATA
+        )
+    )
@@ -32,6 +32,9 @@ class DummyHashAlgorithm(object):
     block_size = None
     digest_size = None
 
+    def __init__(self, digest_size=None):
+        self.digest_size = digest_size
+
 
 @utils.register_interface(serialization.KeySerializationEncryption)
 class DummyKeySerializationEncryption(object):
@@ -21,7 +21,7 @@ from cryptography.hazmat.backends.openssl.backend import (
     Backend, backend
 )
 from cryptography.hazmat.backends.openssl.ec import _sn_to_elliptic_curve
-from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives import hashes, hmac, serialization
 from cryptography.hazmat.primitives.asymmetric import dh, dsa, padding
 from cryptography.hazmat.primitives.ciphers import Cipher
 from cryptography.hazmat.primitives.ciphers.algorithms import AES
@@ -97,6 +97,63 @@ class TestOpenSSL(object):
         with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_CIPHER):
             cipher.encryptor()
 
+    def test_cipher_cache(self):
+        b = Backend()
+        assert b.cipher_supported(AES(b"\x00" * 16), CBC(b"\x00" * 16))
+        info = b.cipher_cache_info()
+        assert b.cipher_supported(AES(b"\x01" * 16), CBC(b"\x01" * 16))
+        assert b.cipher_cache_info() == (info.hits + 1, info.misses, info.size)
+        assert b.cipher_supported(AES(b"\x00" * 32), CBC(b"\x00" * 16))
+        assert b.cipher_cache_info() == (
+            info.hits + 1, info.misses + 1, info.size + 1
+        )
+        Cipher(AES(b"\x00" * 32), CBC(b"\x00" * 16), b).encryptor()
+        assert b.cipher_cache_info().hits == info.hits + 2
+
+    def test_cipher_cache_unsupported(self):
+        b = Backend()
+        b.register_cipher_adapter(
+            DummyCipherAlgorithm,
+            DummyMode,
+            lambda backend, cipher, mode: backend._ffi.NULL
+        )
+        for _ in range(2):
+            assert not b.cipher_supported(DummyCipherAlgorithm(), DummyMode())
+        assert b.cipher_cache_info().hits == 1
+
+    def test_register_cipher_adapter_clears_cache(self):
+        b = Backend()
+        b.cipher_supported(AES(b"\x00" * 16), CBC(b"\x00" * 16))
+        assert b.cipher_cache_info().size > 0
+        b.register_cipher_adapter(
+            DummyCipherAlgorithm,
+            DummyMode,
+            lambda backend, cipher, mode: backend._ffi.NULL
+        )
+        assert b.cipher_cache_info().size == 0
+
+    def test_digest_cache(self):
+        b = Backend()
+        assert b.hash_supported(hashes.SHA256())
+        info = b.digest_cache_info()
+        hashes.Hash(hashes.SHA256(), b)
+        assert b.digest_cache_info() == (info.hits + 1, info.misses, info.size)
+        assert b.hash_supported(hashes.BLAKE2s(32))
+        assert b.digest_cache_info() == (
+            info.hits + 1, info.misses + 1, info.size + 1
+        )
+        hmac.HMAC(b"\x00" * 32, hashes.BLAKE2s(32), b)
+        assert b.digest_cache_info().hits == info.hits + 2
+
+    def test_digest_cache_unsupported(self):
+        b = Backend()
+        for _ in range(2):
+            assert not b.hash_supported(DummyHashAlgorithm())
+        assert b.digest_cache_info() == (1, 1, 1)
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_HASH):
+            hashes.Hash(DummyHashAlgorithm(), b)
+        assert b.digest_cache_info().hits == 2
+
     def test_openssl_assert(self):
         backend.openssl_assert(True)
         with pytest.raises(InternalError):
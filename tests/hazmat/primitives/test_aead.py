@@ -5,14 +5,18 @@
 from __future__ import absolute_import, division, print_function
 
 import binascii
+import io
 import os
 
 import pytest
 
-from cryptography.exceptions import InvalidTag, UnsupportedAlgorithm, _Reasons
+from cryptography.exceptions import (
+    AlreadyFinalized, InvalidTag, NotYetFinalized, UnsupportedAlgorithm,
+    _Reasons
+)
 from cryptography.hazmat.backends.interfaces import CipherBackend
 from cryptography.hazmat.primitives.ciphers.aead import (
-    AESCCM, AESGCM, ChaCha20Poly1305
+    AESCCM, AESGCM, ChaCha20Poly1305, SegmentedAEAD
 )
 
 from .utils import _load_all_params
@@ -167,6 +171,37 @@ class TestChaCha20Poly1305(object):
         computed_ct = chacha.encrypt(nonce, pt, aad)
         assert computed_ct == ct + tag
 
+    def test_encrypt_into_decrypt_into(self, backend):
+        chacha = ChaCha20Poly1305(ChaCha20Poly1305.generate_key())
+        nonce = os.urandom(12)
+        ct = chacha.encrypt(nonce, b"some_data", b"aad")
+        buf = bytearray(len(ct) + 3)
+        assert chacha.encrypt_into(nonce, b"some_data", b"aad", buf) == len(ct)
+        assert bytes(buf[:len(ct)]) == ct
+        out = bytearray(9)
+        assert chacha.decrypt_into(nonce, ct, b"aad", memoryview(out)) == 9
+        assert out == b"some_data"
+
+    def test_into_buffer_too_small(self, backend):
+        chacha = ChaCha20Poly1305(ChaCha20Poly1305.generate_key())
+        nonce = os.urandom(12)
+        with pytest.raises(ValueError):
+            chacha.encrypt_into(nonce, b"some_data", None, bytearray(24))
+        ct = chacha.encrypt(nonce, b"some_data", None)
+        with pytest.raises(ValueError):
+            chacha.decrypt_into(nonce, ct, None, bytearray(8))
+
+    def test_decrypt_into_invalid_tag(self, backend):
+        chacha = ChaCha20Poly1305(ChaCha20Poly1305.generate_key())
+        nonce = os.urandom(12)
+        ct = chacha.encrypt(nonce, b"some_data", None)
+        buf = bytearray(9)
+        with pytest.raises(InvalidTag):
+            chacha.decrypt_into(nonce, ct, b"wrong", buf)
+        assert buf == bytearray(9)
+        with pytest.raises(InvalidTag):
+            chacha.decrypt_into(nonce, b"0", None, buf)
+
 
 @pytest.mark.skipif(
     _aead_supported(AESCCM),
@@ -317,6 +352,49 @@ class TestAESCCM(object):
         with pytest.raises(InvalidTag):
             aesccm.decrypt(b"0" * 12, b"0", None)
 
+    def test_reuse_with_different_nonce_lengths(self, backend):
+        key = AESCCM.generate_key(128)
+        aesccm = AESCCM(key, tag_length=12)
+        for _ in range(2):
+            for nonce_len in range(7, 14):
+                nonce = os.urandom(nonce_len)
+                ct = aesccm.encrypt(nonce, b"some_data", b"aad")
+                assert ct == AESCCM(key, tag_length=12).encrypt(
+                    nonce, b"some_data", b"aad"
+                )
+                assert aesccm.decrypt(nonce, ct, b"aad") == b"some_data"
+
+    def test_encrypt_into_decrypt_into(self, backend):
+        aesccm = AESCCM(AESCCM.generate_key(128), tag_length=8)
+        nonce = os.urandom(12)
+        ct = aesccm.encrypt(nonce, b"some_data", b"aad")
+        buf = bytearray(len(ct) + 3)
+        assert aesccm.encrypt_into(nonce, b"some_data", b"aad", buf) == len(ct)
+        assert bytes(buf[:len(ct)]) == ct
+        out = bytearray(9)
+        assert aesccm.decrypt_into(nonce, ct, b"aad", memoryview(out)) == 9
+        assert out == b"some_data"
+
+    def test_into_buffer_too_small(self, backend):
+        aesccm = AESCCM(AESCCM.generate_key(128), tag_length=8)
+        nonce = os.urandom(12)
+        with pytest.raises(ValueError):
+            aesccm.encrypt_into(nonce, b"some_data", None, bytearray(16))
+        ct = aesccm.encrypt(nonce, b"some_data", None)
+        with pytest.raises(ValueError):
+            aesccm.decrypt_into(nonce, ct, None, bytearray(8))
+
+    def test_decrypt_into_invalid_tag(self, backend):
+        aesccm = AESCCM(AESCCM.generate_key(128), tag_length=8)
+        nonce = os.urandom(12)
+        ct = aesccm.encrypt(nonce, b"some_data", None)
+        buf = bytearray(9)
+        with pytest.raises(InvalidTag):
+            aesccm.decrypt_into(nonce, ct, b"wrong", buf)
+        assert buf == bytearray(9)
+        with pytest.raises(InvalidTag):
+            aesccm.decrypt_into(nonce, b"0", None, buf)
+
 
 def _load_gcm_vectors():
     vectors = _load_all_params(
@@ -413,3 +491,274 @@ class TestAESGCM(object):
         pt1 = aesgcm.decrypt(nonce, ct1, None)
         pt2 = aesgcm.decrypt(nonce, ct2, b"")
         assert pt1 == pt2
+
+    def test_encrypt_into_decrypt_into(self, backend):
+        aesgcm = AESGCM(AESGCM.generate_key(128))
+        nonce = os.urandom(12)
+        ct = aesgcm.encrypt(nonce, b"some_data", b"aad")
+        buf = bytearray(len(ct) + 3)
+        assert aesgcm.encrypt_into(nonce, b"some_data", b"aad", buf) == len(ct)
+        assert bytes(buf[:len(ct)]) == ct
+        out = bytearray(9)
+        assert aesgcm.decrypt_into(nonce, ct, b"aad", memoryview(out)) == 9
+        assert out == b"some_data"
+
+    def test_into_buffer_too_small(self, backend):
+        aesgcm = AESGCM(AESGCM.generate_key(128))
+        nonce = os.urandom(12)
+        with pytest.raises(ValueError):
+            aesgcm.encrypt_into(nonce, b"some_data", None, bytearray(24))
+        ct = aesgcm.encrypt(nonce, b"some_data", None)
+        with pytest.raises(ValueError):
+            aesgcm.decrypt_into(nonce, ct, None, bytearray(8))
+
+    def test_decrypt_into_invalid_tag(self, backend):
+        aesgcm = AESGCM(AESGCM.generate_key(128))
+        nonce = os.urandom(12)
+        ct = aesgcm.encrypt(nonce, b"some_data", None)
+        buf = bytearray(9)
+        with pytest.raises(InvalidTag):
+            aesgcm.decrypt_into(nonce, ct, b"wrong", buf)
+        assert buf == bytearray(9)
+        with pytest.raises(InvalidTag):
+            aesgcm.decrypt_into(nonce, b"0", None, buf)
+
+    def test_reuse_with_different_nonce_lengths(self, backend):
+        key = AESGCM.generate_key(128)
+        aesgcm = AESGCM(key)
+        for _ in range(2):
+            for nonce_len in (8, 12, 16):
+                nonce = os.urandom(nonce_len)
+                ct = aesgcm.encrypt(nonce, b"some_data", b"aad")
+                assert ct == AESGCM(key).encrypt(nonce, b"some_data", b"aad")
+                assert aesgcm.decrypt(nonce, ct, b"aad") == b"some_data"
+                with pytest.raises(InvalidTag):
+                    aesgcm.decrypt(nonce, ct, None)
+
+
+def _streaming_aead(cls):
+    if not _aead_supported(cls):
+        pytest.skip("{0} is not supported".format(cls.__name__))
+    return cls(b"0" * 32)
+
+
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+@pytest.mark.parametrize("cls", [AESGCM, ChaCha20Poly1305])
+class TestAEADStreaming(object):
+    def test_matches_one_shot(self, cls, backend):
+        aead = _streaming_aead(cls)
+        nonce = os.urandom(12)
+        data = os.urandom(1000)
+        encryptor = aead.encryptor(nonce, b"aad")
+        ct = b"".join(
+            encryptor.update(data[i:i + 97]) for i in range(0, 1000, 97)
+        )
+        assert encryptor.finalize() == b""
+        assert ct + encryptor.tag == aead.encrypt(nonce, data, b"aad")
+
+        decryptor = aead.decryptor(nonce, b"aad")
+        assert decryptor.update(ct[:500]) == b""
+        assert decryptor.update(memoryview(ct)[500:]) == b""
+        assert decryptor.finalize_with_tag(encryptor.tag) == data
+
+    def test_release_unverified(self, cls, backend):
+        aead = _streaming_aead(cls)
+        nonce = os.urandom(12)
+        ct = aead.encrypt(nonce, b"some_data", None)
+        decryptor = aead.decryptor(nonce, None, release_unverified=True)
+        assert decryptor.update(ct[:4]) == b"some"
+        buf = bytearray(5)
+        assert decryptor.update_into(ct[4:-16], buf) == 5
+        assert buf == b"_data"
+        assert decryptor.finalize_with_tag(ct[-16:]) == b""
+
+    @pytest.mark.parametrize("release_unverified", [False, True])
+    def test_invalid_tag(self, cls, release_unverified, backend):
+        aead = _streaming_aead(cls)
+        nonce = os.urandom(12)
+        ct = aead.encrypt(nonce, b"some_data", None)
+        decryptor = aead.decryptor(nonce, b"wrong", release_unverified)
+        decryptor.update(ct[:-16])
+        with pytest.raises(InvalidTag):
+            decryptor.finalize_with_tag(ct[-16:])
+        with pytest.raises(AlreadyFinalized):
+            decryptor.finalize_with_tag(ct[-16:])
+
+    def test_encrypt_update_into(self, cls, backend):
+        aead = _streaming_aead(cls)
+        nonce = os.urandom(12)
+        encryptor = aead.encryptor(nonce, None)
+        buf = bytearray(9)
+        with pytest.raises(ValueError):
+            encryptor.update_into(b"some_data", bytearray(8))
+        assert encryptor.update_into(b"some_data", buf) == 9
+        encryptor.finalize()
+        assert bytes(buf) + encryptor.tag == aead.encrypt(
+            nonce, b"some_data", None
+        )
+
+    def test_context_state(self, cls, backend):
+        aead = _streaming_aead(cls)
+        nonce = os.urandom(12)
+        encryptor = aead.encryptor(nonce, None)
+        with pytest.raises(NotYetFinalized):
+            encryptor.tag
+        encryptor.finalize()
+        assert len(encryptor.tag) == 16
+        with pytest.raises(AlreadyFinalized):
+            encryptor.update(b"")
+        with pytest.raises(AlreadyFinalized):
+            encryptor.update_into(b"", bytearray())
+        with pytest.raises(AlreadyFinalized):
+            encryptor.finalize()
+
+        decryptor = aead.decryptor(nonce, None)
+        with pytest.raises(ValueError):
+            decryptor.update_into(b"abc", bytearray(3))
+        with pytest.raises(ValueError):
+            decryptor.finalize()
+        with pytest.raises(ValueError):
+            decryptor.finalize_with_tag(encryptor.tag[:12])
+        with pytest.raises(TypeError):
+            decryptor.update(u"abc")
+        assert decryptor.finalize_with_tag(encryptor.tag) == b""
+        with pytest.raises(AlreadyFinalized):
+            decryptor.update(b"")
+
+    def test_params(self, cls, backend):
+        aead = _streaming_aead(cls)
+        with pytest.raises(TypeError):
+            aead.encryptor(u"0" * 12, None)
+        with pytest.raises(TypeError):
+            aead.decryptor(b"0" * 12, object())
+        with pytest.raises(OverflowError):
+            aead.encryptor(b"0" * 12, FakeData())
+
+
+def _segmented_encrypt(segmented, data, associated_data, chunk_size):
+    encryptor = segmented.encryptor(associated_data)
+    out = [
+        encryptor.update(data[i:i + chunk_size])
+        for i in range(0, len(data), chunk_size)
+    ]
+    out.append(encryptor.finalize())
+    return b"".join(out)
+
+
+def _segmented_decrypt(segmented, data, associated_data, chunk_size):
+    decryptor = segmented.decryptor(associated_data)
+    out = [
+        decryptor.update(data[i:i + chunk_size])
+        for i in range(0, len(data), chunk_size)
+    ]
+    out.append(decryptor.finalize())
+    return b"".join(out)
+
+
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+@pytest.mark.parametrize("cls", [AESGCM, ChaCha20Poly1305])
+class TestSegmentedAEAD(object):
+    @pytest.mark.parametrize("length", [0, 1, 63, 64, 65, 1000])
+    @pytest.mark.parametrize("chunk_size", [1, 17, 1000])
+    def test_roundtrip(self, cls, length, chunk_size, backend):
+        _streaming_aead(cls)
+        segmented = SegmentedAEAD(b"0" * 32, 64, cls)
+        data = os.urandom(length)
+        ct = _segmented_encrypt(segmented, data, b"aad", chunk_size)
+        assert len(ct) == segmented.ciphertext_length(length)
+        assert _segmented_decrypt(segmented, ct, b"aad", chunk_size) == data
+
+    def test_tampered(self, cls, backend):
+        _streaming_aead(cls)
+        segmented = SegmentedAEAD(b"0" * 32, 64, cls)
+        ct = bytearray(_segmented_encrypt(segmented, b"x" * 200, None, 200))
+        with pytest.raises(InvalidTag):
+            _segmented_decrypt(segmented, bytes(ct), b"aad", 1000)
+        for index in (0, 30, len(ct) - 1):
+            ct[index] ^= 1
+            with pytest.raises(InvalidTag):
+                _segmented_decrypt(segmented, bytes(ct), None, 1000)
+            ct[index] ^= 1
+
+    def test_truncated(self, cls, backend):
+        _streaming_aead(cls)
+        segmented = SegmentedAEAD(b"0" * 32, 64, cls)
+        ct = _segmented_encrypt(segmented, b"x" * 200, None, 200)
+        for length in (0, 10, 23 + 80, 23 + 160, len(ct) - 1):
+            with pytest.raises(InvalidTag):
+                _segmented_decrypt(segmented, ct[:length], None, 1000)
+
+    def test_segment_api(self, cls, backend):
+        _streaming_aead(cls)
+        segmented = SegmentedAEAD(b"0" * 32, 4, cls)
+        header = segmented.generate_header()
+        segments = [
+            segmented.encrypt_segment(header, i, data, i == 2, None)
+            for i, data in enumerate([b"abcd", b"efgh", b"ij"])
+        ]
+        assert segmented.decrypt_segment(
+            header, 1, segments[1], False, None
+        ) == b"efgh"
+        with pytest.raises(InvalidTag):
+            segmented.decrypt_segment(header, 0, segments[1], False, None)
+        with pytest.raises(InvalidTag):
+            segmented.decrypt_segment(header, 2, segments[2], False, None)
+        assert _segmented_decrypt(
+            segmented, header + b"".join(segments), None, 5
+        ) == b"abcdefghij"
+        with pytest.raises(ValueError):
+            segmented.encrypt_segment(header, 0, b"abc", False, None)
+        with pytest.raises(ValueError):
+            segmented.encrypt_segment(header, 0, b"abcde", True, None)
+        with pytest.raises(ValueError):
+            segmented.encrypt_segment(header[:-1], 0, b"abcd", True, None)
+        with pytest.raises(ValueError):
+            segmented.encrypt_segment(header, 2 ** 32, b"abcd", True, None)
+
+    def test_decrypt_range(self, cls, backend):
+        _streaming_aead(cls)
+        segmented = SegmentedAEAD(b"0" * 32, 64, cls)
+        data = os.urandom(1000)
+        f = io.BytesIO(_segmented_encrypt(segmented, data, b"aad", 1000))
+        for offset, length in [
+            (0, 1000), (0, 1), (63, 2), (100, 300), (999, 1), (990, 100),
+            (1000, 10), (5000, 10), (10, 0)
+        ]:
+            assert segmented.decrypt_range(
+                f, offset, length, b"aad"
+            ) == data[offset:offset + length]
+        with pytest.raises(InvalidTag):
+            segmented.decrypt_range(f, 0, 10, None)
+        with pytest.raises(ValueError):
+            segmented.decrypt_range(f, -1, 10, b"aad")
+
+    def test_context_state(self, cls, backend):
+        _streaming_aead(cls)
+        segmented = SegmentedAEAD(b"0" * 32, 64, cls)
+        encryptor = segmented.encryptor(None)
+        ct = encryptor.finalize()
+        with pytest.raises(AlreadyFinalized):
+            encryptor.update(b"")
+        with pytest.raises(AlreadyFinalized):
+            encryptor.finalize()
+        decryptor = segmented.decryptor(None)
+        decryptor.update(ct)
+        assert decryptor.finalize() == b""
+        with pytest.raises(AlreadyFinalized):
+            decryptor.update(b"")
+        with pytest.raises(AlreadyFinalized):
+            decryptor.finalize()
+
+    def test_invalid_arguments(self, cls, backend):
+        _streaming_aead(cls)
+        with pytest.raises(TypeError):
+            SegmentedAEAD(b"0" * 32, 64, AESCCM)
+        with pytest.raises(TypeError):
+            SegmentedAEAD(b"0" * 32, 64.0, cls)
+        with pytest.raises(ValueError):
+            SegmentedAEAD(b"0" * 32, 0, cls)
+        with pytest.raises(ValueError):
+            SegmentedAEAD(b"0" * 32, 2 ** 24 + 1, cls)
+        with pytest.raises(ValueError):
+            SegmentedAEAD(b"0" * 31, 64, cls)
+        assert SegmentedAEAD(b"0" * 32, 64, cls).segment_size == 64
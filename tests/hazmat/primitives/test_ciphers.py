@@ -5,16 +5,19 @@
 from __future__ import absolute_import, division, print_function
 
 import binascii
+import gc
 import os
+import threading
 
 import pytest
 
+from cryptography import utils
 from cryptography.exceptions import AlreadyFinalized, _Reasons
 from cryptography.hazmat.backends.interfaces import CipherBackend
-from cryptography.hazmat.primitives import ciphers
+from cryptography.hazmat.primitives import ciphers, padding
 from cryptography.hazmat.primitives.ciphers import modes
 from cryptography.hazmat.primitives.ciphers.algorithms import (
-    AES, ARC4, Blowfish, CAST5, Camellia, IDEA, SEED, TripleDES
+    AES, ARC4, Blowfish, CAST5, Camellia, ChaCha20, IDEA, SEED, TripleDES
 )
 
 from ...utils import (
@@ -288,6 +291,25 @@ class TestCipherUpdateInto(object):
         assert res == len(pt)
         assert bytes(buf)[:res] == ct
 
+    @pytest.mark.parametrize(
+        "params",
+        load_vectors_from_file(
+            os.path.join("ciphers", "AES", "ECB", "ECBGFSbox128.rsp"),
+            load_nist_vectors
+        )
+    )
+    def test_update_byteslike(self, params, backend):
+        key = binascii.unhexlify(params["key"])
+        pt = binascii.unhexlify(params["plaintext"])
+        ct = binascii.unhexlify(params["ciphertext"])
+        c = ciphers.Cipher(AES(key), modes.ECB(), backend)
+        encryptor = c.encryptor()
+        assert encryptor.update(bytearray(pt)) == ct
+        buf = bytearray(len(pt) + 15)
+        res = encryptor.update_into(memoryview(pt), buf)
+        assert res == len(pt)
+        assert bytes(buf)[:res] == ct
+
     def test_update_into_buffer_too_small(self, backend):
         key = b"\x00" * 16
         c = ciphers.Cipher(AES(key), modes.ECB(), backend)
@@ -309,3 +331,426 @@ class TestCipherUpdateInto(object):
         buf = bytearray(5)
         with pytest.raises(ValueError):
             encryptor.update_into(b"testing", buf)
+
+
+@pytest.mark.supported(
+    only_if=lambda backend: backend.cipher_supported(
+        AES(b"\x00" * 16), modes.CTR(b"\x00" * 16)
+    ),
+    skip_message="Does not support AES CTR",
+)
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+class TestParallelCipherContextCTR(object):
+    @pytest.mark.parametrize(
+        "nonce", [b"\x00" * 16, b"\xff" * 16, b"\x00" * 8 + b"\xff" * 8]
+    )
+    def test_matches_serial(self, nonce, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(nonce), backend)
+        pt = os.urandom(10000)
+        serial = c.encryptor()
+        parallel = c.parallel_encryptor(workers=4, chunk_size=256)
+        # Uneven update sizes check that the keystream offset is carried
+        # across updates that don't end on a block boundary.
+        for start, end in [(0, 7), (7, 1000), (1000, 1000), (1000, 10000)]:
+            assert parallel.update(pt[start:end]) == serial.update(
+                pt[start:end]
+            )
+        assert parallel.finalize() == b""
+
+        ct = c.encryptor().update(pt)
+        decryptor = c.parallel_decryptor(workers=3, chunk_size=512)
+        buf = bytearray(len(ct) + 15)
+        assert decryptor.update_into(ct, buf) == len(ct)
+        assert bytes(buf[:len(ct)]) == pt
+
+    def test_pool_reused(self, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(b"\x00" * 16), backend)
+        threads = threading.active_count()
+        encryptor = c.parallel_encryptor(workers=2, chunk_size=256)
+        encryptor.update(b"\x00" * 1024)
+        pool = encryptor._pool
+        assert pool is not None
+        encryptor.update(b"\x00" * 1024)
+        assert encryptor._pool is pool
+        encryptor.finalize()
+        assert encryptor._pool is None
+        assert threading.active_count() == threads
+
+    def test_pool_closed_when_dropped(self, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(b"\x00" * 16), backend)
+        threads = threading.active_count()
+        encryptor = c.parallel_encryptor(workers=2, chunk_size=256)
+        encryptor.update(b"\x00" * 1024)
+        assert threading.active_count() > threads
+        del encryptor
+        gc.collect()
+        assert threading.active_count() == threads
+
+    def test_already_finalized(self, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(b"\x00" * 16), backend)
+        encryptor = c.parallel_encryptor(workers=2)
+        encryptor.finalize()
+        with pytest.raises(AlreadyFinalized):
+            encryptor.update(b"")
+        with pytest.raises(AlreadyFinalized):
+            encryptor.finalize()
+
+    def test_buffer_too_small(self, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(b"\x00" * 16), backend)
+        encryptor = c.parallel_encryptor(workers=2)
+        with pytest.raises(ValueError):
+            encryptor.update_into(b"\x00" * 32, bytearray(32))
+
+    def test_invalid_arguments(self, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(b"\x00" * 16), backend)
+        with pytest.raises(TypeError):
+            c.parallel_encryptor(workers=1.0)
+        with pytest.raises(ValueError):
+            c.parallel_encryptor(workers=0)
+        with pytest.raises(TypeError):
+            c.parallel_encryptor(chunk_size=1024.0)
+        with pytest.raises(ValueError):
+            c.parallel_encryptor(chunk_size=0)
+        with pytest.raises(ValueError):
+            c.parallel_decryptor(chunk_size=1000)
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.ECB(), backend)
+        with pytest.raises(TypeError):
+            c.parallel_encryptor()
+
+
+@pytest.mark.supported(
+    only_if=lambda backend: backend.cipher_supported(
+        AES(b"\x00" * 32), modes.XTS(b"\x00" * 16)
+    ),
+    skip_message="Does not support AES XTS",
+)
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+class TestParallelCipherContextXTS(object):
+    def test_matches_per_sector(self, backend):
+        key = os.urandom(64)
+        pt = os.urandom(512 * 7 + 100)
+        mode = modes.XTS(b"\xff" + b"\x00" * 15)
+        c = ciphers.Cipher(AES(key), mode, backend)
+        encryptor = c.parallel_encryptor(workers=4, chunk_size=512)
+        ct = encryptor.update(pt[:1024]) + encryptor.update(pt[1024:])
+        encryptor.finalize()
+        for sector in range(8):
+            tweak = binascii.unhexlify("{0:032x}".format(sector + 0xff))[::-1]
+            sector_c = ciphers.Cipher(AES(key), modes.XTS(tweak), backend)
+            expected = sector_c.encryptor().update(
+                pt[sector * 512:(sector + 1) * 512]
+            )
+            assert ct[sector * 512:(sector + 1) * 512] == expected
+
+        decryptor = c.parallel_decryptor(workers=4, chunk_size=512)
+        assert decryptor.update(ct) == pt
+
+    def test_unaligned_update(self, backend):
+        key = os.urandom(64)
+        c = ciphers.Cipher(AES(key), modes.XTS(b"\x00" * 16), backend)
+        encryptor = c.parallel_encryptor(workers=2, chunk_size=512)
+        encryptor.update(b"\x00" * 600)
+        with pytest.raises(ValueError):
+            encryptor.update(b"\x00" * 512)
+        encryptor = c.parallel_encryptor(workers=2, chunk_size=512)
+        with pytest.raises(ValueError):
+            encryptor.update(b"\x00" * 520)
+
+
+@pytest.mark.supported(
+    only_if=lambda backend: backend.cipher_supported(
+        AES(b"\x00" * 16), modes.CTR(b"\x00" * 16)
+    ),
+    skip_message="Does not support AES CTR",
+)
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+class TestCipherSeekCTR(object):
+    @pytest.mark.parametrize("nonce", [b"\x00" * 16, b"\xff" * 16])
+    @pytest.mark.parametrize("offset", [0, 1, 15, 16, 17, 1000])
+    def test_encryptor_at(self, nonce, offset, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(nonce), backend)
+        pt = os.urandom(1100)
+        ct = c.encryptor().update(pt)
+        encryptor = c.encryptor_at(offset)
+        assert encryptor.update(pt[offset:]) + encryptor.finalize() == (
+            ct[offset:]
+        )
+        decryptor = c.decryptor_at(offset)
+        assert decryptor.update(ct[offset:offset + 50]) == (
+            pt[offset:offset + 50]
+        )
+
+    def test_invalid_offset(self, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.CTR(b"\x00" * 16), backend)
+        with pytest.raises(TypeError):
+            c.encryptor_at(1.0)
+        with pytest.raises(ValueError):
+            c.decryptor_at(-1)
+
+    def test_unsupported_mode(self, backend):
+        c = ciphers.Cipher(AES(b"\x01" * 16), modes.ECB(), backend)
+        with pytest.raises(TypeError):
+            c.encryptor_at(0)
+
+
+@pytest.mark.supported(
+    only_if=lambda backend: backend.cipher_supported(
+        ChaCha20(b"\x00" * 32, b"0" * 16), None
+    ),
+    skip_message="Does not support ChaCha20",
+)
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+class TestCipherSeekChaCha20(object):
+    @pytest.mark.parametrize(
+        "counter", [b"\x00" * 8, b"\xff" * 4 + b"\x00" * 4, b"\xff" * 8]
+    )
+    @pytest.mark.parametrize("offset", [0, 1, 63, 64, 65, 1000])
+    def test_encryptor_at(self, counter, offset, backend):
+        key = os.urandom(32)
+        c = ciphers.Cipher(ChaCha20(key, counter + b"\x01" * 8), None, backend)
+        pt = os.urandom(1100)
+        ct = c.encryptor().update(pt)
+        assert c.encryptor_at(offset).update(pt[offset:]) == ct[offset:]
+        assert c.decryptor_at(offset).update(ct[offset:]) == pt[offset:]
+
+
+@utils.register_interface(CipherBackend)
+class _NonResettableCipherBackend(object):
+    def __init__(self, backend):
+        self._backend = backend
+
+    def cipher_supported(self, cipher, mode):
+        return self._backend.cipher_supported(cipher, mode)
+
+    def create_symmetric_encryption_ctx(self, cipher, mode):
+        return _NonResettableContext(
+            self._backend.create_symmetric_encryption_ctx(cipher, mode)
+        )
+
+    def create_symmetric_decryption_ctx(self, cipher, mode):
+        return _NonResettableContext(
+            self._backend.create_symmetric_decryption_ctx(cipher, mode)
+        )
+
+
+class _NonResettableContext(object):
+    def __init__(self, ctx):
+        self._ctx = ctx
+
+    def update(self, data):
+        return self._ctx.update(data)
+
+    def update_into(self, data, buf):
+        return self._ctx.update_into(data, buf)
+
+    def finalize(self):
+        return self._ctx.finalize()
+
+
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+class TestCipherContextReset(object):
+    @pytest.mark.parametrize(
+        ("mode", "iv_length"),
+        [
+            (modes.CBC, 16),
+            (modes.CTR, 16),
+            (modes.OFB, 16),
+            (modes.CFB, 16),
+            (modes.CFB8, 16),
+        ]
+    )
+    def test_reset(self, mode, iv_length, backend):
+        key = os.urandom(16)
+        iv1 = os.urandom(iv_length)
+        iv2 = os.urandom(iv_length)
+        if not backend.cipher_supported(AES(key), mode(iv1)):
+            pytest.skip("Does not support AES {0}".format(mode.name))
+        pt = os.urandom(64)
+        encryptor = ciphers.Cipher(AES(key), mode(iv1), backend).encryptor()
+        # Leave a partial block buffered to check that reset discards it.
+        encryptor.update(pt[:7])
+        encryptor.reset(iv2)
+        ct = encryptor.update(pt) + encryptor.finalize()
+        expected = ciphers.Cipher(AES(key), mode(iv2), backend).encryptor()
+        assert ct == expected.update(pt) + expected.finalize()
+
+        encryptor.reset(iv1)
+        ct = encryptor.update(pt) + encryptor.finalize()
+        decryptor = ciphers.Cipher(AES(key), mode(iv2), backend).decryptor()
+        decryptor.reset(iv1)
+        assert decryptor.update(ct) + decryptor.finalize() == pt
+
+    def test_reset_ecb(self, backend):
+        key = os.urandom(16)
+        c = ciphers.Cipher(AES(key), modes.ECB(), backend)
+        encryptor = c.encryptor()
+        encryptor.update(b"\x00" * 7)
+        with pytest.raises(ValueError):
+            encryptor.reset(b"\x00" * 16)
+        encryptor.reset()
+        assert encryptor.update(b"\x00" * 16) == (
+            c.encryptor().update(b"\x00" * 16)
+        )
+
+    def test_reset_invalid_iv(self, backend):
+        c = ciphers.Cipher(AES(b"\x00" * 16), modes.CBC(b"\x00" * 16), backend)
+        encryptor = c.encryptor()
+        with pytest.raises(ValueError):
+            encryptor.reset(b"\x00" * 8)
+        with pytest.raises(TypeError):
+            encryptor.reset()
+
+    @pytest.mark.supported(
+        only_if=lambda backend: backend.cipher_supported(
+            ChaCha20(b"\x00" * 32, b"0" * 16), None
+        ),
+        skip_message="Does not support ChaCha20",
+    )
+    def test_reset_chacha20(self, backend):
+        key = os.urandom(32)
+        c = ciphers.Cipher(ChaCha20(key, b"0" * 16), None, backend)
+        encryptor = c.encryptor()
+        encryptor.update(b"\x00" * 100)
+        encryptor.reset(b"1" * 16)
+        expected = ciphers.Cipher(ChaCha20(key, b"1" * 16), None, backend)
+        assert encryptor.update(b"\x00" * 100) == (
+            expected.encryptor().update(b"\x00" * 100)
+        )
+
+    @pytest.mark.supported(
+        only_if=lambda backend: backend.cipher_supported(
+            ARC4(b"\x00" * 16), None
+        ),
+        skip_message="Does not support ARC4",
+    )
+    def test_reset_unsupported(self, backend):
+        c = ciphers.Cipher(ARC4(b"\x00" * 16), None, backend)
+        encryptor = c.encryptor()
+        with pytest.raises(TypeError):
+            encryptor.reset()
+
+    def test_reset_after_finalize(self, backend):
+        key = os.urandom(16)
+        c = ciphers.Cipher(AES(key), modes.CBC(b"\x00" * 16), backend)
+        decryptor = c.decryptor()
+        ct = c.encryptor().update(b"\x00" * 32)
+        assert decryptor.update(ct) + decryptor.finalize() == b"\x00" * 32
+        # The first reset after finalize builds the keyed template and later
+        # ones copy it.
+        for pt in [b"\x01" * 32, b"\x02" * 32, b"\x03" * 32]:
+            iv = os.urandom(16)
+            c = ciphers.Cipher(AES(key), modes.CBC(iv), backend)
+            ct = c.encryptor().update(pt)
+            decryptor.reset(iv)
+            assert decryptor.update(ct) + decryptor.finalize() == pt
+
+    def test_reset_padded(self, backend):
+        c = ciphers.Cipher(
+            AES(b"\x00" * 16), modes.CBC(b"\x00" * 16, padding.PKCS7(128)),
+            backend
+        )
+        encryptor = c.encryptor()
+        ct = encryptor.update(b"abc") + encryptor.finalize()
+        encryptor.reset(b"\x00" * 16)
+        assert encryptor.update(b"abc") + encryptor.finalize() == ct
+
+    @pytest.mark.supported(
+        only_if=lambda backend: backend.cipher_supported(
+            AES(b"\x00" * 16), modes.GCM(b"\x00" * 12)
+        ),
+        skip_message="Does not support AES GCM",
+    )
+    def test_reset_gcm(self, backend):
+        c = ciphers.Cipher(AES(b"\x00" * 16), modes.GCM(b"\x00" * 12), backend)
+        encryptor = c.encryptor()
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_CIPHER):
+            encryptor.reset(b"\x01" * 12)
+        encryptor.finalize()
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_CIPHER):
+            encryptor.reset(b"\x01" * 12)
+
+    def test_reset_backend_unsupported(self, backend):
+        c = ciphers.Cipher(
+            AES(b"\x00" * 16), modes.CBC(b"\x00" * 16),
+            _NonResettableCipherBackend(backend)
+        )
+        encryptor = c.encryptor()
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_CIPHER):
+            encryptor.reset(b"\x00" * 16)
+        assert len(encryptor.update(b"\x00" * 16)) == 16
+
+
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+class TestCBCPadding(object):
+    @pytest.mark.parametrize("length", [0, 1, 15, 16, 17, 100])
+    def test_matches_padding_module(self, length, backend):
+        key = os.urandom(16)
+        iv = os.urandom(16)
+        pt = os.urandom(length)
+        c = ciphers.Cipher(
+            AES(key), modes.CBC(iv, padding.PKCS7(128)), backend
+        )
+        encryptor = c.encryptor()
+        ct = encryptor.update(pt) + encryptor.finalize()
+        assert ct == padding.pad_and_encrypt(
+            padding.PKCS7(128),
+            ciphers.Cipher(AES(key), modes.CBC(iv), backend).encryptor(),
+            pt
+        )
+
+        decryptor = c.decryptor()
+        buf = bytearray(len(ct) + 16)
+        n = 0
+        for i in range(0, len(ct), 7):
+            n += decryptor.update_into(ct[i:i + 7], memoryview(buf)[n:])
+        assert bytes(buf[:n]) + decryptor.finalize() == pt
+
+    @pytest.mark.parametrize("ct", [
+        b"",
+        b"\x00" * 15,
+        b"\x00" * 17,
+        b"\x00" * 32,
+    ])
+    def test_invalid_padding(self, ct, backend):
+        c = ciphers.Cipher(
+            AES(b"\x00" * 16), modes.CBC(b"\x00" * 16, padding.PKCS7(128)),
+            backend
+        )
+        decryptor = c.decryptor()
+        decryptor.update(ct)
+        with pytest.raises(ValueError, match="Invalid padding bytes."):
+            decryptor.finalize()
+
+    def test_update_into_buffer_too_small(self, backend):
+        c = ciphers.Cipher(
+            AES(b"\x00" * 16), modes.CBC(b"\x00" * 16, padding.PKCS7(128)),
+            backend
+        )
+        decryptor = c.decryptor()
+        with pytest.raises(ValueError):
+            decryptor.update_into(b"\x00" * 16, bytearray(31))
+        encryptor = c.encryptor()
+        assert encryptor.update_into(b"\x00" * 16, bytearray(31)) == 16
+
+    def test_reset(self, backend):
+        key = os.urandom(16)
+        mode = modes.CBC(b"\x00" * 16, padding.PKCS7(128))
+        encryptor = ciphers.Cipher(AES(key), mode, backend).encryptor()
+        encryptor.update(b"\x00" * 7)
+        encryptor.reset(b"\x01" * 16)
+        ct = encryptor.update(b"\x00" * 7) + encryptor.finalize()
+        assert len(ct) == 16
+        decryptor = ciphers.Cipher(
+            AES(key), modes.CBC(b"\x01" * 16, padding.PKCS7(128)), backend
+        ).decryptor()
+        assert decryptor.update(ct) + decryptor.finalize() == b"\x00" * 7
+
+    def test_invalid_padding_argument(self, backend):
+        with pytest.raises(TypeError):
+            modes.CBC(b"\x00" * 16, padding.ANSIX923(128))
+        with pytest.raises(ValueError):
+            ciphers.Cipher(
+                AES(b"\x00" * 16),
+                modes.CBC(b"\x00" * 16, padding.PKCS7(64)),
+                backend
+            )
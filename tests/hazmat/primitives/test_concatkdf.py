@@ -8,18 +8,41 @@ import binascii
 
 import pytest
 
+from cryptography import utils
 from cryptography.exceptions import (
     AlreadyFinalized, InvalidKey, _Reasons
 )
-from cryptography.hazmat.backends.interfaces import HMACBackend
-from cryptography.hazmat.backends.interfaces import HashBackend
+from cryptography.hazmat.backends.interfaces import (
+    ConcatKDFBackend, HMACBackend, HashBackend
+)
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.concatkdf import ConcatKDFHMAC
 from cryptography.hazmat.primitives.kdf.concatkdf import ConcatKDFHash
 
+from ...doubles import DummyHashAlgorithm
 from ...utils import raises_unsupported_algorithm
 
 
+@utils.register_interface(HashBackend)
+@utils.register_interface(HMACBackend)
+class HashOnlyBackend(object):
+    # Hides any native ConcatKDF so the Python fallback is used.
+    def __init__(self, backend):
+        self._backend = backend
+
+    def hash_supported(self, algorithm):
+        return self._backend.hash_supported(algorithm)
+
+    def create_hash_ctx(self, algorithm):
+        return self._backend.create_hash_ctx(algorithm)
+
+    def hmac_supported(self, algorithm):
+        return self._backend.hmac_supported(algorithm)
+
+    def create_hmac_ctx(self, key, algorithm):
+        return self._backend.create_hmac_ctx(key, algorithm)
+
+
 @pytest.mark.requires_backend_interface(interface=HashBackend)
 class TestConcatKDFHash(object):
     def test_length_limit(self, backend):
@@ -263,6 +286,39 @@ class TestConcatKDFHMAC(object):
             ckdf.verify(b"foo", u"bar")
 
 
+@pytest.mark.requires_backend_interface(interface=ConcatKDFBackend)
+class TestConcatKDFBackend(object):
+    @pytest.mark.parametrize("length", [0, 1, 32, 33, 100])
+    def test_hash_matches_fallback(self, backend, length):
+        for otherinfo in [None, b"other info"]:
+            native = ConcatKDFHash(hashes.SHA256(), length, otherinfo, backend)
+            fallback = ConcatKDFHash(
+                hashes.SHA256(), length, otherinfo, HashOnlyBackend(backend)
+            )
+            assert native.derive(b"\x01" * 16) == fallback.derive(
+                b"\x01" * 16
+            )
+
+    @pytest.mark.parametrize("length", [0, 1, 32, 33, 100])
+    def test_hmac_matches_fallback(self, backend, length):
+        for salt in [None, b"salt"]:
+            native = ConcatKDFHMAC(
+                hashes.SHA256(), length, salt, b"other info", backend
+            )
+            fallback = ConcatKDFHMAC(
+                hashes.SHA256(), length, salt, b"other info",
+                HashOnlyBackend(backend)
+            )
+            assert native.derive(b"\x01" * 16) == fallback.derive(
+                b"\x01" * 16
+            )
+
+    def test_unsupported_hash(self, backend):
+        ckdf = ConcatKDFHash(DummyHashAlgorithm(32), 16, None, backend)
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_HASH):
+            ckdf.derive(b"\x01" * 16)
+
+
 def test_invalid_backend():
     pretend_backend = object()
 
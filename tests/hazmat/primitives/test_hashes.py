@@ -4,8 +4,11 @@
 
 from __future__ import absolute_import, division, print_function
 
+import hashlib
+
 import pytest
 
+from cryptography import utils
 from cryptography.exceptions import AlreadyFinalized, _Reasons
 from cryptography.hazmat.backends.interfaces import HashBackend
 from cryptography.hazmat.primitives import hashes
@@ -43,6 +46,93 @@ class TestHashContext(object):
         with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_HASH):
             hashes.Hash(DummyHashAlgorithm(), backend)
 
+    def test_update_byteslike(self, backend):
+        h = hashes.Hash(hashes.SHA256(), backend=backend)
+        h.update(bytearray(b"abc"))
+        h.update(memoryview(b"xabcdef")[1:])
+        assert h.finalize() == hashlib.sha256(b"abcabcdef").digest()
+
+
+@utils.register_interface(HashBackend)
+class HashOnlyBackend(object):
+    # Hides any native batch hashing so the Hash fallback is used.
+    def __init__(self, backend):
+        self._backend = backend
+
+    def hash_supported(self, algorithm):
+        return self._backend.hash_supported(algorithm)
+
+    def create_hash_ctx(self, algorithm):
+        return self._backend.create_hash_ctx(algorithm)
+
+
+@pytest.mark.supported(
+    only_if=lambda backend: backend.hash_supported(hashes.SHA256()),
+    skip_message="Does not support SHA256",
+)
+@pytest.mark.requires_backend_interface(interface=HashBackend)
+class TestDigestMany(object):
+    DATA = [b"", b"abc", bytearray(b"x" * 1000), memoryview(b"yz")]
+
+    def test_digest_many(self, backend):
+        assert hashes.digest_many(hashes.SHA256(), self.DATA, backend) == [
+            hashlib.sha256(item).digest() for item in self.DATA
+        ]
+        assert hashes.digest_many(hashes.SHA256(), [], backend) == []
+
+    def test_hash_only_backend(self, backend):
+        assert hashes.digest_many(
+            hashes.SHA256(), iter(self.DATA), HashOnlyBackend(backend)
+        ) == [hashlib.sha256(item).digest() for item in self.DATA]
+
+    def test_invalid_arguments(self, backend):
+        with pytest.raises(TypeError):
+            hashes.digest_many(hashes.SHA256(), [b"abc", u"abc"], backend)
+        with pytest.raises(TypeError):
+            hashes.digest_many(hashes.SHA256, [b"abc"], backend)
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_HASH):
+            hashes.digest_many(DummyHashAlgorithm(), [b"abc"], backend)
+        with raises_unsupported_algorithm(
+            _Reasons.BACKEND_MISSING_INTERFACE
+        ):
+            hashes.digest_many(hashes.SHA256(), [b"abc"], object())
+
+
+@pytest.mark.supported(
+    only_if=lambda backend: backend.hash_supported(hashes.SHA256()),
+    skip_message="Does not support SHA256",
+)
+@pytest.mark.requires_backend_interface(interface=HashBackend)
+class TestHashFiles(object):
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_hash_files(self, tmpdir, workers, backend, monkeypatch):
+        monkeypatch.setattr(hashes, "_HASH_FILE_CHUNK_SIZE", 7)
+        contents = [b"", b"abc", b"x" * 100, b"y" * 7]
+        paths = []
+        for i, content in enumerate(contents):
+            path = tmpdir.join(str(i))
+            path.write_binary(content)
+            paths.append(str(path))
+
+        assert hashes.hash_files(
+            paths, hashes.SHA256(), backend, workers=workers
+        ) == [hashlib.sha256(content).digest() for content in contents]
+
+    def test_no_files(self, backend):
+        assert hashes.hash_files([], hashes.SHA256(), backend) == []
+
+    def test_missing_file(self, tmpdir, backend):
+        with pytest.raises(IOError):
+            hashes.hash_files(
+                [str(tmpdir.join("missing"))], hashes.SHA256(), backend
+            )
+
+    def test_invalid_workers(self, backend):
+        with pytest.raises(TypeError):
+            hashes.hash_files([], hashes.SHA256(), backend, workers=1.5)
+        with pytest.raises(ValueError):
+            hashes.hash_files([], hashes.SHA256(), backend, workers=0)
+
 
 @pytest.mark.supported(
     only_if=lambda backend: backend.hash_supported(hashes.SHA1()),
@@ -14,7 +14,9 @@ from cryptography.exceptions import (
 )
 from cryptography.hazmat.backends.interfaces import HMACBackend
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.hkdf import HKDF, HKDFExpand
+from cryptography.hazmat.primitives.kdf.hkdf import (
+    HKDF, HKDFExpand, PseudorandomKey
+)
 
 from ...utils import (
     load_nist_vectors, load_vectors_from_file, raises_unsupported_algorithm
@@ -228,6 +230,78 @@ class TestHKDFExpand(object):
             hkdf.derive(u"first")
 
 
+@pytest.mark.requires_backend_interface(interface=HMACBackend)
+class TestPseudorandomKey(object):
+    def test_extract(self, backend):
+        vector = load_vectors_from_file(
+            os.path.join("KDF", "hkdf-generated.txt"), load_nist_vectors
+        )[0]
+        hkdf = HKDF(
+            hashes.SHA256(),
+            16,
+            salt=vector["salt"],
+            info=None,
+            backend=backend
+        )
+        prk = hkdf.extract(binascii.unhexlify(vector["ikm"]))
+        assert prk.algorithm.name == "sha256"
+        okm = prk.expand(vector["info"], int(vector["l"]))
+        assert okm == binascii.unhexlify(vector["okm"])
+
+    def test_expand(self, backend):
+        prk = binascii.unhexlify(
+            b"077709362c2e32df0ddc3f0dc47bba6390b6c73bb50f9c3122ec844ad7c2b3e5"
+        )
+        okm = (b"3cb25f25faacd57a90434f64d0362f2a2d2d0a90cf1a5a4c5db02d56ecc4c"
+               b"5bf34007208d5b887185865")
+        info = binascii.unhexlify(b"f0f1f2f3f4f5f6f7f8f9")
+        key = PseudorandomKey(hashes.SHA256(), prk, backend)
+
+        assert binascii.hexlify(key.expand(info, 42)) == okm
+        assert key.expand(info, 42) == key.expand(info, 42)
+        assert key.expand(None, 16) == key.expand(b"", 16)
+
+    def test_expand_many(self, backend):
+        key = PseudorandomKey(hashes.SHA256(), b"\x0b" * 32, backend)
+        requests = [(b"a", 16), (b"b", 32), (b"a", 100), (None, 1)]
+        okms = key.expand_many(requests)
+        assert [len(okm) for okm in okms] == [16, 32, 100, 1]
+        for (info, length), okm in zip(requests, okms):
+            hkdf = HKDFExpand(hashes.SHA256(), length, info, backend)
+            assert hkdf.derive(b"\x0b" * 32) == okm
+        assert key.expand_many([]) == []
+
+    def test_cache(self, backend):
+        key = PseudorandomKey(hashes.SHA256(), b"\x0b" * 32, backend, 2)
+        uncached = PseudorandomKey(hashes.SHA256(), b"\x0b" * 32, backend)
+        a = key.expand(b"a", 16)
+        assert key.expand(b"a", 16) is a
+        assert key.expand(b"a", 32) == uncached.expand(b"a", 32)
+        b = key.expand(b"b", 16)
+        assert b == uncached.expand(b"b", 16)
+        assert key.expand(b"b", 16) is b
+        assert key.expand(b"a", 16) is not a
+        assert key.expand(b"a", 16) == a
+
+    def test_invalid_arguments(self, backend):
+        with pytest.raises(TypeError):
+            PseudorandomKey(hashes.SHA256(), u"prk", backend)
+        with pytest.raises(TypeError):
+            PseudorandomKey(hashes.SHA256(), b"prk", backend, 1.0)
+        with pytest.raises(ValueError):
+            PseudorandomKey(hashes.SHA256(), b"prk", backend, -1)
+
+        key = PseudorandomKey(hashes.SHA256(), b"prk", backend)
+        with pytest.raises(TypeError):
+            key.expand(u"info", 16)
+        with pytest.raises(ValueError):
+            key.expand(b"info", 255 * hashes.SHA256().digest_size + 1)
+
+        hkdf = HKDF(hashes.SHA256(), 16, None, None, backend)
+        with pytest.raises(TypeError):
+            hkdf.extract(u"key material")
+
+
 def test_invalid_backend():
     pretend_backend = object()
 
@@ -236,3 +310,6 @@ def test_invalid_backend():
 
     with raises_unsupported_algorithm(_Reasons.BACKEND_MISSING_INTERFACE):
         HKDFExpand(hashes.SHA256(), 16, None, pretend_backend)
+
+    with raises_unsupported_algorithm(_Reasons.BACKEND_MISSING_INTERFACE):
+        PseudorandomKey(hashes.SHA256(), b"prk", pretend_backend)
@@ -35,6 +35,15 @@ class TestHMAC(object):
         with pytest.raises(TypeError):
             h.update(u"\u00FC")
 
+    def test_hmac_update_byteslike(self, backend):
+        h = hmac.HMAC(b"mykey", hashes.SHA1(), backend=backend)
+        h.update(b"abc")
+        digest = h.finalize()
+        h = hmac.HMAC(b"mykey", hashes.SHA1(), backend=backend)
+        h.update(bytearray(b"a"))
+        h.update(memoryview(b"xbcx")[1:3])
+        assert h.finalize() == digest
+
     def test_hmac_algorithm_instance(self, backend):
         with pytest.raises(TypeError):
             hmac.HMAC(b"key", hashes.SHA1, backend=backend)
@@ -80,6 +89,60 @@ class TestHMAC(object):
             hmac.HMAC(b"key", DummyHashAlgorithm(), backend)
 
 
+@pytest.mark.requires_backend_interface(interface=HMACBackend)
+class TestHMACKey(object):
+    def test_sign(self, backend):
+        key = hmac.HMACKey(b"mykey", hashes.SHA256(), backend)
+        for data in [b"", b"abc", bytearray(b"abc"), b"\x00" * 1000]:
+            h = hmac.HMAC(b"mykey", hashes.SHA256(), backend)
+            h.update(data)
+            assert key.sign(data) == h.finalize()
+
+    def test_new(self, backend):
+        key = hmac.HMACKey(b"mykey", hashes.SHA256(), backend)
+        h = key.new()
+        assert isinstance(h, hmac.HMAC)
+        assert h.algorithm is key.algorithm
+        h.update(b"a")
+        key.new().update(b"unrelated")
+        h.update(b"bc")
+        assert h.finalize() == key.sign(b"abc")
+
+    def test_verify(self, backend):
+        key = hmac.HMACKey(b"mykey", hashes.SHA256(), backend)
+        signature = key.sign(b"abc")
+        key.verify(b"abc", signature)
+        key.verify(memoryview(b"abc"), signature)
+        with pytest.raises(InvalidSignature):
+            key.verify(b"abd", signature)
+        with pytest.raises(InvalidSignature):
+            key.verify(b"abc", signature[:-1])
+        key.verify(b"abc", signature)
+
+    def test_reject_unicode(self, backend):
+        key = hmac.HMACKey(b"mykey", hashes.SHA256(), backend)
+        with pytest.raises(TypeError):
+            key.sign(u"\u00FC")
+        with pytest.raises(TypeError):
+            key.verify(u"\u00FC", b"")
+        with pytest.raises(TypeError):
+            key.verify(b"", u"")
+
+    def test_algorithm_instance(self, backend):
+        with pytest.raises(TypeError):
+            hmac.HMACKey(b"key", hashes.SHA256, backend)
+
+    def test_unsupported_hash(self, backend):
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_HASH):
+            hmac.HMACKey(b"key", DummyHashAlgorithm(), backend)
+
+    def test_invalid_backend(self):
+        with raises_unsupported_algorithm(
+            _Reasons.BACKEND_MISSING_INTERFACE
+        ):
+            hmac.HMACKey(b"key", hashes.SHA256(), object())
+
+
 def test_invalid_backend():
     pretend_backend = object()
 
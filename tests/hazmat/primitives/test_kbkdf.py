@@ -149,3 +149,65 @@ class TestKBKDFHMAC(object):
                             CounterLocation.BeforeFixed, b'label',
                             b'context', None, backend=default_backend())
             kdf.derive(u'material')
+
+
+class TestKeyDerivationKey(object):
+    def _kdf(self, length, location, label=b'label', context=b'context',
+             fixed=None):
+        if fixed is not None:
+            label = context = None
+        return KBKDFHMAC(hashes.SHA256(), Mode.CounterMode, length, 4, 4,
+                         location, label, context, fixed,
+                         backend=default_backend())
+
+    @pytest.mark.parametrize("length", [0, 16, 32, 100])
+    @pytest.mark.parametrize(
+        "location", [CounterLocation.BeforeFixed, CounterLocation.AfterFixed]
+    )
+    def test_derive(self, length, location):
+        key = self._kdf(length, location).keyed(b'material')
+        for label, context in [(b'label', b'context'), (b'a', b'b')]:
+            kdf = self._kdf(length, location, label, context)
+            assert key.derive(label, context) == kdf.derive(b'material')
+
+    def test_derive_none(self):
+        key = self._kdf(32, CounterLocation.BeforeFixed).keyed(b'material')
+        kdf = self._kdf(32, CounterLocation.BeforeFixed, None, None)
+        assert key.derive(None, None) == kdf.derive(b'material')
+
+    def test_derive_many(self):
+        key = self._kdf(48, CounterLocation.AfterFixed).keyed(b'material')
+        pairs = [(b'a', b'1'), (b'b', b'2'), (b'a', b'1')]
+        keys = key.derive_many(pairs)
+        assert keys == [key.derive(label, context) for label, context in pairs]
+        assert keys[0] == keys[2] != keys[1]
+        assert key.derive_many([]) == []
+
+    def test_keyed_does_not_finalize(self):
+        kdf = self._kdf(32, CounterLocation.BeforeFixed)
+        key = kdf.keyed(b'material')
+        assert kdf.derive(b'material') == key.derive(b'label', b'context')
+
+    def test_too_many_iterations(self):
+        kdf = KBKDFHMAC(hashes.SHA256(), Mode.CounterMode, 32 * 256, 1, 4,
+                        CounterLocation.BeforeFixed, b'label', b'context',
+                        None, backend=default_backend())
+        key = kdf.keyed(b'material')
+        with pytest.raises(ValueError):
+            key.derive(b'label', b'context')
+
+    def test_fixed(self):
+        kdf = self._kdf(32, CounterLocation.BeforeFixed, fixed=b'fixed')
+        with pytest.raises(ValueError):
+            kdf.keyed(b'material')
+
+    def test_unicode_error(self):
+        kdf = self._kdf(32, CounterLocation.BeforeFixed)
+        with pytest.raises(TypeError):
+            kdf.keyed(u'material')
+
+        key = kdf.keyed(b'material')
+        with pytest.raises(TypeError):
+            key.derive(u'label', b'context')
+        with pytest.raises(TypeError):
+            key.derive(b'label', u'context')
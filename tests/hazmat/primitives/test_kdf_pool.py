@@ -0,0 +1,241 @@
+# This file is dual licensed under the terms of the Apache License, Version
+# 2.0, and the BSD License. See the LICENSE file in the root of this repository
+# for complete details.
+
+from __future__ import absolute_import, division, print_function
+
+import threading
+
+import pytest
+
+from cryptography.exceptions import AlreadyFinalized, InvalidKey
+from cryptography.hazmat.backends.interfaces import (
+    PBKDF2HMACBackend, ScryptBackend
+)
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.pool import (
+    KDFPool, PoolFull, default_pool
+)
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+asyncio = pytest.importorskip("asyncio")
+
+# asyncio.ensure_future was called asyncio.async before Python 3.4.4.
+_ensure_future = getattr(asyncio, "ensure_future", None) or getattr(
+    asyncio, "async"
+)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.fixture
+def pool():
+    pool = KDFPool(2)
+    yield pool
+    pool.close()
+
+
+def _run(loop, func):
+    # Calls func from inside the running loop, as a coroutine would, and
+    # returns the result of the future it returns.
+    result = asyncio.Future(loop=loop)
+
+    def copy_result(future):
+        if future.exception() is not None:
+            result.set_exception(future.exception())
+        else:
+            result.set_result(future.result())
+
+    def start():
+        try:
+            _ensure_future(func(), loop=loop).add_done_callback(copy_result)
+        except Exception as e:
+            result.set_exception(e)
+
+    loop.call_soon(start)
+    return loop.run_until_complete(result)
+
+
+def _pbkdf2(backend):
+    return PBKDF2HMAC(hashes.SHA256(), 32, b"salt", 1000, backend)
+
+
+def _scrypt(backend):
+    return Scrypt(b"salt", 32, 1024, 8, 1, backend)
+
+
+class TestKDFPool(object):
+    def test_invalid_arguments(self):
+        with pytest.raises(TypeError):
+            KDFPool(1.0)
+        with pytest.raises(ValueError):
+            KDFPool(0)
+        with pytest.raises(TypeError):
+            KDFPool(1, 1.0)
+        with pytest.raises(ValueError):
+            KDFPool(1, -1)
+
+    def test_default_pool(self):
+        pool = default_pool()
+        assert pool is default_pool()
+        assert pool.workers >= 1
+        assert pool.max_pending >= pool.workers
+
+    def test_submit(self, loop, pool):
+        results = _run(loop, lambda: asyncio.gather(
+            *[pool.submit(pow, i, 2) for i in range(10)]
+        ))
+        assert results == [i ** 2 for i in range(10)]
+
+    def test_submit_exception(self, loop, pool):
+        with pytest.raises(ValueError):
+            _run(loop, lambda: pool.submit(int, "not a number"))
+
+    def test_submit_cancelled(self, loop, pool):
+        event = threading.Event()
+
+        def submit():
+            future = pool.submit(event.wait)
+            future.cancel()
+            event.set()
+            pool.close()
+            return asyncio.sleep(0)
+
+        _run(loop, submit)
+
+    def test_concurrency_cap(self, loop, pool):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        release = threading.Event()
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait()
+            with lock:
+                running[0] -= 1
+
+        def submit():
+            futures = [pool.submit(work) for _ in range(6)]
+            release.set()
+            return asyncio.gather(*futures)
+
+        _run(loop, submit)
+        assert peak[0] <= pool.workers
+
+    def test_max_pending(self, loop):
+        pool = KDFPool(1, 2)
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            started.set()
+            release.wait()
+
+        def submit():
+            futures = [pool.submit(work)]
+            started.wait()
+            futures += [pool.submit(work), pool.submit(work)]
+            try:
+                with pytest.raises(PoolFull):
+                    pool.submit(work)
+                assert pool.stats().queued == 2
+            finally:
+                release.set()
+            return asyncio.gather(*futures)
+
+        try:
+            _run(loop, submit)
+            _run(loop, lambda: pool.submit(work))
+        finally:
+            pool.close()
+
+    def test_stats(self, loop, pool):
+        assert pool.stats() == (0, 0, 0, 0.0, 0.0)
+        release = threading.Event()
+
+        def submit():
+            futures = [pool.submit(release.wait) for _ in range(4)]
+            assert pool.stats().queued + pool.stats().running == 4
+            release.set()
+            return asyncio.gather(*futures)
+
+        _run(loop, submit)
+        stats = pool.stats()
+        assert stats.queued == 0
+        assert stats.running == 0
+        assert stats.completed == 4
+        assert stats.wait_time >= 0
+        assert stats.run_time > 0
+
+    def test_close_restarts(self, loop, pool):
+        pool.close()
+        pool.close()
+        assert _run(loop, lambda: pool.submit(pow, 2, 3)) == 8
+
+
+@pytest.mark.requires_backend_interface(interface=PBKDF2HMACBackend)
+class TestPBKDF2HMACAsync(object):
+    def test_derive_async(self, backend, loop, pool):
+        key = _pbkdf2(backend).derive(b"password")
+        assert _run(
+            loop, lambda: _pbkdf2(backend).derive_async(b"password", pool)
+        ) == key
+        assert _run(
+            loop, lambda: _pbkdf2(backend).derive_async(b"password")
+        ) == key
+
+    def test_verify_async(self, backend, loop, pool):
+        key = _pbkdf2(backend).derive(b"password")
+        _run(
+            loop,
+            lambda: _pbkdf2(backend).verify_async(b"password", key, pool)
+        )
+        with pytest.raises(InvalidKey):
+            _run(
+                loop,
+                lambda: _pbkdf2(backend).verify_async(b"wrong", key, pool)
+            )
+
+    def test_already_finalized(self, backend, loop, pool):
+        kdf = _pbkdf2(backend)
+        kdf.derive(b"password")
+        with pytest.raises(AlreadyFinalized):
+            _run(loop, lambda: kdf.derive_async(b"password", pool))
+
+
+@pytest.mark.requires_backend_interface(interface=ScryptBackend)
+class TestScryptAsync(object):
+    def test_derive_async(self, backend, loop, pool):
+        key = _scrypt(backend).derive(b"password")
+        assert _run(
+            loop, lambda: _scrypt(backend).derive_async(b"password", pool)
+        ) == key
+
+    def test_verify_async(self, backend, loop, pool):
+        key = _scrypt(backend).derive(b"password")
+        _run(
+            loop,
+            lambda: _scrypt(backend).verify_async(b"password", key, pool)
+        )
+        with pytest.raises(InvalidKey):
+            _run(
+                loop,
+                lambda: _scrypt(backend).verify_async(b"wrong", key, pool)
+            )
+
+    def test_key_material_type(self, backend, loop, pool):
+        with pytest.raises(TypeError):
+            _run(
+                loop, lambda: _scrypt(backend).derive_async(u"password", pool)
+            )
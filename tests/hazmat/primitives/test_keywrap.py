@@ -9,6 +9,7 @@ import os
 
 import pytest
 
+from cryptography import utils
 from cryptography.hazmat.backends.interfaces import CipherBackend
 from cryptography.hazmat.primitives import keywrap
 from cryptography.hazmat.primitives.ciphers import algorithms, modes
@@ -17,6 +18,22 @@ from .utils import _load_all_params
 from ...utils import load_nist_vectors
 
 
+@utils.register_interface(CipherBackend)
+class CipherOnlyBackend(object):
+    # Hides any native key wrap support so the AES-ECB implementation is used.
+    def __init__(self, backend):
+        self._backend = backend
+
+    def cipher_supported(self, cipher, mode):
+        return self._backend.cipher_supported(cipher, mode)
+
+    def create_symmetric_encryption_ctx(self, cipher, mode):
+        return self._backend.create_symmetric_encryption_ctx(cipher, mode)
+
+    def create_symmetric_decryption_ctx(self, cipher, mode):
+        return self._backend.create_symmetric_decryption_ctx(cipher, mode)
+
+
 @pytest.mark.requires_backend_interface(interface=CipherBackend)
 class TestAESKeyWrap(object):
     @pytest.mark.parametrize(
@@ -115,6 +132,79 @@ class TestAESKeyWrap(object):
         with pytest.raises(keywrap.InvalidUnwrap):
             keywrap.aes_key_unwrap(b"sixteen_byte_key", b"\x00" * 27, backend)
 
+    @pytest.mark.supported(
+        only_if=lambda backend: backend.cipher_supported(
+            algorithms.AES(b"\x00" * 16), modes.ECB()
+        ),
+        skip_message="Does not support AES key wrap (RFC 3394) because AES-ECB"
+                     " is unsupported",
+    )
+    def test_unwrap_many(self, backend):
+        wrapping_key = b"\x01" * 16
+        keys = [b"\x00" * 16, b"\x02" * 24, b"\x03" * 32]
+        wrapped_keys = [
+            keywrap.aes_key_wrap(wrapping_key, key, backend) for key in keys
+        ]
+        assert keywrap.aes_key_unwrap_many(
+            wrapping_key, wrapped_keys, backend
+        ) == keys
+        assert keywrap.aes_key_unwrap_many(wrapping_key, [], backend) == []
+
+    @pytest.mark.supported(
+        only_if=lambda backend: backend.cipher_supported(
+            algorithms.AES(b"\x00" * 16), modes.ECB()
+        ),
+        skip_message="Does not support AES key wrap (RFC 3394) because AES-ECB"
+                     " is unsupported",
+    )
+    def test_unwrap_many_invalid(self, backend):
+        wrapping_key = b"\x01" * 16
+        wrapped_key = keywrap.aes_key_wrap(wrapping_key, b"\x00" * 16, backend)
+        with pytest.raises(ValueError):
+            keywrap.aes_key_unwrap_many(b"badkey", [wrapped_key], backend)
+
+        with pytest.raises(keywrap.InvalidUnwrap, match="key 1 "):
+            keywrap.aes_key_unwrap_many(
+                wrapping_key, [wrapped_key, b"\x00" * 24], backend
+            )
+
+        with pytest.raises(keywrap.InvalidUnwrap, match="key 2 "):
+            keywrap.aes_key_unwrap_many(
+                wrapping_key, [wrapped_key, wrapped_key, b"\x00" * 16],
+                backend
+            )
+
+    @pytest.mark.parametrize(
+        "params",
+        _load_all_params(
+            os.path.join("keywrap", "kwtestvectors"),
+            ["KW_AD_128.txt"],
+            load_nist_vectors
+        )
+    )
+    @pytest.mark.supported(
+        only_if=lambda backend: backend.cipher_supported(
+            algorithms.AES(b"\x00" * 16), modes.ECB()
+        ),
+        skip_message="Does not support AES key wrap (RFC 3394) because AES-ECB"
+                     " is unsupported",
+    )
+    def test_cipher_only_backend(self, backend, params):
+        backend = CipherOnlyBackend(backend)
+        wrapping_key = binascii.unhexlify(params["k"])
+        wrapped_key = binascii.unhexlify(params["c"])
+        if params.get("fail") is True:
+            with pytest.raises(keywrap.InvalidUnwrap):
+                keywrap.aes_key_unwrap(wrapping_key, wrapped_key, backend)
+        else:
+            key = binascii.unhexlify(params["p"])
+            assert keywrap.aes_key_unwrap(
+                wrapping_key, wrapped_key, backend
+            ) == key
+            assert keywrap.aes_key_wrap(
+                wrapping_key, key, backend
+            ) == wrapped_key
+
 
 @pytest.mark.supported(
     only_if=lambda backend: backend.cipher_supported(
@@ -205,3 +295,37 @@ class TestAESKeyWrapWithPadding(object):
             keywrap.aes_key_unwrap_with_padding(
                 b"badkey", b"\x00" * 16, backend
             )
+
+    def test_unwrap_invalid_wrapped_key_multiple(self, backend):
+        with pytest.raises(
+            keywrap.InvalidUnwrap, match='must be a multiple of 8 bytes'
+        ):
+            keywrap.aes_key_unwrap_with_padding(
+                b"sixteen_byte_key", b"\x00" * 27, backend
+            )
+
+    @pytest.mark.parametrize(
+        "params",
+        _load_all_params(
+            os.path.join("keywrap", "kwtestvectors"),
+            ["KWP_AD_128.txt"],
+            load_nist_vectors
+        )
+    )
+    def test_cipher_only_backend(self, backend, params):
+        backend = CipherOnlyBackend(backend)
+        wrapping_key = binascii.unhexlify(params["k"])
+        wrapped_key = binascii.unhexlify(params["c"])
+        if params.get("fail") is True:
+            with pytest.raises(keywrap.InvalidUnwrap):
+                keywrap.aes_key_unwrap_with_padding(
+                    wrapping_key, wrapped_key, backend
+                )
+        else:
+            key = binascii.unhexlify(params["p"])
+            assert keywrap.aes_key_unwrap_with_padding(
+                wrapping_key, wrapped_key, backend
+            ) == key
+            assert keywrap.aes_key_wrap_with_padding(
+                wrapping_key, key, backend
+            ) == wrapped_key
@@ -8,8 +8,12 @@ import pytest
 
 import six
 
+from cryptography import utils
 from cryptography.exceptions import AlreadyFinalized
 from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import (
+    Cipher, CipherContext, algorithms, modes
+)
 
 
 class TestPKCS7(object):
@@ -116,6 +120,48 @@ class TestPKCS7(object):
 
         assert data == b""
 
+    @pytest.mark.parametrize("chunk_size", [1, 5, 16, 17, 33])
+    def test_chunked(self, chunk_size):
+        data = bytes(bytearray(range(100)))
+        padder = padding.PKCS7(128).padder()
+        padded = b""
+        for i in range(0, len(data), chunk_size):
+            result = padder.update(data[i:i + chunk_size])
+            assert len(result) % 16 == 0
+            padded += result
+        padded += padder.finalize()
+        assert padded == data + b"\x0c" * 12
+
+        unpadder = padding.PKCS7(128).unpadder()
+        unpadded = b""
+        for i in range(0, len(padded), chunk_size):
+            unpadded += unpadder.update(padded[i:i + chunk_size])
+        unpadded += unpadder.finalize()
+        assert unpadded == data
+
+    def test_update_into(self):
+        buf = bytearray(32)
+        padder = padding.PKCS7(128).padder()
+        assert padder.update_into(b"1" * 10, buf) == 0
+        assert padder.update_into(b"2" * 10, buf) == 16
+        assert bytes(buf[:16]) == b"1" * 10 + b"2" * 6
+        padded = padder.finalize()
+        assert padded == b"2" * 4 + b"\x0c" * 12
+
+        unpadder = padding.PKCS7(128).unpadder()
+        assert unpadder.update_into(b"1" * 10 + b"2" * 6, buf) == 0
+        assert unpadder.update_into(padded, buf) == 16
+        assert bytes(buf[:16]) == b"1" * 10 + b"2" * 6
+        assert unpadder.finalize() == b"2" * 4
+
+    def test_update_into_buffer_too_small(self):
+        padder = padding.PKCS7(128).padder()
+        with pytest.raises(ValueError):
+            padder.update_into(b"1" * 16, bytearray(30))
+        unpadder = padding.PKCS7(128).unpadder()
+        with pytest.raises(ValueError):
+            unpadder.update_into(b"1" * 16, bytearray(30))
+
 
 class TestANSIX923(object):
     @pytest.mark.parametrize("size", [127, 4096, -2])
@@ -207,3 +253,75 @@ class TestANSIX923(object):
             unpadder.update(b"")
         with pytest.raises(AlreadyFinalized):
             unpadder.finalize()
+
+    def test_update_into(self):
+        buf = bytearray(47)
+        padder = padding.ANSIX923(128).padder()
+        assert padder.update_into(b"1" * 20, buf) == 16
+        assert bytes(buf[:16]) == b"1" * 16
+        padded = padder.finalize()
+        assert padded == b"1" * 4 + b"\x00" * 11 + b"\x0c"
+
+        unpadder = padding.ANSIX923(128).unpadder()
+        assert unpadder.update_into(b"1" * 16 + padded, buf) == 16
+        assert bytes(buf[:16]) == b"1" * 16
+        assert unpadder.finalize() == b"1" * 4
+
+
+class TestPadAndEncrypt(object):
+    @pytest.mark.parametrize("length", [0, 1, 15, 16, 17, 100])
+    @pytest.mark.parametrize("pad", [padding.PKCS7, padding.ANSIX923])
+    def test_pad_and_encrypt(self, backend, length, pad):
+        cipher = Cipher(
+            algorithms.AES(b"\x00" * 16), modes.CBC(b"\x00" * 16), backend
+        )
+        data = b"\x01" * length
+        padder = pad(128).padder()
+        encryptor = cipher.encryptor()
+        expected = encryptor.update(
+            padder.update(data) + padder.finalize()
+        ) + encryptor.finalize()
+        assert padding.pad_and_encrypt(
+            pad(128), cipher.encryptor(), data
+        ) == expected
+
+    def test_non_bytes(self, backend):
+        cipher = Cipher(
+            algorithms.AES(b"\x00" * 16), modes.CBC(b"\x00" * 16), backend
+        )
+        with pytest.raises(TypeError):
+            padding.pad_and_encrypt(
+                padding.PKCS7(128), cipher.encryptor(), u"abc"
+            )
+
+    @pytest.mark.parametrize("length", [0, 15, 16, 33])
+    def test_bytes_only_context(self, backend, length):
+        cipher = Cipher(
+            algorithms.AES(b"\x00" * 16), modes.CBC(b"\x00" * 16), backend
+        )
+        data = b"\x01" * length
+        expected = padding.pad_and_encrypt(
+            padding.PKCS7(128), cipher.encryptor(), data
+        )
+        assert padding.pad_and_encrypt(
+            padding.PKCS7(128), _BytesOnlyContext(cipher.encryptor()), data
+        ) == expected
+
+
+@utils.register_interface(CipherContext)
+class _BytesOnlyContext(object):
+    # A CipherContext that, like a third-party implementation might, only
+    # accepts bytes.
+    def __init__(self, ctx):
+        self._ctx = ctx
+
+    def update(self, data):
+        utils._check_bytes("data", data)
+        return self._ctx.update(data)
+
+    def update_into(self, data, buf):
+        utils._check_bytes("data", data)
+        return self._ctx.update_into(data, buf)
+
+    def finalize(self):
+        return self._ctx.finalize()
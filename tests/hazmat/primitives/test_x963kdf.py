@@ -8,16 +8,33 @@ import binascii
 
 import pytest
 
+from cryptography import utils
 from cryptography.exceptions import (
     AlreadyFinalized, InvalidKey, _Reasons
 )
-from cryptography.hazmat.backends.interfaces import HashBackend
+from cryptography.hazmat.backends.interfaces import (
+    HashBackend, X963KDFBackend
+)
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.x963kdf import X963KDF
 
+from ...doubles import DummyHashAlgorithm
 from ...utils import raises_unsupported_algorithm
 
 
+@utils.register_interface(HashBackend)
+class HashOnlyBackend(object):
+    # Hides any native X9.63 KDF so the Python fallback is used.
+    def __init__(self, backend):
+        self._backend = backend
+
+    def hash_supported(self, algorithm):
+        return self._backend.hash_supported(algorithm)
+
+    def create_hash_ctx(self, algorithm):
+        return self._backend.create_hash_ctx(algorithm)
+
+
 @pytest.mark.requires_backend_interface(interface=HashBackend)
 class TestX963KDF(object):
     def test_length_limit(self, backend):
@@ -113,6 +130,25 @@ class TestX963KDF(object):
             xkdf.verify(b"foo", u"bar")
 
 
+@pytest.mark.requires_backend_interface(interface=X963KDFBackend)
+class TestX963KDFBackend(object):
+    @pytest.mark.parametrize("length", [0, 1, 32, 33, 100])
+    def test_matches_fallback(self, backend, length):
+        for sharedinfo in [None, b"shared info"]:
+            native = X963KDF(hashes.SHA256(), length, sharedinfo, backend)
+            fallback = X963KDF(
+                hashes.SHA256(), length, sharedinfo, HashOnlyBackend(backend)
+            )
+            assert native.derive(b"\x01" * 16) == fallback.derive(
+                b"\x01" * 16
+            )
+
+    def test_unsupported_hash(self, backend):
+        xkdf = X963KDF(DummyHashAlgorithm(32), 16, None, backend)
+        with raises_unsupported_algorithm(_Reasons.UNSUPPORTED_HASH):
+            xkdf.derive(b"\x01" * 16)
+
+
 def test_invalid_backend():
     pretend_backend = object()
 
@@ -7,6 +7,7 @@ from __future__ import absolute_import, division, print_function
 import base64
 import calendar
 import datetime
+import io
 import json
 import os
 import time
@@ -17,10 +18,16 @@ import pytest
 
 import six
 
-from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from cryptography.exceptions import AlreadyFinalized
+from cryptography.fernet import (
+    Fernet, FernetStream, InvalidToken, MultiFernet
+)
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.backends.interfaces import CipherBackend, HMACBackend
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers import algorithms, modes
+from cryptography.hazmat.primitives.hmac import HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
 import cryptography_vectors
 
@@ -131,6 +138,250 @@ class TestFernet(object):
         with pytest.raises(InvalidToken):
             f.extract_timestamp(b"nonsensetoken")
 
+    @pytest.mark.parametrize("message", [b"", b"Abc!", b"\x00" * 100])
+    def test_decrypt_into(self, message, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        token = f.encrypt(message)
+        buf = bytearray(len(token))
+        n = f.decrypt_into(token, buf)
+        assert bytes(buf[:n]) == message
+        buf = bytearray(len(token))
+        n = f.decrypt_into(token, memoryview(buf)[2:])
+        assert bytes(buf[2:2 + n]) == message
+
+    def test_decrypt_into_buffer_size(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        token = f.encrypt(b"\x00" * 20)
+        with pytest.raises(ValueError):
+            f.decrypt_into(token, bytearray(30))
+        buf = bytearray(31)
+        assert f.decrypt_into(token, buf) == 20
+        assert buf[:20] == b"\x00" * 20
+
+    @pytest.mark.parametrize("version", [0x80, 0x82])
+    @pytest.mark.parametrize("length", list(range(18)) + [31, 32, 33])
+    def test_decrypt_into_minimum_buffer(self, version, length, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=version)
+        message = os.urandom(length)
+        token = f.encrypt(message)
+        buf = bytearray((length // 16 + 1) * 16 - 1)
+        n = f.decrypt_into(token, buf)
+        assert bytes(buf[:n]) == message
+
+    def test_decrypt_into_invalid(self, backend, monkeypatch):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        other = Fernet(Fernet.generate_key(), backend=backend)
+        buf = bytearray(100)
+        with pytest.raises(InvalidToken):
+            f.decrypt_into(other.encrypt(b"abc"), buf)
+        with pytest.raises(InvalidToken):
+            f.decrypt_into(b"nonsensetoken", buf)
+        token = f.encrypt(b"abc")
+        current_time = time.time()
+        monkeypatch.setattr(time, "time", lambda: current_time + 120)
+        with pytest.raises(InvalidToken):
+            f.decrypt_into(token, buf, ttl=60)
+        assert f.decrypt_into(token, buf, ttl=300) == 3
+
+    def test_signed_ciphertext_not_block_aligned(self, backend):
+        key = Fernet.generate_key()
+        f = Fernet(key, backend=backend)
+        data = base64.urlsafe_b64decode(f.encrypt(b"abc"))[:-32]
+        for ciphertext in [b"", b"\x00" * 15, b"\x00" * 17]:
+            h = HMAC(
+                base64.urlsafe_b64decode(key)[:16], hashes.SHA256(),
+                backend=backend
+            )
+            h.update(data[:25] + ciphertext)
+            token = base64.urlsafe_b64encode(
+                data[:25] + ciphertext + h.finalize()
+            )
+            with pytest.raises(InvalidToken):
+                f.decrypt(token)
+
+    def test_key_id_version(self, backend):
+        key = Fernet.generate_key()
+        f = Fernet(key, backend=backend, version=0x82)
+        token = f.encrypt(b"abc")
+        data = base64.urlsafe_b64decode(token)
+        assert six.indexbytes(data, 0) == 0x82
+        assert data[1:5] == f._get_key_id()
+        hkdf = HKDF(hashes.SHA256(), 4, None, b"fernet key id", backend)
+        assert data[1:5] == hkdf.derive(base64.urlsafe_b64decode(key))
+        assert f.decrypt(token) == b"abc"
+        assert f.decrypt_many([token]) == [b"abc"]
+        assert f.extract_timestamp(token) == Fernet._get_unverified_token_data(
+            token
+        )[0]
+
+    def test_key_id_mismatch(self, backend):
+        key = Fernet.generate_key()
+        f = Fernet(key, backend=backend, version=0x82)
+        data = bytearray(base64.urlsafe_b64decode(f.encrypt(b"abc")))
+        data[1] ^= 1
+        with pytest.raises(InvalidToken):
+            f.decrypt(base64.urlsafe_b64encode(bytes(data)))
+        other = Fernet(Fernet.generate_key(), backend=backend)
+        with pytest.raises(InvalidToken):
+            other.decrypt(f.encrypt(b"abc"))
+        # Decryption does not depend on the configured version.
+        f2 = Fernet(key, backend=backend)
+        assert f2.decrypt(f.encrypt(b"abc")) == b"abc"
+
+    def test_key_id_token_too_short(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        token = base64.urlsafe_b64encode(b"\x82" + f._get_key_id() + b"abc")
+        with pytest.raises(InvalidToken):
+            f.decrypt(token)
+
+    def test_invalid_version(self, backend):
+        with pytest.raises(ValueError):
+            Fernet(Fernet.generate_key(), backend=backend, version=0x90)
+
+    def test_encrypt_many(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        messages = [b"", b"Abc!", b"\x00\xFF\x00\x80", b"x" * 100]
+        tokens = f.encrypt_many(messages)
+        assert len(tokens) == len(messages)
+        assert len(set(tokens)) == len(tokens)
+        assert [f.decrypt(token) for token in tokens] == messages
+
+    def test_encrypt_many_empty(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        assert f.encrypt_many([]) == []
+        assert f.decrypt_many([]) == []
+
+    def test_encrypt_many_unicode(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        with pytest.raises(TypeError):
+            f.encrypt_many([b"abc", u"abc"])
+
+    def test_decrypt_many(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        other = Fernet(Fernet.generate_key(), backend=backend)
+        tokens = [
+            f.encrypt(b"abc"),
+            other.encrypt(b"abc"),
+            b"nonsensetoken",
+            f.encrypt(b"def"),
+        ]
+        results = f.decrypt_many(iter(tokens))
+        assert results[0] == b"abc"
+        assert isinstance(results[1], InvalidToken)
+        assert isinstance(results[2], InvalidToken)
+        assert results[3] == b"def"
+
+    def test_decrypt_many_ttl(self, monkeypatch, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        tokens = f.encrypt_many([b"abc", b"def"])
+        current_time = time.time()
+        monkeypatch.setattr(time, "time", lambda: current_time + 120)
+        assert f.decrypt_many(tokens, ttl=300) == [b"abc", b"def"]
+        results = f.decrypt_many(tokens, ttl=60)
+        assert all(isinstance(result, InvalidToken) for result in results)
+
+    def test_decrypt_many_unicode(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend)
+        with pytest.raises(TypeError):
+            f.decrypt_many([f.encrypt(b"abc"), u""])
+
+
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+@pytest.mark.requires_backend_interface(interface=HMACBackend)
+@pytest.mark.supported(
+    only_if=lambda backend: backend.cipher_supported(
+        algorithms.AES(b"\x00" * 32), modes.GCM(b"\x00" * 12)
+    ),
+    skip_message="Does not support AES GCM",
+)
+class TestFernetGCM(object):
+    def test_roundtrip(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        for message in [b"", b"abc", b"\x00" * 15, b"x" * 1000]:
+            token = f.encrypt(message)
+            data = base64.urlsafe_b64decode(token)
+            assert six.indexbytes(data, 0) == 0x81
+            assert len(data) == 1 + 8 + 12 + len(message) + 16
+            assert f.decrypt(token) == message
+
+    def test_decrypt_any_version(self, backend):
+        key = Fernet.generate_key()
+        f_gcm = Fernet(key, backend=backend, version=0x81)
+        f_cbc = Fernet(key, backend=backend)
+        assert f_cbc.decrypt(f_gcm.encrypt(b"abc")) == b"abc"
+        assert f_gcm.decrypt(f_cbc.encrypt(b"abc")) == b"abc"
+        other = Fernet(Fernet.generate_key(), backend=backend)
+        with pytest.raises(InvalidToken):
+            other.decrypt(f_gcm.encrypt(b"abc"))
+
+    @pytest.mark.parametrize("index", [0, 1, 8, 9, 20, 21, -1])
+    def test_tampered(self, index, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        data = bytearray(base64.urlsafe_b64decode(f.encrypt(b"abc")))
+        data[index] ^= 1
+        with pytest.raises(InvalidToken):
+            f.decrypt(base64.urlsafe_b64encode(bytes(data)))
+
+    def test_too_short(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        token = base64.urlsafe_b64encode(b"\x81" + b"\x00" * 35)
+        with pytest.raises(InvalidToken):
+            f.decrypt(token)
+
+    def test_ttl(self, monkeypatch, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        token = f.encrypt(b"abc")
+        current_time = time.time()
+        monkeypatch.setattr(time, "time", lambda: current_time + 120)
+        assert f.decrypt(token, ttl=300) == b"abc"
+        with pytest.raises(InvalidToken):
+            f.decrypt(token, ttl=60)
+
+    def test_extract_timestamp(self, monkeypatch, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        current_time = 1526138327
+        monkeypatch.setattr(time, "time", lambda: current_time)
+        token = f.encrypt(b"abc")
+        assert f.extract_timestamp(token) == current_time
+        data = bytearray(base64.urlsafe_b64decode(token))
+        data[-1] ^= 1
+        with pytest.raises(InvalidToken):
+            f.extract_timestamp(base64.urlsafe_b64encode(bytes(data)))
+
+    def test_decrypt_into(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        token = f.encrypt(b"abcdef")
+        buf = bytearray(10)
+        assert f.decrypt_into(token, buf) == 6
+        assert buf[:6] == b"abcdef"
+        with pytest.raises(ValueError):
+            f.decrypt_into(token, bytearray(5))
+
+    @pytest.mark.parametrize("length", range(18))
+    def test_decrypt_into_minimum_buffer(self, length, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        message = os.urandom(length)
+        buf = bytearray(length)
+        assert f.decrypt_into(f.encrypt(message), buf) == length
+        assert bytes(buf) == message
+
+    def test_encrypt_many(self, backend):
+        f = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        messages = [b"", b"abc", b"x" * 100]
+        tokens = f.encrypt_many(messages)
+        assert len(set(tokens)) == len(tokens)
+        assert f.decrypt_many(tokens) == messages
+
+    def test_multi_fernet_rotate(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend)
+        f2 = Fernet(Fernet.generate_key(), backend=backend, version=0x81)
+        mf = MultiFernet([f2, f1])
+        rotated = mf.rotate(f1.encrypt(b"abc"))
+        assert six.indexbytes(base64.urlsafe_b64decode(rotated), 0) == 0x81
+        assert mf.decrypt(rotated) == b"abc"
+        assert MultiFernet([f1, f2]).rotate(rotated) != rotated
+        assert f1.decrypt(MultiFernet([f1, f2]).rotate(rotated)) == b"abc"
+
 
 @pytest.mark.requires_backend_interface(interface=CipherBackend)
 @pytest.mark.requires_backend_interface(interface=HMACBackend)
@@ -209,6 +460,116 @@ class TestMultiFernet(object):
         assert later_time != rotated_time
         assert original_time == rotated_time
 
+    def test_decrypt_key_id(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        f2 = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        f3 = Fernet(Fernet.generate_key(), backend=backend)
+        f = MultiFernet([f1, f2, f3])
+
+        assert f.decrypt(f2.encrypt(b"abc")) == b"abc"
+        assert f.decrypt(f1.encrypt(b"abc")) == b"abc"
+        assert (f.key_id_hits, f.key_id_misses) == (2, 0)
+
+        assert f.decrypt(f3.encrypt(b"abc")) == b"abc"
+        assert (f.key_id_hits, f.key_id_misses) == (2, 0)
+
+        unknown = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        with pytest.raises(InvalidToken):
+            f.decrypt(unknown.encrypt(b"abc"))
+        assert (f.key_id_hits, f.key_id_misses) == (2, 1)
+
+    def test_rotate_many_key_id_counters(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        f2 = Fernet(Fernet.generate_key(), backend=backend)
+        unknown = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        mf = MultiFernet([f2, f1])
+        tokens = (
+            [f1.encrypt(b"abc")] * 300 + [unknown.encrypt(b"abc")] * 200 +
+            [f2.encrypt(b"abc")] * 100
+        )
+
+        list(mf.rotate_many(tokens, workers=4))
+        assert (mf.key_id_hits, mf.key_id_misses) == (300, 200)
+
+    def test_decrypt_key_id_ttl(self, backend, monkeypatch):
+        f1 = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        f = MultiFernet([f1])
+        token = f.encrypt(b"abc")
+        current_time = time.time()
+        monkeypatch.setattr(time, "time", lambda: current_time + 120)
+        assert f.decrypt(token, ttl=300) == b"abc"
+        with pytest.raises(InvalidToken):
+            f.decrypt(token, ttl=60)
+
+    def test_rotate_key_id(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend)
+        f2 = Fernet(Fernet.generate_key(), backend=backend, version=0x82)
+        mf1 = MultiFernet([f1])
+        mf2 = MultiFernet([f2, f1])
+
+        rotated = mf2.rotate(mf1.encrypt(b"abc"))
+        assert six.indexbytes(base64.urlsafe_b64decode(rotated), 0) == 0x82
+        assert mf2.decrypt(rotated) == b"abc"
+        assert mf2.rotate(rotated) != rotated
+        assert mf2.key_id_hits == 2
+
+    def test_rotate_many(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend)
+        f2 = Fernet(Fernet.generate_key(), backend=backend)
+        mf1 = MultiFernet([f1])
+        mf2 = MultiFernet([f2, f1])
+
+        messages = [six.int2byte(i % 256) * i for i in range(300)]
+        tokens = [mf1.encrypt(message) for message in messages]
+        tokens[10] = b"nonsensetoken"
+        rotated = list(mf2.rotate_many(tokens, workers=2))
+
+        assert len(rotated) == len(tokens)
+        assert isinstance(rotated[10], InvalidToken)
+        for i, (token, new_token) in enumerate(zip(tokens, rotated)):
+            if i == 10:
+                continue
+            assert new_token != token
+            assert f2.decrypt(new_token) == messages[i]
+            assert (
+                Fernet._get_unverified_token_data(new_token)[0] ==
+                Fernet._get_unverified_token_data(token)[0]
+            )
+
+    def test_rotate_many_is_lazy(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend)
+        mf = MultiFernet([f1])
+        consumed = []
+
+        def tokens():
+            for i in range(10000):
+                consumed.append(i)
+                yield f1.encrypt(b"abc")
+
+        results = mf.rotate_many(tokens(), workers=1)
+        assert consumed == []
+        assert f1.decrypt(next(results)) == b"abc"
+        assert len(consumed) < 10000
+        results.close()
+
+    def test_rotate_many_empty(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend)
+        assert list(MultiFernet([f1]).rotate_many([])) == []
+
+    def test_rotate_many_unicode(self, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend)
+        with pytest.raises(TypeError):
+            list(MultiFernet([f1]).rotate_many([u"abc"], workers=1))
+
+    @pytest.mark.parametrize(
+        ("workers", "exception"),
+        [(0, ValueError), (-1, ValueError), (1.0, TypeError)]
+    )
+    def test_rotate_many_invalid_workers(self, workers, exception, backend):
+        f1 = Fernet(Fernet.generate_key(), backend=backend)
+        with pytest.raises(exception):
+            MultiFernet([f1]).rotate_many([], workers=workers)
+
     def test_rotate_decrypt_no_shared_keys(self, backend):
         f1 = Fernet(base64.urlsafe_b64encode(b"\x00" * 32), backend=backend)
         f2 = Fernet(base64.urlsafe_b64encode(b"\x01" * 32), backend=backend)
@@ -218,3 +579,184 @@ class TestMultiFernet(object):
 
         with pytest.raises(InvalidToken):
             mf2.rotate(mf1.encrypt(b"abc"))
+
+
+def _stream_encrypt(stream, data, chunk_size):
+    encryptor = stream.encryptor()
+    out = b"".join(
+        encryptor.update(data[i:i + chunk_size])
+        for i in range(0, len(data), chunk_size)
+    )
+    return out + encryptor.finalize()
+
+
+def _stream_decrypt(stream, data, chunk_size, ttl=None):
+    decryptor = stream.decryptor(ttl)
+    out = b"".join(
+        decryptor.update(data[i:i + chunk_size])
+        for i in range(0, len(data), chunk_size)
+    )
+    return out + decryptor.finalize()
+
+
+@pytest.mark.requires_backend_interface(interface=CipherBackend)
+@pytest.mark.requires_backend_interface(interface=HMACBackend)
+@pytest.mark.supported(
+    only_if=lambda backend: backend.cipher_supported(
+        algorithms.AES(b"\x00" * 32), modes.CBC(b"\x00" * 16)
+    ),
+    skip_message="Does not support AES CBC",
+)
+class TestFernetStream(object):
+    @pytest.mark.parametrize("size", [0, 1, 31, 32, 33, 64, 100])
+    @pytest.mark.parametrize("chunk_size", [1, 7, 32, 1000])
+    def test_roundtrips(self, size, chunk_size, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=32, backend=backend
+        )
+        data = os.urandom(size)
+        ciphertext = _stream_encrypt(stream, data, chunk_size)
+        assert _stream_decrypt(stream, ciphertext, chunk_size) == data
+
+    def test_large_update(self, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=4096, backend=backend
+        )
+        data = os.urandom(4 * 1024 * 1024)
+        encryptor = stream.encryptor()
+        ciphertext = encryptor.update(data) + encryptor.finalize()
+        decryptor = stream.decryptor()
+        assert decryptor.update(ciphertext) + decryptor.finalize() == data
+
+    def test_segment_size_from_header(self, backend):
+        key = Fernet.generate_key()
+        data = os.urandom(100)
+        ciphertext = _stream_encrypt(
+            FernetStream(key, segment_size=16, backend=backend), data, 100
+        )
+        stream = FernetStream(key, backend=backend)
+        assert _stream_decrypt(stream, ciphertext, 10) == data
+
+    def test_files(self, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=64, backend=backend
+        )
+        data = os.urandom(1000)
+        encrypted = io.BytesIO()
+        stream.encrypt_file(io.BytesIO(data), encrypted)
+        decrypted = io.BytesIO()
+        stream.decrypt_file(io.BytesIO(encrypted.getvalue()), decrypted)
+        assert decrypted.getvalue() == data
+
+    def test_segments_are_bounded(self, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=32, backend=backend
+        )
+        encryptor = stream.encryptor()
+        out = encryptor.update(b"\x00" * 1024)
+        assert len(encryptor._buffer) == 32
+        out += encryptor.finalize()
+        decryptor = stream.decryptor()
+        assert len(decryptor.update(out)) == 1024 - 32
+        assert len(decryptor.finalize()) == 32
+
+    def test_truncated(self, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=32, backend=backend
+        )
+        ciphertext = _stream_encrypt(stream, os.urandom(100), 100)
+        segment = len(ciphertext) - 29 - 64
+        segment //= 3
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(stream, ciphertext[:29 + segment * 2], 100)
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(stream, ciphertext[:20], 100)
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(stream, ciphertext[:40], 100)
+
+    def test_reordered(self, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=32, backend=backend
+        )
+        ciphertext = _stream_encrypt(stream, os.urandom(100), 100)
+        header, body = ciphertext[:29], ciphertext[29:]
+        first, second = body[:96], body[96:192]
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(
+                stream, header + second + first + body[192:], 100
+            )
+
+    def test_spliced(self, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=32, backend=backend
+        )
+        data = os.urandom(100)
+        first = _stream_encrypt(stream, data, 100)
+        second = _stream_encrypt(stream, data, 100)
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(stream, first[:29] + second[29:], 100)
+
+    def test_tampered(self, backend):
+        stream = FernetStream(
+            Fernet.generate_key(), segment_size=32, backend=backend
+        )
+        ciphertext = bytearray(_stream_encrypt(stream, b"\x00" * 100, 100))
+        ciphertext[50] ^= 1
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(stream, bytes(ciphertext), 100)
+
+    def test_wrong_key(self, backend):
+        stream = FernetStream(Fernet.generate_key(), backend=backend)
+        other = FernetStream(Fernet.generate_key(), backend=backend)
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(other, _stream_encrypt(stream, b"abc", 3), 10)
+
+    def test_invalid_version(self, backend):
+        stream = FernetStream(Fernet.generate_key(), backend=backend)
+        ciphertext = _stream_encrypt(stream, b"abc", 3)
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(stream, b"\x80" + ciphertext[1:], 100)
+
+    def test_ttl(self, backend, monkeypatch):
+        stream = FernetStream(Fernet.generate_key(), backend=backend)
+        ciphertext = _stream_encrypt(stream, b"abc", 3)
+        current_time = time.time()
+        monkeypatch.setattr(time, "time", lambda: current_time + 120)
+        assert _stream_decrypt(stream, ciphertext, 100, ttl=300) == b"abc"
+        with pytest.raises(InvalidToken):
+            _stream_decrypt(stream, ciphertext, 100, ttl=60)
+
+    def test_already_finalized(self, backend):
+        stream = FernetStream(Fernet.generate_key(), backend=backend)
+        encryptor = stream.encryptor()
+        ciphertext = encryptor.finalize()
+        with pytest.raises(AlreadyFinalized):
+            encryptor.update(b"")
+        with pytest.raises(AlreadyFinalized):
+            encryptor.finalize()
+        decryptor = stream.decryptor()
+        assert decryptor.update(ciphertext) == b""
+        assert decryptor.finalize() == b""
+        with pytest.raises(AlreadyFinalized):
+            decryptor.update(b"")
+        with pytest.raises(AlreadyFinalized):
+            decryptor.finalize()
+
+    def test_unicode(self, backend):
+        stream = FernetStream(Fernet.generate_key(), backend=backend)
+        with pytest.raises(TypeError):
+            stream.encryptor().update(u"abc")
+        with pytest.raises(TypeError):
+            stream.decryptor().update(u"abc")
+
+    @pytest.mark.parametrize("segment_size", [0, -1, 2 ** 24 + 1])
+    def test_invalid_segment_size(self, segment_size, backend):
+        with pytest.raises(ValueError):
+            FernetStream(
+                Fernet.generate_key(), segment_size=segment_size,
+                backend=backend
+            )
+
+    def test_segment_size_type(self, backend):
+        with pytest.raises(TypeError):
+            FernetStream(Fernet.generate_key(), segment_size=1.0)